@@ -0,0 +1,169 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from search_index import STOPWORDS
+
+WORD_RE = re.compile(r"[^\W_]+(?:[-.][^\W_]+)*")
+
+
+def normalize_query(query):
+    # Cache key text: case-folded, punctuation/whitespace collapsed and
+    # stopwords dropped -- the same words retrieval ignores -- so "What is
+    # INSAT-3D?" and "insat-3d" share an entry.
+    words = WORD_RE.findall(query.casefold())
+    kept = [word for word in words if word not in STOPWORDS]
+    return " ".join(kept or words)
+
+
+class SQLiteCacheBackend:
+    # Shared cache for worker processes on one host (and a local stand-in for
+    # a networked backend in tests): one small SQLite file, WAL mode.
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS answers (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)")
+        self._connection().commit()
+
+    def _connection(self):
+        # sqlite3 connections may not be shared between threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        row = self._connection().execute(
+            "SELECT value FROM answers WHERE key = ? AND expires_at > ?", (key, time.time())).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key, value, ttl):
+        conn = self._connection()
+        conn.execute("INSERT OR REPLACE INTO answers (key, value, expires_at) VALUES (?, ?, ?)",
+                     (key, json.dumps(value), time.time() + ttl))
+        conn.execute("DELETE FROM answers WHERE expires_at <= ?", (time.time(),))
+        conn.commit()
+
+
+class RedisCacheBackend:
+    def __init__(self, url, prefix="mosdac:answer:"):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("CHAT_CACHE_BACKEND uses redis:// but the redis package is not installed")
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        return json.loads(value) if value is not None else None
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, json.dumps(value), ex=max(1, int(ttl)))
+
+
+def cache_backend_from_url(url):
+    # "redis://host:6379/0", "sqlite:///path/to/cache.db" or empty for none
+    if not url:
+        return None
+    if url.startswith(("redis://", "rediss://")):
+        return RedisCacheBackend(url)
+    if url.startswith("sqlite:///"):
+        return SQLiteCacheBackend(url[len("sqlite:///"):])
+    raise ValueError(f"Unsupported chat cache backend: {url}")
+
+
+class AnswerCache:
+    # In-process LRU + TTL cache of chat answers, optionally backed by a
+    # shared backend so worker processes see each other's entries. Keys
+    # include the knowledge-graph version, so a rebuild invalidates every
+    # cached answer (locally and in the shared backend) without a flush.
+    def __init__(self, max_size=1024, ttl=300, backend=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.backend = backend
+        self._entries = OrderedDict()  # key -> (expires_at, answer)
+        self._lock = threading.Lock()
+        self._version = None
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    def _key(self, query, version):
+        return f"{version}:{normalize_query(query)}"
+
+    def _check_version(self, version):
+        # Called with the lock held: entries of an older graph can never hit again
+        if version != self._version:
+            self._entries.clear()
+            self._version = version
+
+    def get(self, query, version):
+        key = self._key(query, version)
+        now = time.monotonic()
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+        if self.backend is not None:
+            try:
+                answer = self.backend.get(key)
+            except Exception as e:
+                print(f"Chat cache backend error: {e}")
+                answer = None
+            if answer is not None:
+                with self._lock:
+                    self.shared_hits += 1
+                    self._store(key, answer, now)
+                return answer
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def _store(self, key, answer, now):
+        self._entries[key] = (now + self.ttl, answer)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def put(self, query, version, answer):
+        # latency_ms timed the query that computed the answer; callers stamp
+        # each hit with its own, so it is not cached (nor shared)
+        answer = {name: value for name, value in answer.items() if name != "latency_ms"}
+        key = self._key(query, version)
+        with self._lock:
+            self._check_version(version)
+            self._store(key, answer, time.monotonic())
+        if self.backend is not None:
+            try:
+                self.backend.set(key, answer, self.ttl)
+            except Exception as e:
+                print(f"Chat cache backend error: {e}")
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.shared_hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.shared_hits) / lookups, 4) if lookups else 0.0,
+            }
@@ -1,20 +1,23 @@
 
 import os
 import asyncio
-from flask import Flask, jsonify, request, send_from_directory
+import hmac
+import json
+import time
+from flask import Flask, Response, g, jsonify, request, send_from_directory, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
 from werkzeug.security import generate_password_hash, check_password_hash
 from dotenv import load_dotenv
-from playwright.async_api import async_playwright
-from bs4 import BeautifulSoup
-import PyPDF2
-import docx
-from openpyxl import load_workbook
-from collections import deque, defaultdict
-import spacy
-import re
-from urllib.parse import urlparse
+# Only the query modules are imported here. The scraper (Playwright, aiohttp,
+# lxml, document parsers) and the graph builder (spaCy) are loaded
+# when the first job of their kind runs, or up front by preload_components.
+from chatbot import MOSDACChatbot
+from chat_batch import parse_queries, queries_from_list, run_batch
+from jobs import JobManager, JobConflict
+from source_modules import load_scraper_module, load_kg_builder_module
+from metrics import REGISTRY, CONTENT_TYPE, Counter, Gauge, Histogram
+from profiler import SlowRequestProfiler
 
 # Load environment variables
 load_dotenv()
@@ -54,83 +57,215 @@ class User(db.Model):
 with app.app_context():
     db.create_all()
 
-# ==================== Scraper Component ====================
-class MOSDACScraper:
-    def __init__(self, base_url, output_dir="extracted_content", max_depth=3):
-        self.base_url = base_url
-        self.output_dir = output_dir
-        os.makedirs(self.output_dir, exist_ok=True)
-        self.visited_urls = set()
-        self.to_visit_queue = deque()
-        self.allowed_domains = [urlparse(base_url).netloc]
-        self.max_depth = max_depth
-        self.file_extensions = [".pdf", ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx"]
-
-    # ... [Include all your MOSDACScraper methods here] ...
-
-# ==================== Knowledge Graph Component ==================== 
-class KnowledgeGraphBuilder:
-    def __init__(self, extracted_content_dir="extracted_content", output_dir="knowledge_graph"):
-        self.extracted_content_dir = extracted_content_dir
-        self.output_dir = output_dir
-        os.makedirs(self.output_dir, exist_ok=True)
-        self.nlp = spacy.load("en_core_web_sm")
-        self.entities = defaultdict(set)
-        self.relationships = defaultdict(list)
-
-    # ... [Include all your KnowledgeGraphBuilder methods here] ...
-
-# ==================== Chatbot Component ====================
-class MOSDACChatbot:
-
-    def __init__(self, kg_dir="knowledge_graph"):
-        self.kg_dir = kg_dir
-        self.entities = defaultdict(set)
-        self.relationships = defaultdict(list)
-        self._load_knowledge_graph()
-
-    def _load_knowledge_graph(self):
-        # Placeholder: Load entities and relationships from files or database
-        # For now, just initialize empty or with sample data if needed
-        pass
-
-    # ... [Include all your MOSDACChatbot methods here] ...
-
 # Initialize components
-chatbot = MOSDACChatbot()
-scraper = MOSDACScraper("https://www.mosdac.gov.in")
-kg_builder = KnowledgeGraphBuilder()
+MOSDAC_URL = "https://www.mosdac.gov.in"
+CONTENT_DIR = "extracted_content"
+KG_DIR = "knowledge_graph"
+
+chatbot = MOSDACChatbot(KG_DIR)
+# Scrapes and graph builds run as background jobs, each with its own
+# MOSDACScraper / KnowledgeGraphBuilder instance
+jobs = JobManager(max_workers=int(os.getenv('JOB_WORKERS', 2)))
+
+def preload_components(names):
+    # Import the job components (and load the spaCy model) now instead of on
+    # first use. With a pre-fork server (gunicorn --preload) this runs once in
+    # the master, and the forked workers share the memory copy-on-write.
+    for name in names:
+        if name == "scraper":
+            load_scraper_module()
+        elif name == "kg":
+            load_kg_builder_module().load_nlp()
+        else:
+            raise ValueError(f"Unknown component to preload: {name}")
+
+# PRELOAD_COMPONENTS=scraper,kg
+preload_components([name.strip() for name in os.getenv('PRELOAD_COMPONENTS', '').split(',') if name.strip()])
+
+# ==================== Metrics and profiling ====================
+# /api/metrics exposes these plus the crawl, extraction, graph-build and chat
+# metrics declared in their own modules (once those modules are loaded).
+HTTP_SECONDS = Histogram("http_request_seconds", "Request time, including streamed response bodies",
+                         ["endpoint", "method", "status"])
+
+def _cache_lookups():
+    stats = chatbot.cache.stats()
+    return {("hit",): stats["hits"], ("shared_hit",): stats["shared_hits"], ("miss",): stats["misses"]}
+
+def _active_jobs():
+    counts = {}
+    for job in jobs.list():
+        if job.active:
+            counts[(job.kind, job.status)] = counts.get((job.kind, job.status), 0) + 1
+    return counts
+
+Counter("chat_cache_lookups_total", "Answer cache lookups by result", ["result"], function=_cache_lookups)
+Gauge("chat_cache_hit_ratio", "Answer cache hits (local or shared) per lookup",
+      function=lambda: chatbot.cache.stats()["hit_rate"])
+Gauge("chat_cache_entries", "Answers held in the local cache", function=lambda: chatbot.cache.stats()["size"])
+Gauge("jobs_active", "Queued or running background jobs", ["kind", "status"], function=_active_jobs)
+
+# Opt-in: PROFILE_SLOW_MS=500 writes folded stacks (flame-graph input) for
+# every request slower than 500 ms to PROFILE_DIR; also switchable at runtime
+# through POST /api/profiler by callers holding ADMIN_TOKEN
+profiler = SlowRequestProfiler(
+    output_dir=os.getenv('PROFILE_DIR', 'profiles'),
+    threshold_ms=float(os.getenv('PROFILE_SLOW_MS')) if os.getenv('PROFILE_SLOW_MS') else None,
+    interval=float(os.getenv('PROFILE_INTERVAL_MS', 5)) / 1000,
+)
+
+@app.before_request
+def _start_request_timer():
+    g.request_started = time.perf_counter()
+    g.profile_token = profiler.begin()
+
+@app.after_request
+def _remember_status(response):
+    g.response_status = response.status_code
+    return response
+
+@app.teardown_request
+def _finish_request(exc):
+    # Runs once a streamed body has been fully sent (stream_with_context keeps
+    # the request context alive until then)
+    started = g.pop('request_started', None)
+    if started is None:
+        return
+    endpoint = request.url_rule.rule if request.url_rule is not None else "unmatched"
+    status = g.pop('response_status', 500 if exc is not None else 200)
+    HTTP_SECONDS.observe(time.perf_counter() - started, endpoint=endpoint, method=request.method, status=status)
+    path = profiler.end(g.pop('profile_token', None), f"{request.method} {endpoint}")
+    if path is not None:
+        print(f"Slow request profiled: {request.method} {request.path} -> {path}")
+
+def _new_scraper(params):
+    return load_scraper_module().MOSDACScraper(
+        MOSDAC_URL, output_dir=CONTENT_DIR, max_depth=params["max_depth"], workers=params["workers"])
+
+def _run_scrape(scraper, params):
+    asyncio.run(scraper.scrape(params["url"], resume=params["resume"]))
+
+def _new_kg_builder():
+    return load_kg_builder_module().KnowledgeGraphBuilder(CONTENT_DIR, KG_DIR)
+
+def _run_build(kg_builder):
+    kg_builder.build_graph()
+    chatbot.reload()
+
+def _submit_job(kind, params, component_factory, run, resource):
+    try:
+        job, coalesced = jobs.submit(kind, params, component_factory, run, resource=resource)
+    except JobConflict as e:
+        return jsonify({"error": str(e), "job": e.job.to_dict()}), 409
+    return jsonify(dict(job.to_dict(), coalesced=coalesced)), 202
 
 # ==================== API Routes ====================
 @app.route('/api/scrape', methods=['POST'])
-async def run_scraper():
+def run_scraper():
+    # Returns 202 with the job at once; poll /api/jobs/<job_id> for progress
+    data = request.get_json(silent=True) or {}
     try:
-        data = request.get_json()
-        start_url = data.get('url', 'https://www.mosdac.gov.in')
-        await scraper.scrape(start_url)
-        return jsonify({"status": "success", "message": "Scraping completed"})
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        params = {
+            "url": data.get('url', MOSDAC_URL),
+            "max_depth": int(data.get('max_depth', 3)),
+            "workers": int(data.get('workers', 4)),
+            "resume": bool(data.get('resume', False)),
+        }
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid scrape parameters: {e}"}), 400
+    return _submit_job("scrape", params, lambda: _new_scraper(params),
+                       lambda scraper: _run_scrape(scraper, params), resource=CONTENT_DIR)
 
 @app.route('/api/build-kg', methods=['POST'])
 def build_knowledge_graph():
+    # Also claims CONTENT_DIR: a build reads blobs that a scrape's final
+    # prune may delete, so the two never overlap
+    return _submit_job("build-kg", {}, _new_kg_builder, _run_build, resource=(CONTENT_DIR, KG_DIR))
+
+@app.route('/api/jobs')
+def list_jobs():
+    return jsonify({"jobs": [job.to_dict() for job in jobs.list()]})
+
+@app.route('/api/jobs/<job_id>')
+def job_status(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    job = jobs.cancel(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+    return jsonify(job.to_dict())
+
+NDJSON = 'application/x-ndjson'
+SSE = 'text/event-stream'
+
+def _chat_stream_format(data):
+    # Streaming is opt-in (Accept header or "stream": true); plain JSON stays
+    # the default for existing clients
+    best = request.accept_mimetypes.best_match(['application/json', NDJSON, SSE])
+    if best in (NDJSON, SSE) and request.accept_mimetypes[best] > request.accept_mimetypes['application/json']:
+        return best
+    if data.get('stream'):
+        return SSE if data.get('stream') == 'sse' else NDJSON
+    return None
+
+def _encode_events(events, mimetype):
     try:
-        kg_builder.build_graph()
-        return jsonify({"status": "success", "message": "Knowledge graph built"})
+        for event in events:
+            yield _encode_event(event, mimetype)
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        yield _encode_event({"type": "error", "error": str(e)}, mimetype)
+
+def _encode_event(event, mimetype):
+    payload = json.dumps(event)
+    if mimetype == SSE:
+        return f"event: {event['type']}\ndata: {payload}\n\n"
+    return payload + "\n"
 
 @app.route('/api/chat', methods=['POST'])
 def handle_chat():
     try:
-        data = request.get_json()
+        data = request.get_json(silent=True)
         if not data or 'query' not in data:
             return jsonify({"error": "No query provided"}), 400
+        stream_format = _chat_stream_format(data)
+        if stream_format is not None:
+            events = _encode_events(chatbot.stream_query(data['query']), stream_format)
+            # X-Accel-Buffering stops nginx from holding chunks back
+            return Response(stream_with_context(events), mimetype=stream_format,
+                            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
         response = chatbot.answer_query(data['query'])
         return jsonify(response)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/chat/batch', methods=['POST'])
+def handle_chat_batch():
+    # Body: a JSON array of queries (strings or {"query": ...} objects), an
+    # object {"queries": [...]}, or JSONL. Results stream back as NDJSON in
+    # input order, followed by a summary line.
+    try:
+        if request.mimetype == 'application/json':
+            data = request.get_json(silent=True)
+            if isinstance(data, dict):
+                data = data.get('queries')
+            if not isinstance(data, list):
+                return jsonify({"error": "Expected a JSON array of queries"}), 400
+            queries = queries_from_list(data)
+        else:
+            queries = parse_queries(request.get_data(as_text=True).splitlines())
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if not queries:
+        return jsonify({"error": "No queries provided"}), 400
+    events = _encode_events(run_batch(chatbot, queries), NDJSON)
+    return Response(stream_with_context(events), mimetype=NDJSON,
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 # Serve Frontend
 
 @app.route('/')
@@ -149,12 +284,50 @@ def not_found(e):
     else:
         return jsonify({"error": "Not found"}), 404
 
+@app.route('/api/metrics')
+def metrics():
+    return Response(REGISTRY.exposition(), content_type=CONTENT_TYPE)
+
+def _admin_error():
+    # Operational settings change only with "Authorization: Bearer <ADMIN_TOKEN>";
+    # without ADMIN_TOKEN set they are fixed by the environment at startup
+    admin_token = os.getenv('ADMIN_TOKEN')
+    if not admin_token:
+        return jsonify({"error": "Runtime changes are disabled; set ADMIN_TOKEN to enable them"}), 403
+    supplied = request.headers.get('Authorization', '').removeprefix('Bearer ')
+    if not hmac.compare_digest(supplied.encode('utf-8'), admin_token.encode('utf-8')):
+        return jsonify({"error": "Invalid admin token"}), 401
+    return None
+
+@app.route('/api/profiler', methods=['GET', 'POST'])
+def profiler_settings():
+    # POST {"threshold_ms": 500} profiles requests slower than 500 ms,
+    # {"threshold_ms": null} switches profiling off (admin only)
+    if request.method == 'POST':
+        error = _admin_error()
+        if error is not None:
+            return error
+        data = request.get_json(silent=True) or {}
+        try:
+            threshold_ms = data.get('threshold_ms', profiler.threshold_ms)
+            threshold_ms = float(threshold_ms) if threshold_ms is not None else None
+            interval_ms = data.get('interval_ms')
+            interval = float(interval_ms) / 1000 if interval_ms is not None else None
+        except (TypeError, ValueError) as e:
+            return jsonify({"error": f"Invalid profiler settings: {e}"}), 400
+        if interval is not None and interval <= 0:
+            return jsonify({"error": "interval_ms must be positive"}), 400
+        profiler.configure(threshold_ms, interval)
+    return jsonify(profiler.status())
+
 # Health Check
 @app.route('/api/health')
 def health_check():
     return jsonify({
         "status": "healthy",
-        "services": ["scraper", "knowledge-graph", "chatbot"]
+        "services": ["scraper", "knowledge-graph", "chatbot"],
+        "active_jobs": sum(job.active for job in jobs.list()),
+        "chat_cache": chatbot.cache.stats()
     })
 
 if __name__ == '__main__':
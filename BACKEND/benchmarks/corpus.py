@@ -0,0 +1,105 @@
+import os
+import sys
+# Allow running as `python benchmarks/corpus.py` from BACKEND
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import random
+import time
+
+from doc_store import DocumentStore, KIND_TEXT, KIND_TABLES
+
+# Synthetic graph-builder corpora, written straight into a document store the
+# way a crawl leaves extracted_content. Text follows the MOSDAC portal's
+# product pages and contains the entity and relation patterns the builder
+# looks for; every document carries its own product ids, so no two texts
+# are duplicates. Generation is deterministic in (docs, paragraphs, seed) and
+# a finished corpus is reused: corpus.json records what a directory holds.
+#
+#   python benchmarks/corpus.py benchmarks/.data/corpus-10k --docs 10000
+
+CORPUS_SIZES = {"1k": 1_000, "10k": 10_000, "100k": 100_000}
+CORPUS_FILE = "corpus.json"
+
+SATELLITES = ["INSAT-3D", "INSAT-3DR", "SCATSAT-1", "Oceansat-2", "Megha-Tropiques", "Kalpana-1", "SARAL"]
+ORGS = ["ISRO", "Space Applications Centre", "NRSC", "IMD", "NOAA", "EUMETSAT"]
+PLACES = ["Ahmedabad", "India", "Bay of Bengal", "Arabian Sea", "Bengaluru", "Chennai", "Indian Ocean"]
+PEOPLE = ["A. K. Sharma", "R. Kumar", "S. Patel", "M. Rao", "P. Iyer"]
+PRODUCTS = ["rainfall", "sea surface temperature", "cloud motion vectors", "outgoing longwave radiation",
+            "soil moisture", "ocean colour", "wind vectors", "humidity profile", "snow cover", "fog"]
+
+
+def product_id(doc_id, n):
+    return f"3RIMG_{doc_id:06d}_{n}"
+
+
+def document_text(rng, doc_id, paragraphs):
+    lines = [f"Title: {rng.choice(SATELLITES)} {rng.choice(PRODUCTS)} products ({doc_id})", ""]
+    for n in range(paragraphs):
+        sat, sat2 = rng.sample(SATELLITES, 2)
+        org, place, person = rng.choice(ORGS), rng.choice(PLACES), rng.choice(PEOPLE)
+        lines.append(
+            f"{sat} from {org} provides {rng.choice(PRODUCTS)} imagery over {place} since {rng.randint(2000, 2024)}. "
+            f"{person}, {org} said the {sat} is identical to {sat2} for cloud products. "
+            f"Product {product_id(doc_id, n)} is archived at {org} in {place} at "
+            f"{rng.choice([4, 8, 10, 25])} km resolution every {rng.choice([15, 30, 60])} minutes."
+        )
+    return "\n".join(lines)
+
+
+def table_text(rng, doc_id):
+    rows = ["Product\tPlatform\tDownload URL"]
+    rows += [f"{product_id(doc_id, n)}\t{rng.choice(['Linux', 'Windows', 'macOS'])}\t"
+             f"https://www.mosdac.gov.in/data/{product_id(doc_id, n)}.h5" for n in range(rng.randint(3, 12))]
+    return "\n--- Table 1 ---\n" + "\n".join(rows) + "\n"
+
+
+def corpus_info(directory):
+    try:
+        with open(os.path.join(directory, CORPUS_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def write_corpus(directory, docs, paragraphs=5, tables_every=5, seed=0):
+    # Returns corpus.json's contents; an existing identical corpus is kept
+    params = {"docs": docs, "paragraphs": paragraphs, "tables_every": tables_every, "seed": seed}
+    info = corpus_info(directory)
+    if info is not None and info["params"] == params:
+        return info
+    os.makedirs(directory, exist_ok=True)
+    start = time.perf_counter()
+    with DocumentStore(directory, near_duplicates=False) as store:
+        for doc_id in range(docs):
+            rng = random.Random(f"{seed}:{doc_id}")
+            url = f"https://www.mosdac.gov.in/product/{doc_id}"
+            store.put(url, KIND_TEXT, document_text(rng, doc_id, paragraphs), commit=False)
+            if tables_every and doc_id % tables_every == 0:
+                store.put(url, KIND_TABLES, table_text(rng, doc_id), commit=False)
+            if doc_id % 1000 == 999:
+                store.commit()
+        store.commit()
+        stats = store.stats()
+    info = {"params": params, "stats": stats, "generated_seconds": round(time.perf_counter() - start, 2)}
+    with open(os.path.join(directory, CORPUS_FILE), "w", encoding="utf-8") as f:
+        json.dump(info, f, indent=2)
+    return info
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic extracted_content corpus")
+    parser.add_argument("directory")
+    parser.add_argument("--docs", default="1k", help=f"Document count or one of {', '.join(CORPUS_SIZES)}")
+    parser.add_argument("--paragraphs", type=int, default=5)
+    parser.add_argument("--tables-every", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    docs = CORPUS_SIZES.get(args.docs) or int(args.docs)
+    info = write_corpus(args.directory, docs, args.paragraphs, args.tables_every, args.seed)
+    print(json.dumps(info, indent=2))
+
+
+if __name__ == "__main__":
+    main()
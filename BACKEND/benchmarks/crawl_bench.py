@@ -0,0 +1,70 @@
+import os
+import sys
+# Allow running as `python benchmarks/crawl_bench.py` from BACKEND
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import argparse
+import asyncio
+import tempfile
+import time
+
+from source_modules import load_scraper_module
+from doc_store import DocumentStore
+from fixture_site import FixtureSite
+
+MOSDACScraper = load_scraper_module().MOSDACScraper
+
+
+def run_crawl(base_url, output_dir, workers, max_depth):
+    scraper = MOSDACScraper(base_url, output_dir=output_dir, max_depth=max_depth, workers=workers)
+    start = time.perf_counter()
+    asyncio.run(scraper.scrape(f"{base_url}/page/0"))
+    elapsed = time.perf_counter() - start
+    return scraper.pages_crawled, elapsed
+
+
+def same_output(dir_a, dir_b):
+    # Same documents stored under the same content hashes
+    contents = []
+    for directory in (dir_a, dir_b):
+        with DocumentStore(directory) as store:
+            contents.append(sorted(tuple(row) for row in store.conn.execute("SELECT url, kind, hash FROM documents")))
+    return contents[0] == contents[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crawl a local fixture site with increasing worker counts")
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--fanout", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds the fixture server sleeps per request")
+    parser.add_argument("--max-depth", type=int, default=4)
+    parser.add_argument("--workers", default="1,2,4,8")
+    args = parser.parse_args()
+
+    server = FixtureSite(args.pages, args.fanout).serve(latency=args.latency)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    worker_counts = [int(w) for w in args.workers.split(",")]
+
+    mismatched = []
+    with tempfile.TemporaryDirectory() as tmp:
+        baseline_dir = None
+        for workers in worker_counts:
+            output_dir = os.path.join(tmp, f"workers_{workers}")
+            crawled, elapsed = run_crawl(base_url, output_dir, workers, args.max_depth)
+            if baseline_dir is None:
+                baseline_dir = output_dir
+            identical = same_output(baseline_dir, output_dir)
+            print(f"workers={workers:<3} pages={crawled:<5} time={elapsed:8.2f}s "
+                  f"pages/sec={crawled / elapsed:8.2f} identical_output={identical}")
+            if not identical:
+                mismatched.append(workers)
+
+    server.shutdown()
+    if mismatched:
+        sys.exit(f"Output differs from workers={worker_counts[0]} with workers={mismatched}")
+
+
+if __name__ == "__main__":
+    main()
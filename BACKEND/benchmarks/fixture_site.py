@@ -0,0 +1,265 @@
+import os
+import sys
+# Allow running as `python benchmarks/fixture_site.py` from BACKEND
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import io
+import random
+import threading
+import time
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from xml.sax.saxutils import escape
+
+# Deterministic MOSDAC-like site for offline crawl benchmarks. Pages form a
+# tree (/page/N links to N*fanout+1 .. N*fanout+fanout) and look like the
+# portal: a large navigation menu, product paragraphs with enough text for
+# the static fetch tier, product tables on every `tables_every`-th page, and
+# a PDF, DOCX or XLSX attachment on every `attachments_every`-th page. The
+# attachments are minimal but valid files written without any document
+# library, so the generator runs anywhere; the crawler's extractors read
+# them like real downloads. Everything is derived from (seed, page id), so
+# two runs serve byte-identical sites.
+#
+#   python benchmarks/fixture_site.py --pages 1000 --port 8000
+
+SATELLITES = ["INSAT-3D", "INSAT-3DR", "SCATSAT-1", "Oceansat-2", "Megha-Tropiques", "Kalpana-1", "SARAL"]
+PRODUCTS = ["rainfall", "sea surface temperature", "cloud motion vectors", "outgoing longwave radiation",
+            "soil moisture", "ocean colour", "wind vectors", "humidity profile", "snow cover", "fog"]
+ORGS = ["ISRO", "Space Applications Centre", "NRSC", "IMD", "MOSDAC"]
+PLACES = ["Ahmedabad", "India", "Bay of Bengal", "Arabian Sea", "Bengaluru", "Indian Ocean"]
+ATTACHMENT_TYPES = ["pdf", "docx", "xlsx"]
+MENU_ITEMS = 120
+ZIP_DATE = (2020, 1, 1, 0, 0, 0)
+
+
+def _paragraph(rng, page_id):
+    satellite, product, org, place = rng.choice(SATELLITES), rng.choice(PRODUCTS), rng.choice(ORGS), rng.choice(PLACES)
+    level = rng.choice(["L1B", "L2A", "L2B", "L3"])
+    return (f"The {satellite} {product} product ({level}) is generated by {org} and covers {place}. "
+            f"Data for page {page_id} are available at {rng.choice([4, 8, 10, 25])} km resolution every "
+            f"{rng.choice([15, 30, 60])} minutes since {rng.randint(2005, 2024)}, in HDF5 and NetCDF formats.")
+
+
+def minimal_pdf(lines):
+    # One page, Helvetica, one text line per entry
+    def pdf_string(text):
+        return "(" + text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ")"
+    stream = "BT /F1 11 Tf 14 TL 50 800 Td " + " ".join(f"{pdf_string(line)} Tj T*" for line in lines) + " ET"
+    stream = stream.encode("latin-1", "replace")
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        b"<< /Length " + str(len(stream)).encode() + b" >>\nstream\n" + stream + b"\nendstream",
+    ]
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(f"{number} 0 obj\n".encode() + body + b"\nendobj\n")
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    for offset in offsets:
+        out.write(f"{offset:010d} 00000 n \n".encode())
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+    return out.getvalue()
+
+
+def _zip(parts):
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data in parts:
+            info = zipfile.ZipInfo(name, ZIP_DATE)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            archive.writestr(info, data)
+    return out.getvalue()
+
+
+_RELS = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">{}</Relationships>'
+_REL = '<Relationship Id="rId{}" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/{}" Target="{}"/>'
+_TYPES = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+          '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+          '<Default Extension="xml" ContentType="application/xml"/>{}</Types>')
+_OVERRIDE = '<Override PartName="{}" ContentType="application/vnd.openxmlformats-officedocument.{}"/>'
+
+
+def minimal_docx(paragraphs):
+    body = "".join(f"<w:p><w:r><w:t xml:space=\"preserve\">{escape(text)}</w:t></w:r></w:p>" for text in paragraphs)
+    return _zip([
+        ("[Content_Types].xml", _TYPES.format(_OVERRIDE.format("/word/document.xml", "wordprocessingml.document.main+xml"))),
+        ("_rels/.rels", _RELS.format(_REL.format(1, "officeDocument", "word/document.xml"))),
+        ("word/document.xml", '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                              '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+                              f"<w:body>{body}</w:body></w:document>"),
+    ])
+
+
+def minimal_xlsx(rows):
+    def cell(column, row_no, value):
+        ref = f"{chr(ord('A') + column)}{row_no}"
+        if isinstance(value, (int, float)):
+            return f'<c r="{ref}"><v>{value}</v></c>'
+        return f'<c r="{ref}" t="inlineStr"><is><t>{escape(str(value))}</t></is></c>'
+    sheet_rows = "".join(f'<row r="{row_no}">' + "".join(cell(c, row_no, v) for c, v in enumerate(row)) + "</row>"
+                         for row_no, row in enumerate(rows, 1))
+    main = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+    return _zip([
+        ("[Content_Types].xml", _TYPES.format(
+            _OVERRIDE.format("/xl/workbook.xml", "spreadsheetml.sheet.main+xml")
+            + _OVERRIDE.format("/xl/worksheets/sheet1.xml", "spreadsheetml.worksheet+xml"))),
+        ("_rels/.rels", _RELS.format(_REL.format(1, "officeDocument", "xl/workbook.xml"))),
+        ("xl/workbook.xml", f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<workbook xmlns="{main}" '
+                            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+                            '<sheets><sheet name="Products" sheetId="1" r:id="rId1"/></sheets></workbook>'),
+        ("xl/_rels/workbook.xml.rels", _RELS.format(_REL.format(1, "worksheet", "worksheets/sheet1.xml"))),
+        ("xl/worksheets/sheet1.xml", f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                                     f'<worksheet xmlns="{main}"><sheetData>{sheet_rows}</sheetData></worksheet>'),
+    ])
+
+
+class FixtureSite:
+    def __init__(self, pages=1000, fanout=8, paragraphs=6, tables_every=3, attachments_every=10, seed=0):
+        self.pages = pages
+        self.fanout = fanout
+        self.paragraphs = paragraphs
+        self.tables_every = tables_every
+        self.attachments_every = attachments_every
+        self.seed = seed
+        # The menu links the first pages of the site, like the portal's section index
+        self._menu_pages = sorted({i % pages for i in range(MENU_ITEMS)})
+        self._menu = "".join(f'<li><a href="/page/{i}">Section {i}</a></li>' for i in self._menu_pages)
+
+    def _rng(self, page_id, salt=""):
+        return random.Random(f"{self.seed}:{page_id}:{salt}")
+
+    def children(self, page_id):
+        first = page_id * self.fanout + 1
+        return [child for child in range(first, first + self.fanout) if child < self.pages]
+
+    def attachment_name(self, page_id):
+        if not self.attachments_every or page_id % self.attachments_every:
+            return None
+        ext = ATTACHMENT_TYPES[(page_id // self.attachments_every) % len(ATTACHMENT_TYPES)]
+        return f"product_{page_id}.{ext}"
+
+    def expected(self, max_depth=None):
+        # (pages, attachments) a crawl to max_depth reaches, following the
+        # same breadth-first order as the crawler
+        seen, level, depth = {0}, [0], 0
+        attachments = 0
+        while level and (max_depth is None or depth <= max_depth):
+            attachments += sum(1 for page_id in level if self.attachment_name(page_id))
+            next_level = []
+            for page_id in level:
+                for child in self._menu_pages + self.children(page_id):
+                    if child not in seen:
+                        seen.add(child)
+                        next_level.append(child)
+            level = next_level
+            depth += 1
+        return len(seen) - len(level), attachments
+
+    def page(self, page_id):
+        rng = self._rng(page_id)
+        paragraphs = "".join(f"<p>{_paragraph(rng, page_id)}</p>" for _ in range(self.paragraphs))
+        table = ""
+        if self.tables_every and page_id % self.tables_every == 0:
+            rows = "".join(f"<tr><td>3RIMG_{page_id}_{r}</td><td>{rng.choice(SATELLITES)}</td>"
+                           f"<td>{rng.choice(PRODUCTS)}</td><td>{rng.choice([4, 8, 10])} km</td></tr>"
+                           for r in range(rng.randint(5, 30)))
+            table = f"<table><tr><th>Product</th><th>Satellite</th><th>Parameter</th><th>Resolution</th></tr>{rows}</table>"
+        links = "".join(f'<li><a href="/page/{child}">Product page {child}</a></li>' for child in self.children(page_id))
+        attachment = self.attachment_name(page_id)
+        if attachment:
+            links += f'<li><a href="/files/{attachment}">Product document</a></li>'
+        return (f"<!DOCTYPE html><html><head><title>MOSDAC product page {page_id}</title>"
+                f"<script>var page = {page_id};</script></head><body>"
+                f"<nav><ul>{self._menu}</ul></nav><main><h1>Product page {page_id}</h1>{paragraphs}{table}"
+                f"<ul>{links}</ul></main><footer><a href='/page/0'>Home</a></footer></body></html>").encode("utf-8")
+
+    def attachment(self, name):
+        stem, ext = os.path.splitext(name)
+        try:
+            page_id = int(stem.rsplit("_", 1)[1])
+        except (IndexError, ValueError):
+            return None
+        if self.attachment_name(page_id) != name:
+            return None
+        rng = self._rng(page_id, "attachment")
+        lines = [_paragraph(rng, page_id) for _ in range(self.paragraphs)]
+        if ext == ".pdf":
+            return minimal_pdf(lines)
+        if ext == ".docx":
+            return minimal_docx(lines)
+        rows = [["Product", "Satellite", "Resolution (km)"]]
+        rows += [[f"3RIMG_{page_id}_{r}", rng.choice(SATELLITES), rng.choice([4, 8, 10])] for r in range(20)]
+        return minimal_xlsx(rows)
+
+    def serve(self, host="127.0.0.1", port=0, latency=0.0):
+        # Starts a threaded server in the background; returns it (its
+        # server_address has the port). Call shutdown() when done.
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if latency:
+                    time.sleep(latency)
+                path = self.path.split("?")[0].split("#")[0].rstrip("/") or "/page/0"
+                body, content_type = None, "text/html; charset=utf-8"
+                if path.startswith("/page/"):
+                    try:
+                        page_id = int(path.rsplit("/", 1)[1])
+                    except ValueError:
+                        page_id = -1
+                    if 0 <= page_id < site.pages:
+                        body = site.page(page_id)
+                elif path.startswith("/files/"):
+                    body = site.attachment(path.rsplit("/", 1)[1])
+                    content_type = "application/octet-stream"
+                if body is None:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a synthetic MOSDAC-like site locally")
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--fanout", type=int, default=8)
+    parser.add_argument("--tables-every", type=int, default=3)
+    parser.add_argument("--attachments-every", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds the server sleeps per request")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    site = FixtureSite(args.pages, args.fanout, tables_every=args.tables_every,
+                       attachments_every=args.attachments_every, seed=args.seed)
+    server = site.serve(port=args.port, latency=args.latency)
+    pages, attachments = site.expected()
+    print(f"Serving {pages} pages and {attachments} attachments at http://127.0.0.1:{server.server_address[1]}/page/0")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
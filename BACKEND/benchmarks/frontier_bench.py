@@ -0,0 +1,119 @@
+import os
+import sys
+# Allow running as `python benchmarks/frontier_bench.py` from BACKEND
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import random
+import tempfile
+import time
+import tracemalloc
+from collections import deque
+
+from frontier import Frontier, URLRules, URLSet
+
+# Memory per tracked URL and enqueue/pop throughput: the crawler's old
+# frontier (a set of visited URL strings plus a deque that is only
+# deduplicated when popped) against frontier.Frontier, in memory and
+# spilling to disk. Each URL is linked `--links` times, the way menus and
+# footers repeat links on every page of a level.
+
+HOST = "https://www.mosdac.gov.in"
+SECTIONS = ["product", "catalog/satellite", "data/insat-3d", "documents", "news", "tools", "help", "gallery"]
+
+
+def synthetic_links(urls, links_per_url, seed=0):
+    # [(path, depth)] with every path repeated; depth grows with discovery
+    # order. Runs build the URL string per link, as parsing a page does.
+    rng = random.Random(seed)
+    paths = [f"{rng.choice(SECTIONS)}/{i}-{rng.getrandbits(32):08x}" for i in range(urls)]
+    stream = [(path, 1 + i * 4 // urls) for i, path in enumerate(paths) for _ in range(links_per_url)]
+    # Repeats arrive spread over the level rather than back to back
+    rng.shuffle(stream)
+    stream.sort(key=lambda link: link[1])
+    return stream
+
+
+def legacy_frontier(stream):
+    # scraper.py before frontier.py: visited is checked when a link is
+    # queued but only filled when it is popped, so a level's repeats all queue
+    visited_urls = set()
+    to_visit_queue = deque()
+    for path, depth in stream:
+        url = f"{HOST}/{path}"
+        if url not in visited_urls:
+            to_visit_queue.append((url, depth))
+    crawled = 0
+    while to_visit_queue:
+        url, depth = to_visit_queue.popleft()
+        if url.split("#")[0] in visited_urls:
+            continue
+        visited_urls.add(url)
+        crawled += 1
+    return crawled, visited_urls
+
+
+def frontier_run(stream, memory_limit=None, spill_path=None):
+    frontier = Frontier(URLRules([HOST.split("//")[1]]), memory_limit=memory_limit, spill_path=spill_path)
+    for path, depth in stream:
+        frontier.add(f"{HOST}/{path}", depth)
+    crawled = 0
+    while frontier.pop() is not None:
+        crawled += 1
+    frontier.close()
+    return crawled, frontier.seen
+
+
+def measure(run, stream):
+    # (URLs crawled, seconds, peak bytes, bytes still held by the seen set);
+    # timed without tracemalloc, which slows allocation-heavy code severalfold
+    start = time.perf_counter()
+    crawled, seen = run(stream)
+    elapsed = time.perf_counter() - start
+    del seen
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    _, seen = run(stream)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return crawled, elapsed, peak - base, current - base
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Frontier memory per tracked URL and throughput")
+    parser.add_argument("--urls", type=int, default=200_000)
+    parser.add_argument("--links", type=int, default=5, help="Times each URL is linked")
+    parser.add_argument("--memory-limit", type=int, default=20_000, help="Queued URLs kept in memory when spilling")
+    args = parser.parse_args()
+
+    stream = synthetic_links(args.urls, args.links)
+    print(f"{args.urls} URLs, {len(stream)} links")
+    with tempfile.TemporaryDirectory() as tmp:
+        runs = [
+            ("set + deque", legacy_frontier),
+            ("Frontier", frontier_run),
+            (f"Frontier spill>{args.memory_limit}",
+             lambda s: frontier_run(s, args.memory_limit, os.path.join(tmp, "frontier.sqlite"))),
+        ]
+        for name, run in runs:
+            crawled, elapsed, peak, held = measure(run, stream)
+            print(f"{name:<24} crawled={crawled:<8} time={elapsed:6.2f}s links/sec={len(stream) / elapsed:10.0f} "
+                  f"peak={peak / args.urls:7.1f} B/URL  seen set={held / args.urls:6.1f} B/URL")
+
+    # The dedup structures alone, filled with fresh URL strings
+    urls = [f"{HOST}/{path}" for path in dict.fromkeys(path for path, _ in stream)]
+    start = time.perf_counter()
+    strings = set(urls)
+    string_seconds = time.perf_counter() - start
+    hashes = URLSet()
+    start = time.perf_counter()
+    for url in urls:
+        hashes.add(url)
+    hash_seconds = time.perf_counter() - start
+    string_bytes = sys.getsizeof(strings) + sum(sys.getsizeof(url) for url in urls)
+    print(f"set of str : {string_bytes / len(urls):6.1f} B/URL  {string_seconds * 1e9 / len(urls):5.0f} ns/add")
+    print(f"URLSet     : {hashes.memory_bytes() / len(urls):6.1f} B/URL  {hash_seconds * 1e9 / len(urls):5.0f} ns/add")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import os
+import sys
+# Allow running as `python benchmarks/html_bench.py` from BACKEND
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import gzip
+import io
+import random
+import time
+import tracemalloc
+
+from html_extract import extract_html
+
+# Per-page CPU time and allocation peak of the page extraction: the old
+# BeautifulSoup path (parse, prettify, separate find_all passes) against
+# extract_html, over saved pages (--corpus: a directory of .html / .html.gz
+# files, e.g. a previous crawl's output) or a generated MOSDAC-like corpus.
+# Serialization is done into memory so disk speed does not count.
+
+
+def legacy_extract(html):
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    title = soup.title.get_text(strip=True) if soup.title else ""
+    saved = soup.prettify()
+    text = ' '.join(p.get_text() for p in soup.find_all('p'))
+    tables = [[[cell.get_text(strip=True) for cell in row.find_all(['td', 'th'])] for row in table.find_all('tr')]
+              for table in soup.find_all('table')]
+    links = [link['href'] for link in soup.find_all('a', href=True)]
+    return title, text, tables, links, len(saved)
+
+
+def single_pass_extract(html, backend=None):
+    content = extract_html(html, backend)
+    buffer = io.BytesIO()
+    with gzip.GzipFile(fileobj=buffer, mode="wb", compresslevel=6) as f:
+        f.write(html.encode("utf-8"))
+    return content.title, content.text, content.tables, content.links, buffer.tell()
+
+
+def synthetic_page(rng, page_id):
+    # Navigation-heavy portal page: menus, a few content paragraphs, product tables
+    menu = "".join(f'<li><a href="/menu/{i}?lang=en">Menu item {i}</a></li>' for i in range(rng.randint(80, 200)))
+    paragraphs = "".join(
+        f"<p>The INSAT-3D {rng.choice(['rainfall', 'winds', 'SST', 'humidity'])} product {i} is generated "
+        f"by the <b>Space Applications Centre</b> &amp; distributed through MOSDAC. "
+        + " ".join(rng.choice(["data", "satellite", "ocean", "level-2", "HDF5", "archive"]) for _ in range(60))
+        + "</p>" for i in range(rng.randint(5, 30)))
+    rows = "".join(f"<tr><td>3RIMG_{page_id}_{r}</td><td> L2B </td><td>{r * 4} km</td></tr>"
+                   for r in range(rng.randint(0, 60)))
+    table = f"<table><tr><th>Product</th><th>Level</th><th>Resolution</th></tr>{rows}</table>" if rows else ""
+    scripts = "<script>var config = {" + ",".join(f'"k{i}": {i}' for i in range(300)) + "};</script>"
+    return (f"<!DOCTYPE html><html><head><title>MOSDAC page {page_id}</title>{scripts}</head><body>"
+            f"<nav><ul>{menu}</ul></nav><main>{paragraphs}{table}</main>"
+            f"<footer><a href='/contact'>Contact</a></footer></body></html>")
+
+
+def load_corpus(directory):
+    pages = []
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if name.endswith(".html.gz"):
+            with gzip.open(path, "rt", encoding="utf-8", errors="replace") as f:
+                pages.append(f.read())
+        elif name.endswith(".html"):
+            with open(path, encoding="utf-8", errors="replace") as f:
+                pages.append(f.read())
+    return pages
+
+
+def measure(fn, pages):
+    # (CPU ms per page, mean and max tracemalloc peak KB per page, results)
+    start = time.process_time()
+    results = [fn(html) for html in pages]
+    cpu_ms = (time.process_time() - start) * 1000 / len(pages)
+    peaks = []
+    tracemalloc.start()
+    for html in pages:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        fn(html)
+        peaks.append((tracemalloc.get_traced_memory()[1] - base) / 1024)
+    tracemalloc.stop()
+    return cpu_ms, sum(peaks) / len(peaks), max(peaks), results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-page HTML extraction cost, BeautifulSoup vs single pass")
+    parser.add_argument("--corpus", help="Directory of saved .html/.html.gz pages")
+    parser.add_argument("--pages", type=int, default=200, help="Generated pages when --corpus is not given")
+    args = parser.parse_args()
+
+    if args.corpus:
+        pages = load_corpus(args.corpus)
+    else:
+        rng = random.Random(0)
+        pages = [synthetic_page(rng, i) for i in range(args.pages)]
+    if not pages:
+        sys.exit("No pages found")
+    mean_kb = sum(len(html) for html in pages) / len(pages) / 1024
+    print(f"pages: {len(pages)}  mean size: {mean_kb:.0f} KB")
+
+    implementations = [("beautifulsoup+prettify", legacy_extract), ("single pass (lxml)", lambda h: single_pass_extract(h, "lxml")),
+                       ("single pass (html.parser)", lambda h: single_pass_extract(h, "stdlib"))]
+    baseline = None
+    for name, fn in implementations:
+        cpu_ms, mean_peak, max_peak, results = measure(fn, pages)
+        if baseline is None:
+            baseline = results
+            same = "-"
+        else:
+            # title, text, tables and links must match the old output
+            same = sum(result[:4] == expected[:4] for result, expected in zip(results, baseline))
+            same = f"{same}/{len(pages)}"
+        stored_kb = sum(result[4] for result in results) / len(results) / 1024
+        print(f"{name:<26} cpu {cpu_ms:7.2f} ms/page  alloc peak mean {mean_peak:8.0f} KB  max {max_peak:8.0f} KB  "
+              f"stored html {stored_kb:6.1f} KB/page  same output {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import os
+import sys
+# Allow running as `python benchmarks/kg_bench.py` from BACKEND
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import argparse
+import contextlib
+import io
+import tempfile
+import time
+from collections import Counter
+
+from corpus import write_corpus
+from source_modules import load_kg_builder_module
+
+
+def run_build(module, corpus_dir, output_dir, bulk, batch_size, n_process):
+    builder = module.KnowledgeGraphBuilder(corpus_dir, output_dir, batch_size=batch_size, n_process=n_process)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        builder.build_graph(bulk=bulk)
+    elapsed = time.perf_counter() - start
+    entities = {ent_type: set(ents) for ent_type, ents in builder.entities.items()}
+    relationships = {rel_type: Counter(rels) for rel_type, rels in builder.relationships.items()}
+    return builder.files_processed, elapsed, entities, relationships
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serial vs nlp.pipe knowledge-graph build throughput")
+    parser.add_argument("--docs", type=int, default=500)
+    parser.add_argument("--paragraphs", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--n-process", type=int, default=1)
+    parser.add_argument("--corpus", help="Existing extracted_content directory to use instead of synthetic docs")
+    args = parser.parse_args()
+
+    module = load_kg_builder_module()
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus_dir = args.corpus
+        if corpus_dir is None:
+            corpus_dir = os.path.join(tmp, "corpus")
+            write_corpus(corpus_dir, args.docs, args.paragraphs)
+
+        docs, serial_time, serial_entities, serial_rels = run_build(
+            module, corpus_dir, os.path.join(tmp, "serial"), False, args.batch_size, args.n_process)
+        _, bulk_time, bulk_entities, bulk_rels = run_build(
+            module, corpus_dir, os.path.join(tmp, "bulk"), True, args.batch_size, args.n_process)
+
+    print(f"documents: {docs}")
+    print(f"serial build_graph : {serial_time:8.2f}s  {docs / serial_time:8.1f} docs/sec")
+    print(f"bulk (batch={args.batch_size}, n_process={args.n_process}): "
+          f"{bulk_time:8.2f}s  {docs / bulk_time:8.1f} docs/sec  speedup x{serial_time / bulk_time:.2f}")
+    print(f"identical entities: {serial_entities == bulk_entities}  "
+          f"identical relationships: {serial_rels == bulk_rels}")
+
+
+if __name__ == "__main__":
+    main()
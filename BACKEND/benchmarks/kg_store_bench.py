@@ -0,0 +1,160 @@
+import os
+import sys
+# Allow running as `python benchmarks/kg_store_bench.py` from BACKEND
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import ast
+import json
+import random
+import resource
+import subprocess
+import tempfile
+import time
+from collections import defaultdict
+
+from kg_store import KnowledgeGraphStore, write_graph
+
+PREDICATES = ["PRODUCED_BY", "AFFILIATED_WITH", "IDENTICAL_TO", "HAS_DOWNLOAD_URL", "HAS_DEFINITION"]
+ENTITY_TYPES = ["ORG", "GPE", "LOC", "DATE", "PRODUCT", "EVENT", "PERSON"]
+
+
+def synthetic_graph(triples, nodes, seed=0):
+    rng = random.Random(seed)
+    names = [f"Entity {i} {rng.choice(ENTITY_TYPES).lower()}" for i in range(nodes)]
+    entities = defaultdict(set)
+    for name in names:
+        entities[rng.choice(ENTITY_TYPES)].add(name)
+    relationships = defaultdict(list)
+    for _ in range(triples):
+        relationships["general"].append((rng.choice(names), rng.choice(PREDICATES), rng.choice(names)))
+    return entities, relationships, names
+
+
+def write_text_graph(directory, entities, relationships):
+    # Same layout KnowledgeGraphBuilder.build_graph writes
+    with open(os.path.join(directory, "entities.txt"), "w", encoding="utf-8") as f:
+        for ent_type, ents in entities.items():
+            f.write(f"--- {ent_type} ---\n")
+            for ent in ents:
+                f.write(f"{ent}\n")
+    with open(os.path.join(directory, "relationships.txt"), "w", encoding="utf-8") as f:
+        for rel_type, rels in relationships.items():
+            f.write(f"--- {rel_type} Relationships ---\n")
+            for rel in rels:
+                f.write(f"{rel}\n")
+
+
+def load_text_graph(directory):
+    # What a loader for the text files has to do before it can answer a
+    # neighbour lookup: parse every line and build adjacency dicts
+    entities = defaultdict(set)
+    with open(os.path.join(directory, "entities.txt"), encoding="utf-8") as f:
+        current = None
+        for line in f:
+            line = line.rstrip("\n")
+            if line.startswith("--- ") and line.endswith(" ---"):
+                current = line[4:-4]
+            elif current is not None:
+                entities[current].add(line)
+    adjacency = defaultdict(list)
+    with open(os.path.join(directory, "relationships.txt"), encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("--- "):
+                continue
+            subj, pred, obj = ast.literal_eval(line)
+            adjacency[subj.casefold()].append((subj, pred, obj))
+            adjacency[obj.casefold()].append((subj, pred, obj))
+    return entities, adjacency
+
+
+def _proc_status_kb(field):
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def current_rss_kb():
+    return _proc_status_kb("VmRSS")
+
+
+def peak_rss_kb():
+    # VmHWM starts fresh after exec, unlike ru_maxrss which keeps the parent's peak
+    return _proc_status_kb("VmHWM")
+
+
+def child(kind, path, names_path, lookups):
+    # Runs in a fresh interpreter so RSS numbers are not polluted by the writer
+    with open(names_path, encoding="utf-8") as f:
+        names = json.load(f)
+    rng = random.Random(1)
+    queries = [rng.choice(names) for _ in range(lookups)]
+    rss_before = current_rss_kb()
+    start = time.perf_counter()
+    if kind == "text":
+        _, adjacency = load_text_graph(path)
+        lookup = lambda name: adjacency.get(name.casefold(), [])
+    else:
+        store = KnowledgeGraphStore.open(path)
+        lookup = lambda name: [edge for node in store.find(name) for edge in store.neighbors(node)]
+    load_seconds = time.perf_counter() - start
+    rss_after_load = current_rss_kb()
+
+    start = time.perf_counter()
+    edges = sum(len(lookup(name)) for name in queries)
+    lookup_seconds = time.perf_counter() - start
+    print(json.dumps({
+        "load_seconds": load_seconds,
+        "load_rss_mb": (rss_after_load - rss_before) / 1024,
+        "peak_rss_mb": peak_rss_kb() / 1024,
+        "lookup_us": lookup_seconds / lookups * 1e6,
+        "edges_returned": edges,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Text files vs mmap graph.kg: load time and resident memory")
+    parser.add_argument("--triples", type=int, default=1_000_000)
+    parser.add_argument("--nodes", type=int, default=200_000)
+    parser.add_argument("--lookups", type=int, default=10_000)
+    parser.add_argument("--child", nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child[0], args.child[1], args.child[2], args.lookups)
+        return
+
+    entities, relationships, names = synthetic_graph(args.triples, args.nodes)
+    with tempfile.TemporaryDirectory() as tmp:
+        names_path = os.path.join(tmp, "names.json")
+        with open(names_path, "w", encoding="utf-8") as f:
+            json.dump(names, f)
+
+        start = time.perf_counter()
+        write_text_graph(tmp, entities, relationships)
+        text_write = time.perf_counter() - start
+        kg_path = os.path.join(tmp, "graph.kg")
+        start = time.perf_counter()
+        write_graph(kg_path, entities, relationships)
+        kg_write = time.perf_counter() - start
+        text_bytes = sum(os.path.getsize(os.path.join(tmp, name)) for name in ("entities.txt", "relationships.txt"))
+        del entities, relationships, names
+
+        print(f"{args.triples} triples over {args.nodes} nodes")
+        for kind, path, write_seconds, size in (("text", tmp, text_write, text_bytes),
+                                                ("kg", kg_path, kg_write, os.path.getsize(kg_path))):
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--lookups", str(args.lookups),
+                 "--child", kind, path, names_path],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            result = json.loads(output)
+            print(f"{kind:>4}: write {write_seconds:7.2f}s  size {size / 2**20:8.1f} MB  "
+                  f"load {result['load_seconds']:7.3f}s  load RSS {result['load_rss_mb']:8.1f} MB  "
+                  f"peak RSS {result['peak_rss_mb']:8.1f} MB  lookup {result['lookup_us']:7.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import os
+import sys
+# Allow running as `python benchmarks/query_bench.py` from BACKEND
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import argparse
+import random
+import tempfile
+import time
+from collections import defaultdict
+
+from corpus import SATELLITES, ORGS, PRODUCTS as TOPICS
+from kg_store import write_graph, GRAPH_FILE
+from query_engine import QueryEngine
+from search_index import build_index, INDEX_FILE
+
+
+def synthetic_documents(docs, words_per_doc, vocabulary, seed=0):
+    # Zipf-ish vocabulary so posting-list lengths look like natural text
+    rng = random.Random(seed)
+    vocab = [f"term{i}" for i in range(vocabulary)]
+    weights = [1.0 / (rank + 1) for rank in range(vocabulary)]
+    for i in range(docs):
+        topic, satellite, org = rng.choice(TOPICS), rng.choice(SATELLITES), rng.choice(ORGS)
+        filler = rng.choices(vocab, weights, k=words_per_doc)
+        text = (f"Title: {satellite} {topic} product {i}\n\n"
+                f"The {satellite} {topic} product is generated by {org}. " + " ".join(filler))
+        yield f"page_{i}.txt", text
+
+
+def synthetic_graph(seed=0):
+    rng = random.Random(seed)
+    entities = defaultdict(set)
+    relationships = defaultdict(list)
+    entities["PRODUCT"].update(SATELLITES)
+    entities["ORG"].update(ORGS)
+    for satellite in SATELLITES:
+        relationships["general"].append((satellite, "PRODUCED_BY", rng.choice(ORGS)))
+    return entities, relationships
+
+
+def synthetic_queries(count, seed=1):
+    rng = random.Random(seed)
+    templates = [
+        "What is the {topic} product from {satellite}?",
+        "How do I download {satellite} {topic} data?",
+        "Which organisation provides {topic}?",
+        "Tell me about {satellite}",
+        "{topic} over the Bay of Bengal",
+    ]
+    return [rng.choice(templates).format(topic=rng.choice(TOPICS), satellite=rng.choice(SATELLITES))
+            for _ in range(count)]
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="QueryEngine latency over a synthetic corpus")
+    parser.add_argument("--docs", type=int, default=10_000)
+    parser.add_argument("--words", type=int, default=300, help="Words per document")
+    parser.add_argument("--vocabulary", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=2_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as kg_dir:
+        start = time.perf_counter()
+        build_index(synthetic_documents(args.docs, args.words, args.vocabulary), os.path.join(kg_dir, INDEX_FILE))
+        index_seconds = time.perf_counter() - start
+        write_graph(os.path.join(kg_dir, GRAPH_FILE), *synthetic_graph())
+
+        engine = QueryEngine(kg_dir)
+        queries = synthetic_queries(args.queries)
+        for query in queries[:50]:
+            engine.answer(query)  # warm the page cache
+        latencies = []
+        for query in queries:
+            start = time.perf_counter()
+            engine.answer(query)
+            latencies.append((time.perf_counter() - start) * 1000)
+        chunks = engine.index.chunk_count
+        engine.close()
+
+    print(f"documents: {args.docs}  chunks: {chunks}  index build: {index_seconds:.1f}s")
+    print(f"queries: {len(latencies)}  p50 {percentile(latencies, 0.50):.2f} ms  "
+          f"p99 {percentile(latencies, 0.99):.2f} ms  max {max(latencies):.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
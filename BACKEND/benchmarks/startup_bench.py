@@ -0,0 +1,96 @@
+import os
+import sys
+# Allow running as `python benchmarks/startup_bench.py` from BACKEND
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import argparse
+import json
+import subprocess
+import tempfile
+
+# Each scenario runs in a fresh interpreter so import time and RSS are not
+# shared between them. "eager" imports what app.py used to import at module
+# load (plus spacy.load), for comparison with the lazy app.
+
+HEAVY_MODULES = ["playwright.async_api", "lxml", "PyPDF2", "docx", "openpyxl", "spacy", "numpy"]
+
+CHILD = r"""
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {backend_dir!r})
+{body}
+elapsed = import_end - start
+status = {{}}
+with open("/proc/self/status") as f:
+    for line in f:
+        if line.startswith(("VmRSS:", "VmHWM:")):
+            status[line.split(":")[0]] = int(line.split()[1]) / 1024
+print(json.dumps({{
+    "import_seconds": round(elapsed, 3),
+    "first_request_ms": first_request_ms,
+    "rss_mb": round(status.get("VmRSS", 0), 1),
+    "peak_rss_mb": round(status.get("VmHWM", 0), 1),
+    "heavy_modules": [name for name in {heavy!r} if name in sys.modules],
+}}))
+"""
+
+APP_BODY = """
+import app
+import_end = time.perf_counter()
+client = app.app.test_client()
+request_start = time.perf_counter()
+client.get("/api/health")
+client.post("/api/chat", json={"query": "INSAT-3D"})
+first_request_ms = round((time.perf_counter() - request_start) * 1000, 2)
+"""
+
+EAGER_BODY = """
+import importlib
+for name in {heavy!r}:
+    try:
+        importlib.import_module(name)
+    except ImportError:
+        pass
+try:
+    import spacy
+    spacy.load("en_core_web_sm")
+except Exception:
+    pass
+import_end = time.perf_counter()
+first_request_ms = None
+"""
+
+
+def run_child(body, env_overrides, workdir):
+    code = CHILD.format(backend_dir=BACKEND_DIR, body=body, heavy=HEAVY_MODULES)
+    env = dict(os.environ, **env_overrides)
+    result = subprocess.run([sys.executable, "-c", code], cwd=workdir, env=env,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="app.py import time and memory, lazy vs preloaded vs eager")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per scenario (best import time is kept)")
+    parser.add_argument("--preload", default="scraper",
+                        help="PRELOAD_COMPONENTS for the preload scenario (add 'kg' if en_core_web_sm is installed)")
+    args = parser.parse_args()
+
+    scenarios = [
+        ("lazy app", APP_BODY, {"PRELOAD_COMPONENTS": ""}),
+        (f"preload={args.preload}", APP_BODY, {"PRELOAD_COMPONENTS": args.preload}),
+        ("eager imports", EAGER_BODY.format(heavy=HEAVY_MODULES), {}),
+    ]
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, body, env in scenarios:
+            runs = [run_child(body, env, workdir) for _ in range(args.runs)]
+            best = min(runs, key=lambda run: run["import_seconds"])
+            first_request = f"{best['first_request_ms']} ms" if best["first_request_ms"] is not None else "n/a"
+            print(f"{name:<24} import {best['import_seconds']:.3f}s  rss {best['rss_mb']:.1f} MB  "
+                  f"peak {best['peak_rss_mb']:.1f} MB  first request {first_request}  "
+                  f"heavy modules: {', '.join(best['heavy_modules']) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+import os
+import sys
+# Allow running as `python benchmarks/suite.py` from BACKEND
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+import argparse
+import asyncio
+import contextlib
+import json
+import platform
+import resource
+import subprocess
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+# Offline benchmark suite: crawl a local fixture site, build the knowledge
+# graph from a synthetic corpus, answer the recorded query set. Each stage
+# runs in its own interpreter so its peak RSS is its own; the results are
+# written as one JSON report for tracking regressions between versions:
+#
+#   python benchmarks/suite.py --preset small --output bench.json
+#   python benchmarks/suite.py --preset small --baseline bench.json   # exit 1 on regression
+#
+# Corpora are generated once under --data-dir and reused (see corpus.py).
+
+REPORT_FORMAT = 1
+STAGES = ("crawl", "build", "query")
+PRESETS = {
+    # crawl pages, corpus documents
+    "small": {"pages": 1_000, "docs": 1_000},
+    "medium": {"pages": 10_000, "docs": 10_000},
+    "large": {"pages": 10_000, "docs": 100_000},
+}
+QUERIES_FILE = os.path.join(BENCH_DIR, "queries.jsonl")
+# Report fields compared against a baseline: (stage, field, True if higher is better)
+TRACKED = [
+    ("crawl", "pages_per_second", True),
+    ("crawl", "peak_rss_mb", False),
+    ("build", "docs_per_second", True),
+    ("build", "peak_rss_mb", False),
+    ("query", "p50_ms", False),
+    ("query", "p99_ms", False),
+    ("query", "peak_rss_mb", False),
+]
+
+
+def _peak_rss():
+    # ru_maxrss is in KiB on Linux
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    return {"peak_rss_mb": round(own, 1), "peak_rss_children_mb": round(children, 1)}
+
+
+@contextlib.contextmanager
+def _quiet():
+    # The crawler and builder report progress with print()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+# ---- Stages (run in a child interpreter) ----
+
+def run_crawl(params):
+    from source_modules import load_scraper_module
+    from doc_store import DocumentStore
+
+    scraper_module = load_scraper_module()
+    with tempfile.TemporaryDirectory() as output_dir:
+        scraper = scraper_module.MOSDACScraper(params["base_url"], output_dir=output_dir, max_depth=params["max_depth"],
+                                               workers=params["workers"])
+        start = time.perf_counter()
+        with _quiet():
+            asyncio.run(scraper.scrape(params["base_url"] + "/page/0"))
+        elapsed = time.perf_counter() - start
+        with DocumentStore(output_dir) as store:
+            stats = store.stats()
+    return {
+        "pages": scraper.pages_crawled,
+        "expected_pages": params["expected_pages"] + params["expected_attachments"],
+        "attachments_extracted": scraper.files_extracted,
+        "fetch_tiers": dict(scraper.tier_counts),
+        "documents_stored": stats["documents"],
+        "stored_bytes": stats["stored_bytes"],
+        "seconds": round(elapsed, 3),
+        "pages_per_second": round(scraper.pages_crawled / elapsed, 2),
+    }
+
+
+def run_build(params):
+    from source_modules import load_kg_builder_module
+
+    kg_module = load_kg_builder_module()
+    try:
+        kg_module.load_nlp()
+    except OSError as e:
+        return {"error": f"spaCy model unavailable: {e}"}
+    with tempfile.TemporaryDirectory() as kg_dir:
+        builder = kg_module.KnowledgeGraphBuilder(params["corpus_dir"], kg_dir, batch_size=params["batch_size"],
+                                                  n_process=params["n_process"])
+        start = time.perf_counter()
+        with _quiet():
+            builder.build_graph(semantic=params["semantic"])
+        elapsed = time.perf_counter() - start
+    stage_seconds = {}
+    for suffix, labels, value in kg_module.STAGE_SECONDS.samples():
+        if suffix == "_sum":
+            stage_seconds[dict(labels)["stage"]] = round(value, 3)
+    return {
+        "documents": builder.files_processed,
+        "entities": sum(len(ents) for ents in builder.entities.values()),
+        "relationships": sum(len(rels) for rels in builder.relationships.values()),
+        "seconds": round(elapsed, 3),
+        "docs_per_second": round(builder.files_processed / elapsed, 2),
+        "ner_docs_per_second": round(kg_module.NER_RATE.value(), 2),
+        "stage_seconds": stage_seconds,
+    }
+
+
+def _corpus_graph(docs, paragraphs):
+    # Graph with the corpus's entity vocabulary and one product node per
+    # generated product id, so graph lookups scale with the corpus
+    from corpus import SATELLITES, ORGS, PLACES, PEOPLE, product_id
+    entities = defaultdict(set)
+    relationships = defaultdict(list)
+    entities["PRODUCT"].update(SATELLITES)
+    entities["ORG"].update(ORGS)
+    entities["GPE"].update(PLACES)
+    entities["PERSON"].update(PEOPLE)
+    for i, satellite in enumerate(SATELLITES):
+        relationships["general"].append((satellite, "PRODUCED_BY", ORGS[i % len(ORGS)]))
+    for doc_id in range(docs):
+        for n in range(paragraphs):
+            product = product_id(doc_id, n)
+            entities["PRODUCT"].add(product)
+            relationships["general"].append((product, "ARCHIVED_AT", ORGS[(doc_id + n) % len(ORGS)]))
+    return entities, relationships
+
+
+def run_query(params):
+    from answer_cache import AnswerCache
+    from chat_batch import parse_queries, percentile
+    from chatbot import MOSDACChatbot
+    from doc_store import DocumentStore
+    from kg_store import write_graph, GRAPH_FILE
+    from search_index import build_index, INDEX_FILE
+
+    with open(params["queries_file"], "r", encoding="utf-8") as f:
+        queries = [query for query, _ in parse_queries(f)]
+    with tempfile.TemporaryDirectory() as kg_dir:
+        start = time.perf_counter()
+        with DocumentStore(params["corpus_dir"]) as store:
+            build_index(store.iter_documents(), os.path.join(kg_dir, INDEX_FILE))
+            if params["semantic"]:
+                from vector_index import build_vector_index
+                build_vector_index(store.iter_documents, kg_dir)
+        write_graph(os.path.join(kg_dir, GRAPH_FILE), *_corpus_graph(params["docs"], params["paragraphs"]))
+        index_seconds = time.perf_counter() - start
+
+        # No answer cache: every query does the full retrieval
+        chatbot = MOSDACChatbot(kg_dir, cache=AnswerCache(max_size=0))
+        for query in queries[:params["warmup"]]:
+            chatbot.answer_query(query)
+        latencies = []
+        start = time.perf_counter()
+        for _ in range(params["rounds"]):
+            for query in queries:
+                query_start = time.perf_counter()
+                chatbot.answer_query(query)
+                latencies.append((time.perf_counter() - query_start) * 1000)
+        elapsed = time.perf_counter() - start
+        chatbot.engine.close()
+    return {
+        "queries": len(latencies),
+        "index_seconds": round(index_seconds, 3),
+        "p50_ms": round(percentile(latencies, 0.50), 3),
+        "p90_ms": round(percentile(latencies, 0.90), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+        "max_ms": round(max(latencies), 3),
+        "queries_per_second": round(len(latencies) / elapsed, 1),
+    }
+
+
+STAGE_RUNNERS = {"crawl": run_crawl, "build": run_build, "query": run_query}
+
+
+def _run_stage_child(name, params, result_file):
+    try:
+        result = STAGE_RUNNERS[name](params)
+    except Exception as e:
+        result = {"error": f"{type(e).__name__}: {e}"}
+    result.update(_peak_rss())
+    with open(result_file, "w", encoding="utf-8") as f:
+        json.dump(result, f)
+
+
+def run_stage(name, params):
+    # Runs one stage in a fresh interpreter; returns its result dict
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
+        result_file = f.name
+    try:
+        completed = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--run-stage", name,
+             "--stage-params", json.dumps(params), "--result-file", result_file],
+            cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        try:
+            with open(result_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {"error": f"stage exited with {completed.returncode}: {completed.stderr.strip()[-500:]}"}
+    finally:
+        if os.path.exists(result_file):
+            os.remove(result_file)
+
+
+# ---- Report ----
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report, baseline, tolerance):
+    # [(stage, field, old, new, change, regressed)] for fields in both reports
+    rows = []
+    for stage, field, higher_is_better in TRACKED:
+        old = baseline.get("results", {}).get(stage, {}).get(field)
+        new = report["results"].get(stage, {}).get(field)
+        if not isinstance(old, (int, float)) or not isinstance(new, (int, float)) or not old:
+            continue
+        change = (new - old) / old
+        regressed = change < -tolerance if higher_is_better else change > tolerance
+        rows.append((stage, field, old, new, change, regressed))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline crawl / graph build / query benchmark suite")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="small")
+    parser.add_argument("--stages", default=",".join(STAGES))
+    parser.add_argument("--pages", type=int, help="Fixture site pages (overrides the preset)")
+    parser.add_argument("--docs", type=int, help="Corpus documents (overrides the preset)")
+    parser.add_argument("--fanout", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=8, help="Crawl workers")
+    parser.add_argument("--latency", type=float, default=0.0, help="Fixture server delay per request, seconds")
+    parser.add_argument("--paragraphs", type=int, default=5, help="Paragraphs per corpus document")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--n-process", type=int, default=1)
+    parser.add_argument("--no-semantic", action="store_true", help="Skip the vector index in build and query")
+    parser.add_argument("--queries", default=QUERIES_FILE, help="Recorded query set (JSONL, chat_batch format)")
+    parser.add_argument("--rounds", type=int, default=5, help="Passes over the query set")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-dir", default=os.path.join(BENCH_DIR, ".data"), help="Where corpora are kept")
+    parser.add_argument("--output", help="Write the JSON report here (default: stdout)")
+    parser.add_argument("--baseline", help="Earlier report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative regression")
+    # Internal: run one stage in this process
+    parser.add_argument("--run-stage", choices=STAGES, help=argparse.SUPPRESS)
+    parser.add_argument("--stage-params", help=argparse.SUPPRESS)
+    parser.add_argument("--result-file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_stage:
+        _run_stage_child(args.run_stage, json.loads(args.stage_params), args.result_file)
+        return
+
+    from corpus import write_corpus
+    from fixture_site import FixtureSite
+
+    preset = PRESETS[args.preset]
+    pages = args.pages or preset["pages"]
+    docs = args.docs or preset["docs"]
+    stages = [stage.strip() for stage in args.stages.split(",") if stage.strip()]
+    semantic = not args.no_semantic
+    corpus_dir = os.path.join(args.data_dir, f"corpus-{docs}-p{args.paragraphs}-s{args.seed}")
+
+    report = {
+        "format": REPORT_FORMAT,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "params": {"preset": args.preset, "pages": pages, "docs": docs, "fanout": args.fanout,
+                   "workers": args.workers, "latency": args.latency, "paragraphs": args.paragraphs,
+                   "batch_size": args.batch_size, "n_process": args.n_process, "semantic": semantic,
+                   "queries": os.path.basename(args.queries), "rounds": args.rounds, "seed": args.seed},
+        "results": {},
+    }
+
+    if "build" in stages or "query" in stages:
+        print(f"Preparing corpus of {docs} documents in {corpus_dir}", file=sys.stderr)
+        report["corpus"] = write_corpus(corpus_dir, docs, args.paragraphs, seed=args.seed)
+
+    for stage in stages:
+        print(f"Running {stage} stage", file=sys.stderr)
+        if stage == "crawl":
+            site = FixtureSite(pages, args.fanout, seed=args.seed)
+            server = site.serve(latency=args.latency)
+            expected_pages, expected_attachments = site.expected()
+            try:
+                params = {"base_url": f"http://127.0.0.1:{server.server_address[1]}", "workers": args.workers,
+                          "max_depth": pages, "expected_pages": expected_pages,
+                          "expected_attachments": expected_attachments}
+                report["results"]["crawl"] = run_stage("crawl", params)
+            finally:
+                server.shutdown()
+        elif stage == "build":
+            report["results"]["build"] = run_stage("build", {
+                "corpus_dir": corpus_dir, "batch_size": args.batch_size, "n_process": args.n_process,
+                "semantic": semantic})
+        elif stage == "query":
+            report["results"]["query"] = run_stage("query", {
+                "corpus_dir": corpus_dir, "docs": docs, "paragraphs": args.paragraphs, "semantic": semantic,
+                "queries_file": os.path.abspath(args.queries), "rounds": args.rounds, "warmup": 20})
+        else:
+            parser.error(f"Unknown stage: {stage}")
+        print(f"  {json.dumps(report['results'][stage])}", file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("params") != report["params"]:
+            print("Warning: baseline was run with different parameters", file=sys.stderr)
+        rows = compare(report, baseline, args.tolerance)
+        for stage, field, old, new, change, regressed in rows:
+            print(f"{stage:<6} {field:<18} {old:>12} -> {new:<12} {change:+7.1%}{'  REGRESSION' if regressed else ''}",
+                  file=sys.stderr)
+        if any(row[-1] for row in rows):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
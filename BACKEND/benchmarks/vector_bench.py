@@ -0,0 +1,68 @@
+import os
+import sys
+# Allow running as `python benchmarks/vector_bench.py` from BACKEND
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from query_bench import synthetic_documents, synthetic_queries, percentile
+from vector_index import VectorIndex, build_vector_index, load_embedder, VECTOR_FILE
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vector index build, incremental rebuild and query latency")
+    parser.add_argument("--docs", type=int, default=10_000)
+    parser.add_argument("--words", type=int, default=300, help="Words per document")
+    parser.add_argument("--vocabulary", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=1_000)
+    parser.add_argument("--changed", type=float, default=0.01, help="Fraction of documents changed before the rebuild")
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    documents = list(synthetic_documents(args.docs, args.words, args.vocabulary))
+    changed = set(range(0, args.docs, max(1, int(1 / args.changed)))) if args.changed else set()
+    edited = [(source, text + " revised" if i in changed else text) for i, (source, text) in enumerate(documents)]
+
+    with tempfile.TemporaryDirectory() as kg_dir:
+        start = time.perf_counter()
+        build_vector_index(lambda: iter(documents), kg_dir)
+        full_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        _, embedded, reused = build_vector_index(lambda: iter(edited), kg_dir)
+        incremental_seconds = time.perf_counter() - start
+
+        index = VectorIndex.open(os.path.join(kg_dir, VECTOR_FILE))
+        embedder = load_embedder(kg_dir)
+        queries = synthetic_queries(args.queries)
+        for query in queries[:50]:
+            index.search(embedder.embed([query])[0], args.k)  # warm the page cache
+        latencies, recalls = [], []
+        vectors = index.codes.astype(np.float32) * index.scales[:, None]
+        for query in queries:
+            start = time.perf_counter()
+            query_vector = embedder.embed([query])[0]
+            hits = index.search(query_vector, args.k)
+            latencies.append((time.perf_counter() - start) * 1000)
+            # Recall of the IVF probe against an exhaustive scan of the same vectors
+            exact = set(np.argsort(-(vectors @ query_vector))[:args.k].tolist())
+            if exact:
+                recalls.append(len(exact & {row for row, _ in hits}) / len(exact))
+        rows, nlist = index.row_count, index.nlist
+        size_mb = os.path.getsize(os.path.join(kg_dir, VECTOR_FILE)) / 1e6
+        del vectors
+        index.close()
+        embedder.close()
+
+    print(f"documents: {args.docs}  passages: {rows}  lists: {nlist}  vectors.idx: {size_mb:.1f} MB")
+    print(f"full build: {full_seconds:.1f}s  incremental ({embedded} changed, {reused} reused): "
+          f"{incremental_seconds:.1f}s")
+    print(f"queries: {len(latencies)}  p50 {percentile(latencies, 0.50):.2f} ms  "
+          f"p99 {percentile(latencies, 0.99):.2f} ms  recall@{args.k} {sum(recalls) / max(1, len(recalls)):.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import argparse
+import json
+import sys
+import time
+
+# Bulk question answering for QA regression runs after a knowledge-graph
+# rebuild, and a load benchmark for MOSDACChatbot. Used by /api/chat/batch
+# and as a CLI:
+#   python chat_batch.py questions.jsonl [--kg-dir knowledge_graph] [--output results.jsonl]
+# Input lines are either a JSON string or an object with a "query" field
+# (any other fields, e.g. "id" or "expected", are copied to the result).
+
+
+def parse_queries(lines):
+    # [(query, extra fields), ...] from JSONL lines
+    queries = []
+    for line_no, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            item = json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"Line {line_no}: invalid JSON ({e})")
+        queries.append(_query_item(item, line_no))
+    return queries
+
+
+def queries_from_list(items):
+    return [_query_item(item, i) for i, item in enumerate(items, 1)]
+
+
+def _query_item(item, position):
+    if isinstance(item, str):
+        return item, {}
+    if isinstance(item, dict) and isinstance(item.get("query"), str):
+        return item["query"], {key: value for key, value in item.items() if key != "query"}
+    raise ValueError(f"Item {position}: expected a string or an object with a 'query' string")
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run_batch(chatbot, queries):
+    # Yields {"type": "result", "index": i, ...} per query in input order,
+    # then one {"type": "summary", ...} with throughput and latency figures
+    start = time.perf_counter()
+    latencies = []
+    cached = 0
+    responses = chatbot.answer_batch([query for query, _ in queries])
+    for index, ((_, extra), response) in enumerate(zip(queries, responses)):
+        if response.get("cached"):
+            cached += 1
+        else:
+            latencies.append(response["latency_ms"])
+        yield dict(extra, type="result", index=index, **response)
+    elapsed = time.perf_counter() - start
+    summary = {
+        "type": "summary",
+        "queries": len(queries),
+        "cached": cached,
+        "total_seconds": round(elapsed, 3),
+        "queries_per_second": round(len(queries) / elapsed, 1) if elapsed > 0 else None,
+    }
+    if latencies:
+        summary["latency_ms"] = {
+            "p50": percentile(latencies, 0.50),
+            "p90": percentile(latencies, 0.90),
+            "p99": percentile(latencies, 0.99),
+            "max": max(latencies),
+        }
+    yield summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Answer a JSONL file of questions with MOSDACChatbot")
+    parser.add_argument("queries", help="JSONL file of questions, or - for stdin")
+    parser.add_argument("--kg-dir", default="knowledge_graph")
+    parser.add_argument("--output", help="Write results as JSONL here (default: stdout)")
+    parser.add_argument("--no-cache", action="store_true", help="Answer every query, even repeated ones")
+    args = parser.parse_args()
+
+    from chatbot import MOSDACChatbot
+    from answer_cache import AnswerCache
+
+    if args.queries == "-":
+        queries = parse_queries(sys.stdin)
+    else:
+        with open(args.queries, "r", encoding="utf-8") as f:
+            queries = parse_queries(f)
+    cache = AnswerCache(max_size=0) if args.no_cache else None
+    chatbot = MOSDACChatbot(args.kg_dir, cache=cache)
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        for event in run_batch(chatbot, queries):
+            if event["type"] == "summary":
+                print(json.dumps(event), file=sys.stderr)
+            else:
+                out.write(json.dumps(event) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import os
+import time
+from query_engine import QueryEngine
+from answer_cache import AnswerCache, cache_backend_from_url
+from metrics import Histogram
+
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+QUERY_SECONDS = Histogram("chat_query_seconds", "Server-side time to answer one query", ["mode", "cached"],
+                          buckets=QUERY_BUCKETS)
+
+
+def cache_hit(cached, query, start):
+    # A cached answer as returned for this request, timed from start
+    return dict(cached, query=query, cached=True, latency_ms=round((time.perf_counter() - start) * 1000, 3))
+
+
+class MOSDACChatbot:
+
+    def __init__(self, kg_dir="knowledge_graph", cache=None):
+        self.kg_dir = kg_dir
+        self.engine = QueryEngine(kg_dir)
+        self.cache = cache if cache is not None else AnswerCache(
+            max_size=int(os.getenv('CHAT_CACHE_SIZE', 1024)),
+            ttl=float(os.getenv('CHAT_CACHE_TTL', 300)),
+            backend=cache_backend_from_url(os.getenv('CHAT_CACHE_BACKEND')),
+        )
+
+    def _load_knowledge_graph(self):
+        # graph.kg and search.idx are memory-mapped: no text parsing, and pages
+        # are only read from disk when a lookup touches them
+        self.engine.load()
+
+    def reload(self):
+        # Called after a knowledge-graph build; cache keys carry the graph
+        # version, so the new build can never be answered from old entries
+        self._load_knowledge_graph()
+        self.cache.invalidate()
+
+    def answer_query(self, query):
+        start = time.perf_counter()
+        self.engine.refresh_if_changed()
+        version = self.engine.version
+        cached = self.cache.get(query, version)
+        if cached is not None:
+            response = cache_hit(cached, query, start)
+            QUERY_SECONDS.observe(response["latency_ms"] / 1000, mode="answer", cached="true")
+            return response
+        response = self.engine.answer(query)
+        self.cache.put(query, version, response)
+        QUERY_SECONDS.observe(time.perf_counter() - start, mode="answer", cached="false")
+        return response
+
+    def answer_batch(self, queries):
+        # answer_query for many queries, yielded in order; cache misses are
+        # answered together by QueryEngine.answer_batch
+        self.engine.refresh_if_changed()
+        version = self.engine.version
+        responses = [None] * len(queries)
+        misses = []
+        for i, query in enumerate(queries):
+            start = time.perf_counter()
+            cached = self.cache.get(query, version)
+            if cached is not None:
+                responses[i] = cache_hit(cached, query, start)
+            else:
+                misses.append(i)
+        answers = self.engine.answer_batch([queries[i] for i in misses])
+        for i in range(len(queries)):
+            if responses[i] is None:
+                responses[i] = next(answers)
+                self.cache.put(queries[i], version, responses[i])
+                QUERY_SECONDS.observe(responses[i]["latency_ms"] / 1000, mode="batch", cached="false")
+            yield responses[i]
+            responses[i] = None
+
+    def stream_query(self, query):
+        # QueryEngine.stream events; "done" also carries the server-side
+        # time to the first event and the total time, both in ms
+        start = time.perf_counter()
+        first_event_ms = None
+        for event in self._stream_events(query):
+            elapsed_ms = round((time.perf_counter() - start) * 1000, 3)
+            if first_event_ms is None:
+                first_event_ms = elapsed_ms
+            if event["type"] == "done":
+                event = dict(event, first_event_ms=first_event_ms, total_ms=elapsed_ms)
+                cached = "true" if event["response"].get("cached") else "false"
+                QUERY_SECONDS.observe(elapsed_ms / 1000, mode="stream", cached=cached)
+            yield event
+
+    def _stream_events(self, query):
+        start = time.perf_counter()
+        self.engine.refresh_if_changed()
+        version = self.engine.version
+        cached = self.cache.get(query, version)
+        if cached is not None:
+            response = cache_hit(cached, query, start)
+            yield {"type": "entities", "entities": response["entities"], "relationships": response["relationships"]}
+            yield {"type": "passages", "passages": response["passages"]}
+            yield {"type": "answer", "text": response["answer"]}
+            yield {"type": "done", "response": response}
+            return
+        for event in self.engine.stream(query):
+            if event["type"] == "done":
+                self.cache.put(query, version, event["response"])
+            yield event
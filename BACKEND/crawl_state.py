@@ -0,0 +1,134 @@
+import hashlib
+import json
+import sqlite3
+import time
+from urllib.parse import urlparse, urlunparse
+
+
+def normalize_url(url):
+    # Manifest key: scheme/host are case-insensitive, fragments never reach the server
+    parsed = urlparse(url)
+    return urlunparse((parsed.scheme.lower(), parsed.netloc.lower(), parsed.path or "/",
+                       parsed.params, parsed.query, ""))
+
+
+def _validators(headers):
+    # aiohttp headers are case-insensitive, Playwright's are lower-cased dicts
+    headers = {k.lower(): v for k, v in (headers or {}).items()}
+    return headers.get("etag"), headers.get("last-modified")
+
+
+def content_hash(data):
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+class CrawlManifest:
+    # Persistent per-URL crawl state: validators for conditional requests, a
+    # content hash, the depth it was found at, the tier that fetched it
+    # (static, browser or file), the files written for it and its outgoing
+    # links (so unchanged pages can still feed the frontier).
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                start_url TEXT NOT NULL,
+                started_at REAL NOT NULL,
+                finished_at REAL
+            );
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                content_hash TEXT,
+                depth INTEGER,
+                outputs TEXT NOT NULL DEFAULT '[]',
+                links TEXT NOT NULL DEFAULT '[]',
+                fetched_at REAL,
+                run_id INTEGER,
+                tier TEXT
+            );
+        """)
+        columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(pages)")}
+        if "tier" not in columns:  # manifests written before tiers were recorded
+            self.conn.execute("ALTER TABLE pages ADD COLUMN tier TEXT")
+        self.conn.commit()
+        self.run_id = None
+
+    def start_run(self, start_url, resume=False):
+        # Resuming reuses the newest unfinished run for this start URL, so every
+        # page it already recorded is skipped without touching the network.
+        if resume:
+            row = self.conn.execute(
+                "SELECT id FROM runs WHERE start_url = ? AND finished_at IS NULL ORDER BY id DESC LIMIT 1",
+                (start_url,),
+            ).fetchone()
+            if row is not None:
+                self.run_id = row["id"]
+                print(f"Resuming crawl run {self.run_id} for {start_url}")
+                return self.run_id
+        cursor = self.conn.execute("INSERT INTO runs (start_url, started_at) VALUES (?, ?)",
+                                   (start_url, time.time()))
+        self.conn.commit()
+        self.run_id = cursor.lastrowid
+        return self.run_id
+
+    def finish_run(self):
+        self.conn.execute("UPDATE runs SET finished_at = ? WHERE id = ?", (time.time(), self.run_id))
+        self.conn.commit()
+
+    def get(self, url):
+        row = self.conn.execute("SELECT * FROM pages WHERE url = ?", (normalize_url(url),)).fetchone()
+        if row is None:
+            return None
+        record = dict(row)
+        record["outputs"] = json.loads(record["outputs"])
+        record["links"] = json.loads(record["links"])
+        return record
+
+    def seen_this_run(self, record):
+        return record is not None and record["run_id"] == self.run_id
+
+    def conditional_headers(self, record):
+        headers = {}
+        if record is not None:
+            if record["etag"]:
+                headers["If-None-Match"] = record["etag"]
+            if record["last_modified"]:
+                headers["If-Modified-Since"] = record["last_modified"]
+        return headers
+
+    def record(self, url, depth, digest, outputs, links=(), response_headers=None, tier=None):
+        etag, last_modified = _validators(response_headers)
+        self.conn.execute(
+            """INSERT INTO pages (url, etag, last_modified, content_hash, depth, outputs, links, fetched_at, run_id, tier)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT(url) DO UPDATE SET
+                   etag = excluded.etag, last_modified = excluded.last_modified,
+                   content_hash = excluded.content_hash, depth = excluded.depth,
+                   outputs = excluded.outputs, links = excluded.links,
+                   fetched_at = excluded.fetched_at, run_id = excluded.run_id, tier = excluded.tier""",
+            (normalize_url(url), etag, last_modified, digest, depth, json.dumps(list(outputs)),
+             json.dumps(list(links)), time.time(), self.run_id, tier),
+        )
+        self.conn.commit()
+
+    def mark_unchanged(self, url, depth, response_headers=None):
+        # A 304 or identical body: keep outputs/links, refresh validators if sent
+        etag, last_modified = _validators(response_headers)
+        self.conn.execute(
+            """UPDATE pages SET etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified),
+                   depth = MIN(depth, ?), fetched_at = ?, run_id = ?
+               WHERE url = ?""",
+            (etag, last_modified, depth, time.time(), self.run_id, normalize_url(url)),
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,349 @@
+import gzip
+import hashlib
+import os
+import re
+import sqlite3
+import time
+from collections import namedtuple
+from urllib.parse import quote
+
+try:
+    import zstandard
+except ImportError:  # blobs are gzip-compressed instead
+    zstandard = None
+
+# Content-addressed store for everything the scraper extracts. Each distinct
+# text is written once, compressed, as blobs/<aa>/<sha256>.zst (.gz without
+# the zstandard package); documents.sqlite maps (url, kind) to the blob that
+# holds it. Query-string variants and mirrors with identical text share one
+# blob, and page texts whose SimHash is within NEAR_DUPLICATE_BITS of a
+# stored one are pointed at that blob instead of getting their own, so
+# boilerplate-identical pages are stored and NLP-processed once.
+#
+# Consumers iterate distinct blobs (documents / iter_documents) instead of
+# walking the directory. Loose .txt files under the root (older crawls, or
+# files dropped in by hand) are picked up by import_files.
+#
+# documents.sqlite uses a rollback journal, which works on shared network
+# filesystems. A crawl opens it with wal=True for its stream of small writes
+# and switches it back when it closes. Readers that may run on other hosts
+# (the sharded graph build's map and merge phases) open it read_only: no
+# pragmas and no schema statements, so they need no write access either.
+
+INDEX_FILE = "documents.sqlite"
+BLOB_DIR = "blobs"
+
+KIND_TEXT = "text"
+KIND_TABLES = "tables"
+KIND_HTML = "html"
+DOCUMENT_KINDS = (KIND_TEXT, KIND_TABLES)   # what the graph and index builds read
+NEAR_DUPLICATE_KINDS = (KIND_TEXT,)         # table values matter; tables dedupe exactly only
+
+SIMHASH_BITS = 64
+SIMHASH_BANDS = 4                           # NEAR_DUPLICATE_BITS < SIMHASH_BANDS, so any
+NEAR_DUPLICATE_BITS = 3                     # near duplicate shares at least one whole band
+SHINGLE_WORDS = 3
+MIN_SIMHASH_WORDS = 50                      # short pages differ in too few shingles to compare
+SIMHASH_BLOCK = 1 << 16                     # shingle hashes unpacked to bits at a time
+ZSTD_LEVEL = 10
+GZIP_LEVEL = 6
+
+WORD_RE = re.compile(r"\w+")
+BAND_BITS = SIMHASH_BITS // SIMHASH_BANDS
+BAND_MASK = (1 << BAND_BITS) - 1
+
+StoredDocument = namedtuple("StoredDocument", ["digest", "kind", "name"])
+
+
+def text_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def simhash(text):
+    # 64-bit SimHash over word shingles; None for texts too short to compare
+    words = WORD_RE.findall(text.lower())
+    if len(words) < MIN_SIMHASH_WORDS:
+        return None
+    # Imported here: simhash runs in crawls and extraction workers, while
+    # chat workers import this module (via search_index) and never need NumPy
+    import numpy as np
+    count = len(words) - SHINGLE_WORDS + 1
+    hashes = np.unique(np.fromiter(
+        (int.from_bytes(hashlib.blake2b(" ".join(words[i:i + SHINGLE_WORDS]).encode("utf-8"),
+                                        digest_size=8).digest(), "little") for i in range(count)),
+        dtype=np.uint64, count=count))
+    # Majority vote per bit position: bit counts summed over blocks of hashes
+    # unpacked to one byte per bit (column j is bit j)
+    counts = np.zeros(SIMHASH_BITS, dtype=np.int64)
+    for start in range(0, len(hashes), SIMHASH_BLOCK):
+        block = hashes[start:start + SIMHASH_BLOCK].astype("<u8").view(np.uint8).reshape(-1, 8)
+        counts += np.unpackbits(block, axis=1, bitorder="little").sum(axis=0, dtype=np.int64)
+    bits = np.flatnonzero(counts > len(hashes) / 2)
+    return sum(1 << int(bit) for bit in bits)
+
+
+def _bands(value):
+    return [(band, value >> (band * BAND_BITS) & BAND_MASK) for band in range(SIMHASH_BANDS)]
+
+
+def _document_name(url, kind):
+    # Source name shown with passages: the page URL for its text
+    return url if kind == KIND_TEXT else f"{url}#{kind}"
+
+
+class DocumentStore:
+    def __init__(self, root, near_duplicates=True, read_only=False, wal=False):
+        self.root = root
+        self.near_duplicates = near_duplicates
+        self.wal = wal and not read_only
+        index_path = os.path.join(root, INDEX_FILE)
+        if read_only:
+            self.conn = sqlite3.connect(f"file:{quote(os.path.abspath(index_path))}?mode=ro", uri=True)
+            self.conn.row_factory = sqlite3.Row
+            return
+        os.makedirs(os.path.join(root, BLOB_DIR), exist_ok=True)
+        self.conn = sqlite3.connect(index_path)
+        self.conn.row_factory = sqlite3.Row
+        if self.wal:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS blobs (
+                hash TEXT PRIMARY KEY,
+                codec TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                stored_size INTEGER NOT NULL,
+                simhash TEXT
+            );
+            CREATE TABLE IF NOT EXISTS documents (
+                url TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                name TEXT NOT NULL,
+                hash TEXT NOT NULL,
+                blob TEXT NOT NULL,
+                updated_at REAL,
+                PRIMARY KEY (url, kind)
+            );
+            CREATE INDEX IF NOT EXISTS documents_blob ON documents (blob);
+            CREATE TABLE IF NOT EXISTS simhash_bands (
+                band INTEGER NOT NULL,
+                value INTEGER NOT NULL,
+                hash TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS simhash_bands_lookup ON simhash_bands (band, value);
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL
+            );
+        """)
+        self.conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        if self.wal:
+            # Back to a rollback journal (checkpointing the WAL) for readers
+            # on other hosts; left in WAL if another connection is still open
+            try:
+                self.conn.execute("PRAGMA busy_timeout=0")
+                self.conn.execute("PRAGMA journal_mode=DELETE")
+            except sqlite3.OperationalError:
+                pass
+        self.conn.close()
+
+    # ---- Writing ----
+
+    def blob_path(self, digest, codec=None):
+        if codec is None:
+            row = self.conn.execute("SELECT codec FROM blobs WHERE hash = ?", (digest,)).fetchone()
+            codec = row["codec"] if row is not None else ("zst" if zstandard is not None else "gz")
+        return os.path.join(self.root, BLOB_DIR, digest[:2], f"{digest}.{codec}")
+
+    def _write_blob(self, digest, text):
+        data = text.encode("utf-8")
+        if zstandard is not None:
+            codec, stored = "zst", zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+        else:
+            codec, stored = "gz", gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+        path = self.blob_path(digest, codec)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(stored)
+        os.replace(tmp_path, path)
+        return codec, len(data), len(stored)
+
+    def _near_duplicate(self, value, exclude=None):
+        # Closest stored blob within NEAR_DUPLICATE_BITS that a document uses,
+        # or None. exclude is the page's current blob: an edited page gets its
+        # new text stored rather than being matched to its own old text.
+        candidates = set()
+        for band, band_value in _bands(value):
+            rows = self.conn.execute("SELECT hash FROM simhash_bands WHERE band = ? AND value = ?",
+                                     (band, band_value))
+            candidates.update(row["hash"] for row in rows)
+        best, best_distance = None, NEAR_DUPLICATE_BITS + 1
+        for digest in sorted(candidates):
+            row = self.conn.execute("SELECT simhash FROM blobs WHERE hash = ?", (digest,)).fetchone()
+            if row is None or row["simhash"] is None or digest == exclude:
+                continue
+            if self.conn.execute("SELECT 1 FROM documents WHERE blob = ? LIMIT 1", (digest,)).fetchone() is None:
+                continue
+            distance = bin(int(row["simhash"], 16) ^ value).count("1")
+            if distance < best_distance:
+                best, best_distance = digest, distance
+        return best
+
+    def commit(self):
+        self.conn.commit()
+
+    def put(self, url, kind, text, name=None, commit=True, fingerprint=None):
+        # Stores text as url's document of this kind. Returns the digest of
+        # the blob that now holds it: its own hash, or that of an identical or
+        # near-duplicate text already in the store. Bulk loads can pass
+        # commit=False and call commit() every so often. fingerprint is
+        # simhash(text) when the caller already computed it off the crawl loop.
+        digest = text_hash(text)
+        row = self.conn.execute("SELECT hash, blob FROM documents WHERE url = ? AND kind = ?",
+                                (url, kind)).fetchone()
+        if row is not None and row["hash"] == digest:
+            return row["blob"]
+        blob = digest
+        if self.conn.execute("SELECT 1 FROM blobs WHERE hash = ?", (digest,)).fetchone() is None:
+            value = None
+            if self.near_duplicates and kind in NEAR_DUPLICATE_KINDS:
+                value = fingerprint if fingerprint is not None else simhash(text)
+            previous = row["blob"] if row is not None else None
+            duplicate_of = self._near_duplicate(value, previous) if value is not None else None
+            if duplicate_of is not None:
+                blob = duplicate_of
+            else:
+                codec, size, stored_size = self._write_blob(digest, text)
+                self.conn.execute("INSERT INTO blobs (hash, codec, size, stored_size, simhash) VALUES (?, ?, ?, ?, ?)",
+                                  (digest, codec, size, stored_size, None if value is None else f"{value:016x}"))
+                if value is not None:
+                    self.conn.executemany("INSERT INTO simhash_bands (band, value, hash) VALUES (?, ?, ?)",
+                                          [(band, band_value, digest) for band, band_value in _bands(value)])
+        self.conn.execute(
+            """INSERT INTO documents (url, kind, name, hash, blob, updated_at) VALUES (?, ?, ?, ?, ?, ?)
+               ON CONFLICT(url, kind) DO UPDATE SET
+                   name = excluded.name, hash = excluded.hash, blob = excluded.blob,
+                   updated_at = excluded.updated_at""",
+            (url, kind, name or _document_name(url, kind), digest, blob, time.time()),
+        )
+        if commit:
+            self.conn.commit()
+        return blob
+
+    def remove(self, url, kind=None):
+        if kind is None:
+            self.conn.execute("DELETE FROM documents WHERE url = ?", (url,))
+        else:
+            self.conn.execute("DELETE FROM documents WHERE url = ? AND kind = ?", (url, kind))
+        self.conn.commit()
+
+    def prune(self):
+        # Deletes blobs no document points at any more; returns how many
+        orphans = [row["hash"] for row in self.conn.execute(
+            "SELECT hash FROM blobs WHERE hash NOT IN (SELECT blob FROM documents)")]
+        for digest in orphans:
+            try:
+                os.remove(self.blob_path(digest))
+            except FileNotFoundError:
+                pass
+            self.conn.execute("DELETE FROM blobs WHERE hash = ?", (digest,))
+            self.conn.execute("DELETE FROM simhash_bands WHERE hash = ?", (digest,))
+        self.conn.commit()
+        return len(orphans)
+
+    def import_files(self, directory=None):
+        # Brings loose .txt files under directory (default: the store root)
+        # into the store, keyed by relative path; files whose size and mtime
+        # are unchanged are skipped and deleted files drop out. Returns the
+        # number of files (re)imported.
+        directory = directory or self.root
+        known = {row["path"]: (row["size"], row["mtime_ns"]) for row in self.conn.execute("SELECT * FROM files")}
+        seen = set()
+        imported = 0
+        for root, dirs, files in os.walk(directory):
+            dirs[:] = sorted(d for d in dirs if not (root == directory and d == BLOB_DIR))
+            for file in sorted(files):
+                if not file.endswith(".txt"):
+                    continue
+                filepath = os.path.join(root, file)
+                relpath = os.path.relpath(filepath, directory)
+                seen.add(relpath)
+                stat = os.stat(filepath)
+                if known.get(relpath) == (stat.st_size, stat.st_mtime_ns):
+                    continue
+                with open(filepath, "r", encoding="utf-8", errors="replace") as f:
+                    text = f.read()
+                kind = KIND_TABLES if file.endswith("_tables.txt") else KIND_TEXT
+                self.put(relpath, kind, text, name=relpath)
+                self.conn.execute("INSERT OR REPLACE INTO files (path, size, mtime_ns) VALUES (?, ?, ?)",
+                                  (relpath, stat.st_size, stat.st_mtime_ns))
+                imported += 1
+        for relpath in set(known) - seen:
+            self.conn.execute("DELETE FROM documents WHERE url = ?", (relpath,))
+            self.conn.execute("DELETE FROM files WHERE path = ?", (relpath,))
+        self.conn.commit()
+        return imported
+
+    # ---- Reading ----
+
+    def read(self, digest):
+        row = self.conn.execute("SELECT codec FROM blobs WHERE hash = ?", (digest,)).fetchone()
+        if row is None:
+            raise KeyError(digest)
+        with open(self.blob_path(digest, row["codec"]), "rb") as f:
+            data = f.read()
+        if row["codec"] == "zst":
+            if zstandard is None:
+                raise RuntimeError("Blob is zstd-compressed; install the zstandard package to read it")
+            data = zstandard.ZstdDecompressor().decompress(data)
+        else:
+            data = gzip.decompress(data)
+        return data.decode("utf-8")
+
+    def get(self, url, kind=KIND_TEXT):
+        row = self.conn.execute("SELECT blob FROM documents WHERE url = ? AND kind = ?", (url, kind)).fetchone()
+        return self.read(row["blob"]) if row is not None else None
+
+    def documents(self, kinds=DOCUMENT_KINDS):
+        # One StoredDocument per distinct blob, named after the first document
+        # (by name) that uses it, in name order
+        placeholders = ", ".join("?" * len(kinds))
+        rows = self.conn.execute(
+            f"""SELECT blob, kind, MIN(name) AS name FROM documents WHERE kind IN ({placeholders})
+                GROUP BY blob, kind ORDER BY name""", tuple(kinds)).fetchall()
+        seen = set()
+        for row in rows:
+            # A blob shared by two kinds (e.g. identical text and table output) is read once
+            if row["blob"] not in seen:
+                seen.add(row["blob"])
+                yield StoredDocument(row["blob"], row["kind"], row["name"])
+
+    def iter_documents(self, kinds=DOCUMENT_KINDS):
+        # (source name, text) per distinct blob, the shape build_index and
+        # build_vector_index take
+        for document in self.documents(kinds):
+            yield document.name, self.read(document.digest)
+
+    def stats(self):
+        row = self.conn.execute(
+            "SELECT COUNT(*) AS blobs, COALESCE(SUM(size), 0) AS size, COALESCE(SUM(stored_size), 0) AS stored FROM blobs"
+        ).fetchone()
+        documents = self.conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+        near_duplicates = self.conn.execute("SELECT COUNT(*) FROM documents WHERE hash != blob").fetchone()[0]
+        return {
+            "documents": documents,
+            "blobs": row["blobs"],
+            "near_duplicates": near_duplicates,
+            "bytes": row["size"],
+            "stored_bytes": row["stored"],
+        }
@@ -0,0 +1,200 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from doc_store import simhash
+from metrics import Counter, Histogram
+
+# The document libraries are imported inside the extractors: only the pool
+# worker processes that handle a given format ever load them.
+
+# Measured in the crawl process around each pool call, by file type
+EXTRACT_SECONDS = Histogram("document_extraction_seconds", "Text extraction time per downloaded document", ["type"])
+EXTRACT_FAILURES = Counter("document_extraction_failures_total", "Documents that produced no text", ["type"])
+
+
+class ExtractionTimeout(Exception):
+    pass
+
+
+def _check_deadline(deadline, path):
+    if deadline is not None and time.monotonic() > deadline:
+        raise ExtractionTimeout(f"extraction of {path} exceeded its time budget")
+
+
+def _extract_pdf(pdf_path, out, max_pages, deadline):
+    import PyPDF2
+    with open(pdf_path, 'rb') as f:
+        reader = PyPDF2.PdfReader(f)
+        for page_num, page in enumerate(reader.pages):
+            if max_pages is not None and page_num >= max_pages:
+                print(f"Stopped PDF {pdf_path} at the {max_pages} page limit")
+                break
+            _check_deadline(deadline, pdf_path)
+            out.write(page.extract_text() or "")
+
+
+def _extract_docx(docx_path, out, max_pages, deadline):
+    import docx
+    document = docx.Document(docx_path)
+    for i, paragraph in enumerate(document.paragraphs):
+        _check_deadline(deadline, docx_path)
+        if i:
+            out.write('\n')
+        out.write(paragraph.text)
+
+
+def _extract_xlsx(xlsx_path, out, max_pages, deadline):
+    from openpyxl import load_workbook
+    # read_only streams rows from the archive instead of building every cell object
+    workbook = load_workbook(xlsx_path, read_only=True, data_only=True)
+    try:
+        first = True
+        for sheet_name in workbook.sheetnames:
+            for row in workbook[sheet_name].iter_rows(values_only=True):
+                _check_deadline(deadline, xlsx_path)
+                if not first:
+                    out.write('\n')
+                out.write('\t'.join(str(value) if value is not None else "" for value in row))
+                first = False
+    finally:
+        workbook.close()
+
+
+EXTRACTORS = {
+    ".pdf": _extract_pdf,
+    ".docx": _extract_docx,
+    ".xlsx": _extract_xlsx,
+}
+
+
+def extract_document(src_path, ext, dest_path, max_pages=None, timeout=None):
+    # Runs in a worker process. Text is streamed to a temporary file and only
+    # moved into place once extraction finished with some content, so readers
+    # never see a half-written .txt. Returns (dest_path, SimHash of the
+    # text), computed here rather than on the crawl's event loop, or None if
+    # nothing was extracted.
+    extractor = EXTRACTORS.get(ext)
+    if extractor is None:
+        return None
+    deadline = time.monotonic() + timeout if timeout else None
+    part_path = dest_path + ".part"
+    try:
+        with open(part_path, 'w', encoding='utf-8') as out:
+            extractor(src_path, out, max_pages, deadline)
+        if os.path.getsize(part_path) == 0:
+            os.remove(part_path)
+            return None
+        os.replace(part_path, dest_path)
+        with open(dest_path, 'r', encoding='utf-8', errors='replace') as f:
+            fingerprint = simhash(f.read())
+        return dest_path, fingerprint
+    except Exception as e:
+        print(f"Error extracting text from {ext.lstrip('.').upper()} {src_path}: {e}")
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        return None
+
+
+def _pool_context():
+    # Workers start from a fresh interpreter (forkserver, or spawn where there
+    # is none) rather than a fork of the crawl process, which runs in a job
+    # thread of the multithreaded Flask app
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def _kill_pool(executor):
+    # ProcessPoolExecutor cannot cancel a running call, so a worker stuck in
+    # a document is terminated and the pool discarded
+    for process in list((getattr(executor, "_processes", None) or {}).values()):
+        process.terminate()
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+class ExtractionPipeline:
+    # Crawl stage that turns downloaded documents into text off the event loop.
+    # Downloads are queued (bounded, so a slow pool applies back-pressure to the
+    # crawl) and drained by one consumer task per worker process. Each consumer
+    # owns a single-process pool, so a document that hangs past its timeout is
+    # killed with its pool and replaced without affecting the other workers.
+    def __init__(self, processes=None, queue_size=64, timeout=300, max_pages=1000):
+        self.processes = processes or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.max_pages = max_pages
+        self._context = None
+        self._executors = {}  # consumer index -> its current pool
+        self._queue = None
+        self._consumers = []
+
+    async def __aenter__(self):
+        self._context = _pool_context()
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._consumers = [asyncio.create_task(self._consume(i)) for i in range(self.processes)]
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            await self._queue.join()
+        for consumer in self._consumers:
+            consumer.cancel()
+        await asyncio.gather(*self._consumers, return_exceptions=True)
+        for executor in self._executors.values():
+            if exc_type is None:
+                # Every queued document has finished or been killed: no worker is busy
+                executor.shutdown(wait=True)
+            else:
+                _kill_pool(executor)
+        self._executors = {}
+
+    def _new_executor(self, index):
+        executor = ProcessPoolExecutor(max_workers=1, mp_context=self._context)
+        self._executors[index] = executor
+        return executor
+
+    async def submit(self, src_path, ext, dest_path, on_done=None):
+        # on_done(dest_path_or_None, simhash_or_None) is called on the event
+        # loop once extraction finishes
+        await self._queue.put((src_path, ext, dest_path, on_done))
+
+    async def _consume(self, index):
+        loop = asyncio.get_running_loop()
+        executor = self._new_executor(index)
+        while True:
+            src_path, ext, dest_path, on_done = await self._queue.get()
+            doc_type = ext.lstrip('.')
+            start = time.perf_counter()
+            try:
+                # Workers stop cooperatively at the deadline between pages; the
+                # outer timeout only covers a single page that never returns.
+                result = await asyncio.wait_for(
+                    loop.run_in_executor(executor, extract_document,
+                                         src_path, ext, dest_path, self.max_pages, self.timeout),
+                    timeout=self.timeout + 30,
+                )
+            except (asyncio.TimeoutError, BrokenProcessPool) as e:
+                print(f"Extraction worker for {src_path} killed and restarted: {type(e).__name__}")
+                _kill_pool(executor)
+                executor = self._new_executor(index)
+                if os.path.exists(dest_path + ".part"):
+                    os.remove(dest_path + ".part")
+                result = None
+            except Exception as e:
+                print(f"Error extracting text from {src_path}: {e}")
+                result = None
+            EXTRACT_SECONDS.observe(time.perf_counter() - start, type=doc_type)
+            try:
+                if on_done is not None:
+                    on_done(*(result or (None, None)))
+            except Exception as e:
+                # A failing callback (storing the text) loses this document,
+                # not the consumer: the queue must keep draining
+                print(f"Error storing text extracted from {src_path}: {e}")
+                result = None
+            finally:
+                self._queue.task_done()
+            if result is None:
+                EXTRACT_FAILURES.inc(type=doc_type)
@@ -0,0 +1,67 @@
+import re
+import aiohttp
+
+# Fetch tiers recorded per URL by MOSDACScraper
+TIER_STATIC = "static"
+TIER_BROWSER = "browser"
+TIER_FILE = "file"
+
+
+class StaticFetcher:
+    # Pooled keep-alive HTTP client for pages that don't need a browser render
+    def __init__(self, max_connections=32, per_host=8, timeout=30, user_agent="MOSDAC-Crawler/1.0"):
+        self.max_connections = max_connections
+        self.per_host = per_host
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self.session = None
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.max_connections, limit_per_host=self.per_host,
+                                         keepalive_timeout=30)
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers={"User-Agent": self.user_agent, "Accept-Encoding": "gzip, deflate"},
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.session.close()
+        self.session = None
+
+    async def get(self, url, headers=None):
+        # Returns (status, headers, body, final URL after redirects); aiohttp
+        # transparently decompresses gzip
+        async with self.session.get(url, headers=headers, allow_redirects=True) as response:
+            body = await response.read()
+            return response.status, response.headers, body, str(response.url)
+
+
+class RenderPolicy:
+    # Decides whether a statically fetched page must be re-fetched with Playwright.
+    # `render_patterns` always go to the browser, `static_patterns` never do;
+    # anything else is rendered when its <p> text looks too thin to be real content.
+    def __init__(self, render_patterns=None, static_patterns=None, min_text_chars=200):
+        self.render_patterns = [re.compile(p) for p in (render_patterns or [])]
+        self.static_patterns = [re.compile(p) for p in (static_patterns or [])]
+        self.min_text_chars = min_text_chars
+
+    def force_render(self, url):
+        return any(p.search(url) for p in self.render_patterns)
+
+    def force_static(self, url):
+        return any(p.search(url) for p in self.static_patterns)
+
+    def needs_rendering(self, url, content):
+        # content: html_extract.PageContent of the static response
+        if self.force_render(url):
+            return True
+        if self.force_static(url):
+            return False
+        return content.paragraph_chars < self.min_text_chars
+
+
+def is_html_response(headers):
+    content_type = headers.get("Content-Type", "")
+    return not content_type or "html" in content_type.lower()
@@ -0,0 +1,262 @@
+import heapq
+import itertools
+import os
+import re
+import sqlite3
+from array import array
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Crawl frontier: the URLs a crawl has discovered and not yet fetched.
+#
+# URLs are canonicalized and deduplicated when they are enqueued, so the
+# queue never holds a URL twice. Deduplication keys on url_key, which also
+# ignores a trailing slash; the queued URL keeps its path as written, since
+# relative links on /dir/ and /dir resolve differently. Every URL ever
+# enqueued is remembered (by its key) as a 64-bit hash in URLSet (12-23
+# bytes per URL instead of ~140 for a set of strings). Queued URLs are
+# popped by depth, then by estimated value
+# (PRIORITY_RULES: documents and product pages before news and galleries),
+# then in discovery order, so a crawl is still breadth-first and a depth
+# limit or an early stop keeps the most useful pages. With memory_limit set,
+# the least urgent half of the queue moves to a SQLite file whenever the
+# in-memory heap outgrows the limit and comes back as the heap drains.
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+# Query parameters that only track where a click came from
+IGNORED_QUERY_PARAMS = re.compile(r"utm_\w+|fbclid|gclid")
+# Path patterns (regular expressions) that are never crawled: account pages
+# and static assets
+EXCLUDED_PATH_PATTERNS = ["login", "signup", "auth", "reset-credentials", "image", "img", "css", "js"]
+# (path pattern, score); the first match sets a URL's priority within its
+# depth, unmatched URLs score 0
+PRIORITY_RULES = [
+    (r"\.(pdf|docx?|xlsx?|pptx?)$", 3.0),
+    (r"/(products?|catalog|data|datasets?|documents?|downloads?)(/|$)", 2.0),
+    (r"/(satellites?|missions?|instruments?|tools?|faq|help)(/|$)", 1.0),
+    (r"/(news|events?|gallery|announcements?|tenders?|careers?)(/|$)", -1.0),
+]
+_PRIORITY_RULES = [(re.compile(pattern, re.IGNORECASE), score) for pattern, score in PRIORITY_RULES]
+
+
+def canonicalize_url(url, keep_query=True):
+    # Lower-case scheme and host, no default port, no fragment and query
+    # parameters in sorted order (tracking parameters dropped), so spellings
+    # of one page compare equal. The path is kept as written.
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    try:
+        host, port = parts.hostname or "", parts.port
+    except ValueError:  # malformed port: keep the netloc as written
+        host, port = parts.netloc.lower(), None
+    if ":" in host:
+        host = f"[{host}]"
+    netloc = host if port is None or DEFAULT_PORTS.get(scheme) == port else f"{host}:{port}"
+    path = parts.path or "/"
+    query = ""
+    if keep_query and parts.query:
+        params = parse_qsl(parts.query, keep_blank_values=True)
+        query = urlencode(sorted(param for param in params if not IGNORED_QUERY_PARAMS.fullmatch(param[0])))
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+
+def url_key(url):
+    # Deduplication key of a canonical URL: its path without trailing
+    # slashes (except the root path), so /dir and /dir/ are fetched once
+    parts = urlsplit(url)
+    if len(parts.path) > 1 and parts.path.endswith("/"):
+        return urlunsplit(parts._replace(path=parts.path.rstrip("/") or "/"))
+    return url
+
+
+def url_priority(url):
+    path = urlsplit(url).path
+    for pattern, score in _PRIORITY_RULES:
+        if pattern.search(path):
+            return score
+    return 0.0
+
+
+class URLRules:
+    # Crawl scope, compiled once: allowed hosts and one regular expression
+    # for every excluded path pattern. Takes canonical URLs.
+    def __init__(self, hosts, excluded_paths=EXCLUDED_PATH_PATTERNS):
+        self.hosts = frozenset(host.lower() for host in hosts)
+        self._excluded = re.compile("|".join(f"(?:{pattern})" for pattern in excluded_paths)) if excluded_paths else None
+
+    def allows(self, url):
+        parts = urlsplit(url)
+        if parts.netloc not in self.hosts:
+            return False
+        return self._excluded is None or self._excluded.search(parts.path) is None
+
+
+def url_hash(url):
+    # 64-bit key from str's own (cached) hash: only compared within one
+    # process, so hash randomization does not matter. 0 marks an empty
+    # URLSet slot and is never returned.
+    return (hash(url) & 0xFFFFFFFFFFFFFFFF) or 1
+
+
+class URLSet:
+    # Set of URLs stored as 64-bit hashes in one open-addressing array
+    # (linear probing). Two distinct URLs collide with probability ~n/2^64,
+    # negligible at crawl sizes.
+    MAX_LOAD = 0.7
+
+    def __init__(self, capacity=1024):
+        size = 1
+        while size < capacity / self.MAX_LOAD:
+            size *= 2
+        self._slots = array("Q", bytes(8 * size))
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, url):
+        return self._find(url_hash(url))[1]
+
+    def _find(self, key):
+        # (slot index, found): the key's slot, or the empty slot it would take
+        slots = self._slots
+        mask = len(slots) - 1
+        i = key & mask
+        value = slots[i]
+        while value:
+            if value == key:
+                return i, True
+            i = (i + 1) & mask
+            value = slots[i]
+        return i, False
+
+    def add(self, url):
+        # True if the URL was not in the set yet
+        key = url_hash(url)
+        i, found = self._find(key)
+        if found:
+            return False
+        self._slots[i] = key
+        self._count += 1
+        if self._count > len(self._slots) * self.MAX_LOAD:
+            self._grow()
+        return True
+
+    def _grow(self):
+        # Keys are distinct, so they are placed without the membership check
+        old = self._slots
+        slots = self._slots = array("Q", bytes(16 * len(old)))
+        mask = len(slots) - 1
+        for key in old:
+            if key:
+                i = key & mask
+                while slots[i]:
+                    i = (i + 1) & mask
+                slots[i] = key
+
+    def memory_bytes(self):
+        return self._slots.itemsize * len(self._slots)
+
+
+class Frontier:
+    def __init__(self, rules=None, max_depth=None, keep_query=False, priority=url_priority,
+                 memory_limit=None, spill_path=None):
+        # rules: URLRules or None (no scope check). keep_query=False drops
+        # query strings entirely, as the crawler always has. memory_limit:
+        # queued URLs kept in memory before spilling to spill_path.
+        if memory_limit is not None and spill_path is None:
+            raise ValueError("memory_limit needs a spill_path")
+        self.rules = rules
+        self.max_depth = max_depth
+        self.keep_query = keep_query
+        self.priority = priority
+        self.memory_limit = memory_limit
+        self.spill_path = spill_path
+        self.seen = URLSet()
+        self._heap = []  # (depth, -priority, seq, url)
+        self._seq = itertools.count()
+        # Spilled entries; opened in the crawl's thread on first spill
+        self._spill = None
+        self._spilled = 0
+        self._spill_min = None  # smallest spilled key, None when nothing is spilled
+
+    def __len__(self):
+        return len(self._heap) + self._spilled
+
+    def canonicalize(self, url):
+        return canonicalize_url(url, keep_query=self.keep_query)
+
+    def add(self, url, depth, check_scope=True):
+        # Queues a URL unless it is out of scope, too deep or was queued
+        # before; returns whether it was queued. check_scope=False is for the
+        # start URL, which is crawled even outside the rules.
+        if self.max_depth is not None and depth > self.max_depth:
+            return False
+        url = self.canonicalize(url)
+        if check_scope and self.rules is not None and not self.rules.allows(url):
+            return False
+        if not self.seen.add(url_key(url)):
+            return False
+        heapq.heappush(self._heap, (depth, -self.priority(url), next(self._seq), url))
+        if self.memory_limit is not None and len(self._heap) > self.memory_limit:
+            self._spill_entries()
+        return True
+
+    def pop(self, max_depth=None):
+        # Most urgent (url, depth); None when the frontier is empty or, with
+        # max_depth, when every queued URL is deeper
+        if self._spill_min is not None and (not self._heap or self._spill_min < self._heap[0][:3]):
+            self._load_entries()
+        if not self._heap or (max_depth is not None and self._heap[0][0] > max_depth):
+            return None
+        depth, _, _, url = heapq.heappop(self._heap)
+        return url, depth
+
+    def min_depth(self):
+        if self._spill_min is not None and (not self._heap or self._spill_min < self._heap[0][:3]):
+            return self._spill_min[0]
+        return self._heap[0][0] if self._heap else None
+
+    def _spill_db(self):
+        if self._spill is None:
+            self._spill = sqlite3.connect(self.spill_path)
+            self._spill.execute("PRAGMA journal_mode=OFF")
+            self._spill.execute("PRAGMA synchronous=OFF")
+            self._spill.execute("DROP TABLE IF EXISTS frontier")
+            self._spill.execute("""CREATE TABLE frontier (
+                depth INTEGER NOT NULL, priority REAL NOT NULL, seq INTEGER NOT NULL, url TEXT NOT NULL,
+                PRIMARY KEY (depth, priority, seq)) WITHOUT ROWID""")
+        return self._spill
+
+    def _spill_entries(self):
+        # Moves the least urgent half of the heap to disk; a sorted list is a valid heap
+        self._heap.sort()
+        keep = self.memory_limit // 2
+        spilled = self._heap[keep:]
+        del self._heap[keep:]
+        db = self._spill_db()
+        db.executemany("INSERT INTO frontier (depth, priority, seq, url) VALUES (?, ?, ?, ?)", spilled)
+        db.commit()
+        self._spilled += len(spilled)
+        if self._spill_min is None or spilled[0][:3] < self._spill_min:
+            self._spill_min = spilled[0][:3]
+
+    def _load_entries(self):
+        # Brings back the most urgent spilled entries, as many as fit under
+        # memory_limit (at least a tenth of it)
+        batch = max(self.memory_limit // 10, self.memory_limit - len(self._heap), 1)
+        db = self._spill_db()
+        rows = db.execute("SELECT depth, priority, seq, url FROM frontier ORDER BY depth, priority, seq LIMIT ?",
+                          (batch,)).fetchall()
+        db.execute("DELETE FROM frontier WHERE (depth, priority, seq) <= (?, ?, ?)", rows[-1][:3])
+        db.commit()
+        for row in rows:
+            heapq.heappush(self._heap, row)
+        self._spilled -= len(rows)
+        row = db.execute("SELECT depth, priority, seq FROM frontier ORDER BY depth, priority, seq LIMIT 1").fetchone()
+        self._spill_min = tuple(row) if row is not None else None
+
+    def close(self):
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+            os.remove(self.spill_path)
@@ -0,0 +1,191 @@
+import re
+from html.parser import HTMLParser
+
+try:
+    from lxml import etree
+except ImportError:  # the stdlib tokenizer below is used instead
+    etree = None
+
+# Single-pass page extraction for the scraper. The HTML is tokenized once
+# (lxml's libxml2 parser in SAX "target" mode, or html.parser) and a
+# collector picks up paragraph text, tables, links and the title as the
+# events go by, so no document tree is built and memory stays proportional
+# to the extracted text rather than the DOM.
+#
+# Output matches what the BeautifulSoup version produced: paragraph text is
+# p.get_text(), table cells and the title are get_text(strip=True) (strings
+# stripped and joined without a separator), script/style text is skipped.
+# On malformed markup the lxml backend follows HTML's implied end tags (an
+# unclosed <p> ends at the next block element) where html.parser nests.
+
+FEED_CHARS = 1 << 16
+SKIP_TAGS = {"script", "style", "template"}
+CELL_TAGS = {"td", "th"}
+META_CHARSET_RE = re.compile(rb"""<meta[^>]+charset=["']?([\w-]+)""", re.I)
+CONTENT_CHARSET_RE = re.compile(r"charset=([\w-]+)", re.I)
+
+
+class PageContent:
+    def __init__(self):
+        self.title = ""
+        self.paragraphs = []        # p.get_text() of every <p>, in document order
+        self.paragraph_chars = 0    # sum of len(p.get_text(strip=True))
+        self.tables = []            # [[cell text, ...] per row] per table
+        self.links = []             # href of every <a href>, in document order
+
+    @property
+    def text(self):
+        return " ".join(self.paragraphs)
+
+
+class _Collector:
+    # Receives start/end/data events from either parser backend
+    def __init__(self):
+        self.content = PageContent()
+        self._skip = 0
+        self._in_title = False
+        self._title_parts = None
+        self._paragraphs = []       # open <p>s: (slot in content.paragraphs, raw strings, stripped strings)
+        self._tables = []           # open tables: index into content.tables
+        self._rows = []             # open rows: list of cell texts
+        self._cells = []            # open cells: stripped strings
+        self._pending = []          # text since the last tag
+
+    def start(self, tag, attrib):
+        self._flush()
+        tag = tag.lower()
+        if tag in SKIP_TAGS:
+            self._skip += 1
+        elif tag == "p":
+            # The slot keeps document order when <p>s nest (html.parser does
+            # not close a <p> implicitly)
+            self._paragraphs.append((len(self.content.paragraphs), [], []))
+            self.content.paragraphs.append("")
+        elif tag == "a":
+            href = attrib.get("href")
+            if href is not None:
+                self.content.links.append(href)
+        elif tag == "table":
+            self._tables.append(len(self.content.tables))
+            self.content.tables.append([])
+        elif tag == "tr":
+            row = []
+            if self._tables:
+                self.content.tables[self._tables[-1]].append(row)
+            self._rows.append(row)
+        elif tag in CELL_TAGS:
+            self._cells.append([])
+        elif tag == "title" and self._title_parts is None:
+            self._in_title = True
+            self._title_parts = []
+
+    def end(self, tag):
+        self._flush()
+        tag = tag.lower()
+        if tag in SKIP_TAGS:
+            self._skip = max(0, self._skip - 1)
+        elif tag == "p" and self._paragraphs:
+            slot, raw, stripped = self._paragraphs.pop()
+            self.content.paragraphs[slot] = "".join(raw)
+            self.content.paragraph_chars += sum(len(s) for s in stripped)
+        elif tag == "table" and self._tables:
+            self._tables.pop()
+        elif tag == "tr" and self._rows:
+            self._rows.pop()
+        elif tag in CELL_TAGS and self._cells:
+            text = "".join(self._cells.pop())
+            if self._rows:
+                self._rows[-1].append(text)
+        elif tag == "title" and self._in_title:
+            self._in_title = False
+            self.content.title = "".join(self._title_parts)
+
+    def data(self, data):
+        # lxml splits text at entity references; strings are only handled
+        # once complete so stripping sees the same strings a tree parser makes
+        self._pending.append(data)
+
+    def _flush(self):
+        if not self._pending:
+            return
+        data = "".join(self._pending)
+        self._pending = []
+        if self._skip:
+            return
+        stripped = data.strip()
+        for _, raw, stripped_parts in self._paragraphs:
+            raw.append(data)
+            if stripped:
+                stripped_parts.append(stripped)
+        if stripped:
+            for cell in self._cells:
+                cell.append(stripped)
+            if self._in_title:
+                self._title_parts.append(stripped)
+
+    def close(self):
+        # Elements still open at end of input are closed, as a tree parser would
+        self._flush()
+        while self._cells or self._paragraphs:
+            if self._cells:
+                self.end("td")
+            if self._paragraphs:
+                self.end("p")
+        if self._in_title:
+            self.end("title")
+        return self.content
+
+
+class _StdlibParser(HTMLParser):
+    def __init__(self, collector):
+        super().__init__(convert_charrefs=True)
+        self.collector = collector
+
+    def handle_starttag(self, tag, attrs):
+        self.collector.start(tag, dict(attrs))
+
+    def handle_startendtag(self, tag, attrs):
+        self.collector.start(tag, dict(attrs))
+        self.collector.end(tag)
+
+    def handle_endtag(self, tag):
+        self.collector.end(tag)
+
+    def handle_data(self, data):
+        self.collector.data(data)
+
+
+def decode_html(body, headers=None):
+    # bytes -> str using the Content-Type charset, else a <meta charset>, else utf-8
+    if isinstance(body, str):
+        return body
+    charset = None
+    if headers:
+        content_type = next((value for key, value in headers.items() if key.lower() == "content-type"), "")
+        match = CONTENT_CHARSET_RE.search(content_type)
+        charset = match.group(1) if match else None
+    if charset is None:
+        match = META_CHARSET_RE.search(body[:4096])
+        charset = match.group(1).decode("ascii") if match else "utf-8"
+    try:
+        return body.decode(charset, errors="replace")
+    except LookupError:
+        return body.decode("utf-8", errors="replace")
+
+
+def extract_html(html, backend=None):
+    # html: str. backend: "lxml", "stdlib" or None for the fastest available.
+    # The input is fed in FEED_CHARS slices; the parser never holds a tree.
+    collector = _Collector()
+    if backend == "lxml" or (backend is None and etree is not None):
+        parser = etree.HTMLParser(target=collector, recover=True)
+        for i in range(0, len(html), FEED_CHARS):
+            parser.feed(html[i:i + FEED_CHARS])
+        if not html:
+            parser.feed(" ")
+        return parser.close()
+    parser = _StdlibParser(collector)
+    for i in range(0, len(html), FEED_CHARS):
+        parser.feed(html[i:i + FEED_CHARS])
+    parser.close()
+    return collector.close()
@@ -0,0 +1,184 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from metrics import Histogram
+
+# Background jobs for the long-running endpoints (/api/scrape, /api/build-kg).
+# Every job gets its own component instance (scraper, graph builder), so two
+# jobs never share crawl or graph state. A component only needs:
+#   stop()      ask the work to wind down; called from the request thread
+#   progress()  dict of counters, with "done" and "total" for throughput/ETA
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+ACTIVE_STATES = (JOB_QUEUED, JOB_RUNNING)
+
+JOB_SECONDS = Histogram("job_duration_seconds", "Run time of finished background jobs", ["kind", "status"],
+                        buckets=(1.0, 10.0, 60.0, 300.0, 900.0, 1800.0, 3600.0, 7200.0, 21600.0))
+
+
+class JobConflict(Exception):
+    # A different job is already using the same resource (e.g. output directory)
+    def __init__(self, job, resources):
+        super().__init__(f"Job {job.id} ({job.kind}) is already using {', '.join(sorted(resources))}")
+        self.job = job
+
+
+def _resources(resource):
+    # resource: None, one resource key, or a tuple of the keys a job uses
+    if resource is None:
+        return frozenset()
+    return frozenset(resource) if isinstance(resource, tuple) else frozenset([resource])
+
+
+class Job:
+    def __init__(self, kind, key, resource, component, run):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.key = key
+        self.resources = _resources(resource)
+        self.component = component
+        self.run = run
+        self.status = JOB_QUEUED
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.error = None
+        self.cancel_requested = False
+        self.future = None
+
+    @property
+    def active(self):
+        return self.status in ACTIVE_STATES
+
+    def progress(self):
+        progress = dict(self.component.progress())
+        done, total = progress.get("done"), progress.get("total")
+        if self.started_at is not None and done is not None:
+            elapsed = (self.finished_at or time.time()) - self.started_at
+            rate = done / elapsed if elapsed > 0 else 0.0
+            progress["elapsed_seconds"] = round(elapsed, 1)
+            progress["items_per_second"] = round(rate, 3)
+            if self.status == JOB_RUNNING and total is not None and rate > 0:
+                progress["eta_seconds"] = round(max(0, total - done) / rate, 1)
+        return progress
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "params": dict(self.key),
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+            "progress": self.progress(),
+        }
+
+
+class JobManager:
+    def __init__(self, max_workers=2, history=100):
+        self.max_workers = max_workers
+        self.history = history
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs = OrderedDict()  # job id -> Job, oldest first
+        self._lock = threading.Lock()
+
+    def submit(self, kind, params, component_factory, run, resource=None):
+        # Returns (job, coalesced). An active job of the same kind with the same
+        # params is returned instead of starting a second one; an active job
+        # with other params on one of the same resources raises JobConflict.
+        key = tuple(sorted(params.items()))
+        with self._lock:
+            existing = self._active_job(kind, key, resource)
+        if existing is not None:
+            return existing, True
+        # Built without the lock: the factory may import spaCy or Playwright,
+        # and status polls and cancels must not wait for that
+        component = component_factory()
+        with self._lock:
+            # A concurrent submit may have registered a job in the meantime
+            existing = self._active_job(kind, key, resource)
+            if existing is not None:
+                return existing, True
+            job = Job(kind, key, resource, component, run)
+            self._jobs[job.id] = job
+            self._prune()
+            job.future = self._executor.submit(self._run, job)
+        return job, False
+
+    def _active_job(self, kind, key, resource):
+        # Called with the lock held: the active job a submission coalesces
+        # into, or None; raises JobConflict for another job sharing a resource
+        resources = _resources(resource)
+        for job in self._jobs.values():
+            if not job.active:
+                continue
+            if job.kind == kind and job.key == key:
+                return job
+            if job.resources & resources:
+                raise JobConflict(job, job.resources & resources)
+        return None
+
+    def _run(self, job):
+        with self._lock:
+            if job.cancel_requested:
+                return
+            job.status = JOB_RUNNING
+            job.started_at = time.time()
+        try:
+            job.run(job.component)
+            status, error = JOB_SUCCEEDED, None
+        except Exception as e:
+            status, error = JOB_FAILED, str(e)
+        with self._lock:
+            job.finished_at = time.time()
+            if job.cancel_requested:
+                job.status = JOB_CANCELLED
+            else:
+                job.status, job.error = status, error
+        JOB_SECONDS.observe(job.finished_at - job.started_at, kind=job.kind, status=job.status)
+        if error is not None and not job.cancel_requested:
+            print(f"Job {job.id} ({job.kind}) failed: {error}")
+
+    def _prune(self):
+        # Called with the lock held: forget the oldest finished jobs
+        finished = [job_id for job_id, job in self._jobs.items() if not job.active]
+        for job_id in finished[:max(0, len(finished) - self.history)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self):
+        with self._lock:
+            return list(self._jobs.values())
+
+    def cancel(self, job_id):
+        # Queued jobs never start; running ones are asked to stop and are
+        # reported as cancelled once their component has wound down.
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or not job.active:
+                return job
+            job.cancel_requested = True
+            if job.status == JOB_QUEUED:
+                job.future.cancel()
+                job.status = JOB_CANCELLED
+                job.finished_at = time.time()
+                return job
+        job.component.stop()
+        return job
+
+    def shutdown(self, wait=True):
+        for job in self.list():
+            if job.active:
+                self.cancel(job.id)
+        self._executor.shutdown(wait=wait)
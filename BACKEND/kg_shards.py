@@ -0,0 +1,151 @@
+import gzip
+import json
+import os
+import socket
+
+# Intermediate files of the sharded knowledge-graph build. The map phase
+# (KnowledgeGraphBuilder.build_shard) runs NER over one shard of the document
+# store and writes the per-blob contributions -- the same entries
+# build_manifest.json holds -- to shards/<shard>.kgs under the graph output
+# directory; the merge phase (merge_shards) combines every shard file into
+# the final graph. A sharded build (build_sharded) deletes the shard files
+# of earlier runs it did not produce, and merges only its own.
+#
+# A shard is either a hash range of the blob digests (index/count: shard i of
+# n holds the digests whose leading 32 bits fall in the i-th of n equal
+# ranges) or a named list of document names. Contributions depend only on a
+# blob's text, so shard files from different shardings can be merged
+# together and a shard that failed is simply run again.
+#
+# File format: gzip-compressed JSON with every string interned once,
+#   {"version", "shard", "strings": [...],
+#    "documents": {digest: [kind, name, [[type, [entity, ...]], ...],
+#                                       [[group, [subj, pred, obj, ...]], ...]]}}
+# where every string field is an index into "strings".
+
+SHARD_DIR = "shards"
+SHARD_SUFFIX = ".kgs"
+SHARD_VERSION = 1
+GZIP_LEVEL = 6
+
+
+def shard_of(digest, count):
+    # Index of the hash-range shard holding a hex digest
+    return (int(digest[:8], 16) * count) >> 32
+
+
+def parse_shard(value):
+    # "3/16" -> (3, 16)
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard {value!r}: expected INDEX/COUNT, e.g. 3/16")
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Invalid shard {value!r}: index must be in 0..{count - 1}")
+    return index, count
+
+
+def hash_shard_name(index, count):
+    return f"shard-{index:04d}-of-{count:04d}"
+
+
+def shard_path(output_dir, name):
+    return os.path.join(output_dir, SHARD_DIR, name + SHARD_SUFFIX)
+
+
+def hash_shard_names(count):
+    return [hash_shard_name(index, count) for index in range(count)]
+
+
+def shard_paths(output_dir, names=None):
+    # Existing shard files, all of them or those in `names`
+    shard_dir = os.path.join(output_dir, SHARD_DIR)
+    try:
+        files = sorted(name for name in os.listdir(shard_dir) if name.endswith(SHARD_SUFFIX))
+    except FileNotFoundError:
+        return []
+    if names is not None:
+        names = set(names)
+        files = [name for name in files if name[:-len(SHARD_SUFFIX)] in names]
+    return [os.path.join(shard_dir, name) for name in files]
+
+
+def remove_stale_shards(output_dir, keep):
+    # Deletes the shard files (and their logs) not named in `keep`; returns
+    # the names removed
+    removed = []
+    for path in shard_paths(output_dir):
+        name = os.path.basename(path)[:-len(SHARD_SUFFIX)]
+        if name not in keep:
+            os.remove(path)
+            log_path = os.path.join(os.path.dirname(path), name + ".log")
+            if os.path.exists(log_path):
+                os.remove(log_path)
+            removed.append(name)
+    return removed
+
+
+def _encode(documents):
+    strings = []
+    ids = {}
+
+    def intern(s):
+        string_id = ids.get(s)
+        if string_id is None:
+            string_id = ids[s] = len(strings)
+            strings.append(s)
+        return string_id
+
+    encoded = {}
+    for digest in sorted(documents):
+        entry = documents[digest]
+        entities = [[intern(ent_type), [intern(ent) for ent in ents]]
+                    for ent_type, ents in entry["entities"].items()]
+        relationships = [[intern(rel_type), [intern(part) for rel in rels for part in rel]]
+                         for rel_type, rels in entry["relationships"].items()]
+        encoded[digest] = [intern(entry["kind"]), intern(entry["name"]), entities, relationships]
+    return strings, encoded
+
+
+def _decode(strings, encoded):
+    documents = {}
+    for digest, (kind, name, entities, relationships) in encoded.items():
+        documents[digest] = {
+            "kind": strings[kind],
+            "name": strings[name],
+            "entities": {strings[ent_type]: [strings[ent] for ent in ents] for ent_type, ents in entities},
+            "relationships": {
+                strings[rel_type]: [[strings[rel[i]], strings[rel[i + 1]], strings[rel[i + 2]]]
+                                    for i in range(0, len(rel), 3)]
+                for rel_type, rel in relationships
+            },
+        }
+    return documents
+
+
+def write_shard(path, shard, documents):
+    # shard: description of the selection ({"index", "count"} or {"name"});
+    # documents: {digest: manifest entry}. Written under a temporary name and
+    # renamed, so a shard file is either complete or absent, even when two
+    # machines run the same shard.
+    strings, encoded = _encode(documents)
+    payload = json.dumps({"version": SHARD_VERSION, "shard": shard, "strings": strings, "documents": encoded},
+                         separators=(",", ":"))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{socket.gethostname()}-{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(gzip.compress(payload.encode("utf-8"), compresslevel=GZIP_LEVEL, mtime=0))
+    os.replace(tmp_path, path)
+
+
+def read_shard(path):
+    # (shard, {digest: manifest entry}); ({}, {}) for a missing or unreadable
+    # file or one from another format version
+    try:
+        with open(path, "rb") as f:
+            data = json.loads(gzip.decompress(f.read()))
+    except (OSError, ValueError):
+        return {}, {}
+    if data.get("version") != SHARD_VERSION:
+        return {}, {}
+    return data["shard"], _decode(data["strings"], data["documents"])
@@ -0,0 +1,148 @@
+from array import array
+from mmap_sections import SectionFile, csr_offsets, read_string, string_table, write_sections
+
+# Binary knowledge-graph file ("graph.kg"), loaded with mmap and read through
+# zero-copy memoryviews, so opening it costs O(1) regardless of graph size.
+#
+# Sections (see mmap_sections for the container):
+#   nodes       every distinct string (entity names and relationship
+#               subjects/objects), ids assigned in case-folded sort order so
+#               a name lookup is a binary search over the ids themselves
+#   labels      entity types, relation predicates and relationship groups
+#   node types  CSR: type_offsets[n] .. type_offsets[n+1] in type_ids
+#   triples     parallel subj/pred/obj/group arrays sorted by subject, so
+#               out_offsets[n] .. out_offsets[n+1] are node n's outgoing edges
+#   in edges    CSR by object: in_offsets[n] .. in_offsets[n+1] in in_edges
+
+MAGIC = b"MOSDACKG"
+FORMAT_VERSION = 2
+GRAPH_FILE = "graph.kg"
+
+
+def write_graph(path, entities, relationships):
+    # entities: {type: {name, ...}}, relationships: {group: [(subj, pred, obj), ...]}
+    names = set()
+    for ents in entities.values():
+        names.update(ents)
+    for rels in relationships.values():
+        for subj, _, obj in rels:
+            names.add(subj)
+            names.add(obj)
+    nodes = sorted(names, key=lambda name: (name.casefold(), name))
+    node_ids = {name: i for i, name in enumerate(nodes)}
+
+    label_names = set(entities) | set(relationships)
+    for rels in relationships.values():
+        label_names.update(pred for _, pred, _ in rels)
+    labels = sorted(label_names)
+    label_ids = {label: i for i, label in enumerate(labels)}
+
+    node_types = sorted({(node_ids[name], label_ids[ent_type])
+                         for ent_type, ents in entities.items() for name in ents})
+    triples = sorted({(node_ids[subj], label_ids[pred], node_ids[obj], label_ids[group])
+                      for group, rels in relationships.items() for subj, pred, obj in rels})
+
+    node_offsets, node_blob = string_table(nodes)
+    label_offsets, label_blob = string_table(labels)
+    subj = array("I", (t[0] for t in triples))
+    obj = array("I", (t[2] for t in triples))
+    in_edges = array("I", sorted(range(len(triples)), key=obj.__getitem__))
+    sections = [
+        ("node_offsets", "Q", node_offsets),
+        ("node_blob", "B", node_blob),
+        ("label_offsets", "Q", label_offsets),
+        ("label_blob", "B", label_blob),
+        ("type_offsets", "I", csr_offsets((n for n, _ in node_types), len(nodes))),
+        ("type_ids", "I", array("I", (t for _, t in node_types))),
+        ("subj", "I", subj),
+        ("pred", "I", array("I", (t[1] for t in triples))),
+        ("obj", "I", obj),
+        ("group", "I", array("I", (t[3] for t in triples))),
+        ("out_offsets", "I", csr_offsets(subj, len(nodes))),
+        ("in_offsets", "I", csr_offsets((obj[e] for e in in_edges), len(nodes))),
+        ("in_edges", "I", in_edges),
+    ]
+    return write_sections(path, MAGIC, FORMAT_VERSION, [len(nodes), len(labels), len(triples)], sections)
+
+
+class KnowledgeGraphStore:
+    def __init__(self, path):
+        self.path = path
+        self._file = SectionFile(path, MAGIC, FORMAT_VERSION)
+        self.build_id = self._file.build_id
+        self.node_count, self.label_count, self.triple_count = self._file.metadata
+        for name, section in self._file.sections.items():
+            setattr(self, "_" + name, section)
+        self._labels = [read_string(self._label_offsets, self._label_blob, i) for i in range(self.label_count)]
+
+    @classmethod
+    def open(cls, path):
+        return cls(path)
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def node_name(self, node_id):
+        return read_string(self._node_offsets, self._node_blob, node_id)
+
+    def find(self, name):
+        # Node ids whose name equals `name` ignoring case (binary search over
+        # the case-folded sort order the writer assigned ids in)
+        key = name.casefold()
+        lo, hi = 0, self.node_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.node_name(mid).casefold() < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        matches = []
+        while lo < self.node_count and self.node_name(lo).casefold() == key:
+            matches.append(lo)
+            lo += 1
+        return matches
+
+    def node_types(self, node_id):
+        start, end = self._type_offsets[node_id], self._type_offsets[node_id + 1]
+        return [self._labels[self._type_ids[i]] for i in range(start, end)]
+
+    def _triple(self, edge):
+        return (self.node_name(self._subj[edge]), self._labels[self._pred[edge]],
+                self.node_name(self._obj[edge]))
+
+    def out_edges(self, node_id):
+        # [(subj, pred, obj), ...] with node_id as the subject
+        return [self._triple(edge) for edge in range(self._out_offsets[node_id], self._out_offsets[node_id + 1])]
+
+    def in_edges(self, node_id):
+        # [(subj, pred, obj), ...] with node_id as the object
+        start, end = self._in_offsets[node_id], self._in_offsets[node_id + 1]
+        return [self._triple(self._in_edges[i]) for i in range(start, end)]
+
+    def neighbors(self, node_id):
+        return self.out_edges(node_id) + self.in_edges(node_id)
+
+    def degree(self, node_id):
+        return (self._out_offsets[node_id + 1] - self._out_offsets[node_id]
+                + self._in_offsets[node_id + 1] - self._in_offsets[node_id])
+
+    def entities(self):
+        # {type: {name, ...}} -- full materialisation, for export and tests
+        result = {}
+        for node_id in range(self.node_count):
+            for ent_type in self.node_types(node_id):
+                result.setdefault(ent_type, set()).add(self.node_name(node_id))
+        return result
+
+    def relationships(self):
+        # {group: [(subj, pred, obj), ...]} -- full materialisation
+        result = {}
+        for edge in range(self.triple_count):
+            result.setdefault(self._labels[self._group[edge]], []).append(self._triple(edge))
+        return result
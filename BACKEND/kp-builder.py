@@ -1,71 +1,240 @@
 import os
-import spacy
 import re
+import sys
+import json
+import time
+import argparse
+import subprocess
 from collections import defaultdict
+from kg_store import write_graph, GRAPH_FILE
+from kg_shards import (shard_of, parse_shard, hash_shard_name, hash_shard_names, shard_path, shard_paths,
+                       read_shard, write_shard, remove_stale_shards, SHARD_DIR)
+from search_index import build_index, INDEX_FILE
+from doc_store import DocumentStore, KIND_TABLES
+from metrics import Counter, Gauge, Histogram
+
+ENTITY_LABELS = {"ORG", "GPE", "LOC", "DATE", "PRODUCT", "EVENT", "NORP", "FAC", "PERSON"}
+# Components entity extraction depends on; the tagger, parser, lemmatizer etc.
+# are switched off for bulk runs. (en_core_web_sm's ner has its own tok2vec.)
+NER_PIPES = ("tok2vec", "ner")
+
+# Relation patterns: (left entity label, words between the two entities,
+# right entity label, relation). A match yields (left, relation, right).
+# Add new relations here rather than as new loops in _extract_relationships.
+RELATION_PATTERNS = [
+    ("PRODUCT", "from", "ORG", "PRODUCED_BY"),
+    ("PRODUCT", "by", "ORG", "PRODUCED_BY"),
+    ("PERSON", ",", "ORG", "AFFILIATED_WITH"),
+    ("PERSON", "from", "ORG", "AFFILIATED_WITH"),
+    ("PRODUCT", "is identical to", "PRODUCT", "IDENTICAL_TO"),
+]
+
+def _build_relation_index(patterns):
+    # {(left label, right label, connector words): relation}; connector words
+    # are lower-cased so they can be compared directly with Token.lower_
+    index = {}
+    for left_label, connector, right_label, relation in patterns:
+        words = tuple(connector.lower().replace(",", " , ").split())
+        index[(left_label, right_label, words)] = relation
+    return index
+
+RELATION_INDEX = _build_relation_index(RELATION_PATTERNS)
+# Longest connector we ever need to look at between two entities
+MAX_CONNECTOR_TOKENS = max(len(key[2]) for key in RELATION_INDEX)
+
+NLP_MODEL = "en_core_web_sm"
+_NLP_MODELS = {}
+
+STAGE_BUCKETS = (0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0)
+STAGE_SECONDS = Histogram("kg_build_stage_seconds", "Duration of each build_graph stage", ["stage"],
+                          buckets=STAGE_BUCKETS)
+NER_DOCUMENTS = Counter("kg_ner_documents_total", "Text documents run through spaCy NER")
+NER_SECONDS = Counter("kg_ner_seconds_total", "Seconds spent in spaCy NER (waiting on nlp.pipe)")
+NER_RATE = Gauge("kg_ner_documents_per_second", "NER throughput of the last build that processed text")
+RELATIONSHIP_SECONDS = Histogram("kg_relationship_extraction_seconds", "Relationship matching time per spaCy doc")
+TABLE_DOCUMENTS = Counter("kg_table_documents_total", "Table documents parsed")
+
+def load_nlp(name=NLP_MODEL):
+    # One copy of each spaCy model per process, shared by every builder.
+    # Loading it before a pre-fork server forks (see app.preload_components)
+    # lets the workers share the model's memory copy-on-write.
+    if name not in _NLP_MODELS:
+        import spacy
+        _NLP_MODELS[name] = spacy.load(name)
+    return _NLP_MODELS[name]
+
+MANIFEST_FILE = "build_manifest.json"
+MANIFEST_VERSION = 2
+
+def _read_text(filepath):
+    with open(filepath, "r", encoding="utf-8") as f:
+        return f.read()
+
+class BuildCancelled(Exception):
+    pass
+
+class ShardsIncomplete(Exception):
+    # merge_shards found store documents that no shard file covers
+    def __init__(self, missing, count=None):
+        self.missing = missing
+        self.shards = sorted({shard_of(document.digest, count) for document in missing}) if count else []
+        message = f"{len(missing)} documents are not covered by any shard"
+        if self.shards:
+            message += "; run the map phase again for " + ", ".join(f"{i}/{count}" for i in self.shards)
+        super().__init__(message)
 
 class KnowledgeGraphBuilder:
-    def __init__(self, extracted_content_dir="extracted_content", output_dir="knowledge_graph"):
+    def __init__(self, extracted_content_dir="extracted_content", output_dir="knowledge_graph",
+                 batch_size=64, n_process=1):
         self.extracted_content_dir = extracted_content_dir
         self.output_dir = output_dir
         os.makedirs(self.output_dir, exist_ok=True)
-        self.nlp = spacy.load("en_core_web_sm")
+        self._nlp = None
         self.entities = defaultdict(set) # {entity_type: {entity_name, ...}}
         self.relationships = defaultdict(list) # { (entity1, relation, entity2), ...}
+        # Bulk ingestion settings for nlp.pipe
+        self.batch_size = batch_size
+        self.n_process = n_process
+        # Progress of the running build_graph, read by the job API
+        self.files_total = 0
+        self.files_processed = 0
+        self.stage = None
+        self._stage_started = None
+        self.stopped = False
+
+    @property
+    def nlp(self):
+        # Loaded on first use: an incremental build with nothing to reprocess
+        # never pays for spacy.load
+        if self._nlp is None:
+            self._nlp = load_nlp()
+        return self._nlp
 
-    def _extract_entities(self, text):
-        doc = self.nlp(text)
-        extracted = defaultdict(set)
+    def _entities_from_doc(self, doc, extracted=None):
+        if extracted is None:
+            extracted = defaultdict(set)
         for ent in doc.ents:
             # Filter for relevant entity types
-            if ent.label_ in ["ORG", "GPE", "LOC", "DATE", "PRODUCT", "EVENT", "NORP", "FAC", "PERSON"]:
+            if ent.label_ in ENTITY_LABELS:
                 extracted[ent.label_].add(ent.text.strip())
         return extracted
 
-    def _extract_relationships(self, text, doc_entities):
-        # This is a simplified approach. More advanced techniques like dependency parsing
-        # or OpenIE would be used for robust relationship extraction.
-        # For now, we look for co-occurrence and simple patterns.
+    def _chunk_text(self, text):
+        # Split documents spaCy would refuse (> nlp.max_length) at line or
+        # whitespace boundaries. Shorter documents stay whole, so their
+        # entities are identical to the serial path.
+        max_chars = self.nlp.max_length
+        if len(text) <= max_chars:
+            return [text]
+        chunks = []
+        start = 0
+        while start < len(text):
+            end = min(start + max_chars, len(text))
+            if end < len(text):
+                split = text.rfind("\n", start, end)
+                if split <= start:
+                    split = text.rfind(" ", start, end)
+                if split > start:
+                    end = split + 1
+            chunks.append(text[start:end])
+            start = end
+        return chunks
+
+    def _extract_relationships(self, doc):
+        with RELATIONSHIP_SECONDS.time():
+            return self._match_relationships(doc)
+
+    def _match_relationships(self, doc):
+        # Every pattern is "<entity> <connector words> <entity>" with nothing
+        # else in between, so only neighbouring entity spans can match. One
+        # pass over doc.ents with a dict lookup per neighbour pair keeps this
+        # linear in the number of entities, independent of document length.
         relationships_found = []
+        ents = doc.ents
+        for left, right in zip(ents, ents[1:]):
+            gap = right.start - left.end
+            if gap < 1 or gap > MAX_CONNECTOR_TOKENS:
+                continue
+            words = tuple(token.lower_ for token in doc[left.end:right.start])
+            relation = RELATION_INDEX.get((left.label_, right.label_, words))
+            if relation is None:
+                continue
+            left_text, right_text = left.text.strip(), right.text.strip()
+            if left_text != right_text:
+                relationships_found.append((left_text, relation, right_text))
 
-        # Simple co-occurrence based relationship extraction
-        # This is a placeholder and needs significant improvement for real-world use
-        for entity_type1, entities1 in doc_entities.items():
-            for entity1_text in entities1:
-                for entity_type2, entities2 in doc_entities.items():
-                    for entity2_text in entities2:
-                        if entity1_text != entity2_text and entity1_text in text and entity2_text in text:
-                            # Example: If both a satellite and a product are in the text
-                            if entity_type1 == "PRODUCT" and entity_type2 == "ORG":
-                                if f"{entity1_text} from {entity2_text}" in text or f"{entity1_text} by {entity2_text}" in text:
-                                    relationships_found.append((entity1_text, "PRODUCED_BY", entity2_text))
-                            elif entity_type1 == "ORG" and entity_type2 == "PERSON":
-                                if f"{entity2_text}, {entity1_text}" in text or f"{entity2_text} from {entity1_text}" in text:
-                                    relationships_found.append((entity2_text, "AFFILIATED_WITH", entity1_text))
-                            # Add more specific patterns based on content analysis
-                            # For instance, if "INSAT-3DR is identical to INSAT-3D"
-                            if "identical to" in text and entity_type1 == "PRODUCT" and entity_type2 == "PRODUCT":
-                                if f"{entity1_text} is identical to {entity2_text}" in text:
-                                    relationships_found.append((entity1_text, "IDENTICAL_TO", entity2_text))
-
-        return relationships_found
+        # One triple per document, however often the phrase repeats
+        return list(dict.fromkeys(relationships_found))
 
-    def process_text_file(self, filepath):
-        with open(filepath, "r", encoding="utf-8") as f:
-            content = f.read()
-        
-        doc_entities = self._extract_entities(content)
-        for ent_type, ents in doc_entities.items():
-            for ent_text in ents:
-                self.entities[ent_type].add(ent_text)
-        
-        doc_relationships = self._extract_relationships(content, doc_entities)
+    def _merge(self, entities, relationships):
+        for ent_type, ents in entities.items():
+            self.entities[ent_type].update(ents)
+        for rel_type, rels in relationships.items():
+            self.relationships[rel_type].extend(rels)
+
+    def _text_contribution(self, doc_entities, doc_relationships):
+        relationships = defaultdict(list)
         for rel in doc_relationships:
-            self.relationships["general"].append(rel)
+            relationships["general"].append(rel)
+        return doc_entities, relationships
 
-    def process_tables(self, filepath):
-        with open(filepath, "r", encoding="utf-8") as f:
-            content = f.read()
-        
+    def _text_document_contribution(self, content):
+        start = time.perf_counter()
+        doc = self.nlp(content)
+        NER_SECONDS.inc(time.perf_counter() - start)
+        NER_DOCUMENTS.inc()
+        return self._text_contribution(self._entities_from_doc(doc), self._extract_relationships(doc))
+
+    def process_text_file(self, filepath):
+        self._merge(*self._text_document_contribution(_read_text(filepath)))
+
+    def _iter_text_contributions(self, documents, batch_size=None, n_process=None):
+        # documents: iterable of (key, text). Yields (key, entities,
+        # relationships) per document: texts are streamed through nlp.pipe
+        # with only the NER components enabled.
+        batch_size = batch_size or self.batch_size
+        n_process = n_process or self.n_process
+        keys = []
+
+        def chunk_stream():
+            for key, content in documents:
+                print(f"Processing text document: {key}")
+                index = len(keys)
+                keys.append(key)
+                chunks = self._chunk_text(content)
+                for chunk_no, chunk in enumerate(chunks):
+                    yield chunk, (index, chunk_no == len(chunks) - 1)
+
+        enabled = [name for name in NER_PIPES if name in self.nlp.pipe_names]
+        doc_entities = defaultdict(set)
+        doc_relationships = []
+        with self.nlp.select_pipes(enable=enabled):
+            docs = self.nlp.pipe(chunk_stream(), as_tuples=True, batch_size=batch_size, n_process=n_process)
+            # nlp.pipe preserves input order, so a file's chunks arrive together.
+            # Time between iterations is time spent waiting on the pipe.
+            waited_from = time.perf_counter()
+            for doc, (index, is_last_chunk) in docs:
+                NER_SECONDS.inc(time.perf_counter() - waited_from)
+                self._entities_from_doc(doc, doc_entities)
+                doc_relationships.extend(self._extract_relationships(doc))
+                if is_last_chunk:
+                    entities, relationships = self._text_contribution(
+                        doc_entities, list(dict.fromkeys(doc_relationships)))
+                    NER_DOCUMENTS.inc()
+                    yield keys[index], entities, relationships
+                    doc_entities = defaultdict(set)
+                    doc_relationships = []
+                waited_from = time.perf_counter()
+
+    def process_text_files(self, filepaths, batch_size=None, n_process=None):
+        # Bulk equivalent of calling process_text_file on each path
+        documents = ((filepath, _read_text(filepath)) for filepath in filepaths)
+        for _, entities, relationships in self._iter_text_contributions(documents, batch_size, n_process):
+            self._merge(entities, relationships)
+
+    def _table_document_contribution(self, content):
+        entities = defaultdict(set)
+        relationships = defaultdict(list)
         # Simple table parsing for now, needs more sophisticated logic for complex tables
         # This part will be heavily dependent on the actual table structures
         lines = content.split("\n")
@@ -73,15 +242,19 @@ class KnowledgeGraphBuilder:
         for line in lines:
             if line.startswith("--- Table"):
                 if current_table:
-                    self._parse_table_data(current_table)
+                    self._parse_table_data(current_table, entities, relationships)
                     current_table = []
                 continue
             if line.strip():
                 current_table.append(line.strip())
         if current_table:
-            self._parse_table_data(current_table)
+            self._parse_table_data(current_table, entities, relationships)
+        return entities, relationships
 
-    def _parse_table_data(self, table_lines):
+    def process_tables(self, filepath):
+        self._merge(*self._table_document_contribution(_read_text(filepath)))
+
+    def _parse_table_data(self, table_lines, entities, relationships):
         # This is a very basic table parser. Needs to be customized for each table type.
         # Example: For the "Tools" table, extract Name, Platform, Download URL
         if not table_lines: return
@@ -95,8 +268,8 @@ class KnowledgeGraphBuilder:
                     tool_name = row_data[header.index("Platform")] if "Platform" in header else f"Tool_{row_idx}"
                     download_url = row_data[header.index("Download URL")] if "Download URL" in header else ""
                     if tool_name and download_url:
-                        self.entities["Software/Tool"].add(tool_name)
-                        self.relationships["Software/Tool"].append((tool_name, "HAS_DOWNLOAD_URL", download_url))
+                        entities["Software/Tool"].add(tool_name)
+                        relationships["Software/Tool"].append((tool_name, "HAS_DOWNLOAD_URL", download_url))
         
         # Example: For the "Metadata" table, extract key-value pairs
         if "Core Metadata Elements" in header and "Definition" in header:
@@ -107,19 +280,223 @@ class KnowledgeGraphBuilder:
                     definition = row_data[header.index("Definition")] if "Definition" in header else ""
                     if metadata_element and definition:
                         # This can be refined to create specific entities/relationships
-                        self.relationships["Metadata"].append((metadata_element, "HAS_DEFINITION", definition))
-
-
-    def build_graph(self):
-        for root, _, files in os.walk(self.extracted_content_dir):
-            for file in files:
-                filepath = os.path.join(root, file)
-                if filepath.endswith(".txt") and not filepath.endswith("_tables.txt"):
-                    print(f"Processing text file: {filepath}")
-                    self.process_text_file(filepath)
-                elif filepath.endswith("_tables.txt"):
-                    print(f"Processing table file: {filepath}")
-                    self.process_tables(filepath)
+                        relationships["Metadata"].append((metadata_element, "HAS_DEFINITION", definition))
+
+    # ---- Incremental builds ----
+    # Sources come from the extracted_content document store, one per
+    # distinct blob, so identical and near-duplicate pages are processed once.
+    # build_manifest.json maps every blob digest to the entities and
+    # relationships it contributed. Only blobs not in the manifest go through
+    # NLP; the graph is the merge of all recorded contributions, so a page
+    # that was removed or changed simply drops its old contribution.
+
+    def _manifest_path(self):
+        return os.path.join(self.output_dir, MANIFEST_FILE)
+
+    def _load_manifest(self):
+        try:
+            with open(self._manifest_path(), "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+        if manifest.get("version") != MANIFEST_VERSION:
+            return {}
+        return manifest["documents"]
+
+    def _save_manifest(self, documents):
+        tmp_path = self._manifest_path() + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "documents": documents}, f)
+        os.replace(tmp_path, self._manifest_path())
+
+    def _manifest_entry(self, document, entities, relationships):
+        return {
+            "kind": document.kind,
+            "name": document.name,
+            "entities": {ent_type: sorted(ents) for ent_type, ents in entities.items()},
+            "relationships": {rel_type: [list(rel) for rel in rels] for rel_type, rels in relationships.items()},
+        }
+
+    def _merge_manifest(self, documents):
+        # Triples found in several documents are kept once, in first-seen order
+        self.entities = defaultdict(set)
+        relationships = defaultdict(dict)
+        for digest in sorted(documents, key=lambda digest: documents[digest]["name"]):
+            entry = documents[digest]
+            for ent_type, ents in entry["entities"].items():
+                self.entities[ent_type].update(ents)
+            for rel_type, rels in entry["relationships"].items():
+                relationships[rel_type].update(dict.fromkeys(tuple(rel) for rel in rels))
+        self.relationships = defaultdict(list, {rel_type: list(rels) for rel_type, rels in relationships.items()})
+
+    def stop(self):
+        # Safe to call from another thread. The build stops before anything in
+        # output_dir is written, so the previous graph stays in place.
+        self.stopped = True
+
+    def progress(self):
+        return {
+            "stage": self.stage,
+            "files_processed": self.files_processed,
+            "done": self.files_processed,
+            "total": self.files_total,
+        }
+
+    def _enter_stage(self, stage):
+        # Records how long the previous stage took
+        now = time.perf_counter()
+        if self.stage not in (None, "done") and self._stage_started is not None:
+            STAGE_SECONDS.observe(now - self._stage_started, stage=self.stage)
+        self.stage = stage
+        self._stage_started = now
+
+    def _check_stopped(self):
+        if self.stopped:
+            raise BuildCancelled("Knowledge graph build cancelled")
+
+    def build_graph(self, bulk=True, incremental=True, semantic=True):
+        # The store is opened here rather than in __init__: background jobs
+        # create the builder in one thread and run it in another
+        with DocumentStore(self.extracted_content_dir) as store:
+            self._build_graph(store, bulk, incremental, semantic)
+
+    def _build_graph(self, store, bulk, incremental, semantic):
+        self._enter_stage("scanning")
+        documents = self._load_manifest() if incremental else {}
+        imported = store.import_files()
+        sources = {document.digest: document for document in store.documents()}
+
+        removed = [digest for digest in documents if digest not in sources]
+        for digest in removed:
+            del documents[digest]
+        changed = [document for digest, document in sources.items() if digest not in documents]
+
+        print(f"Knowledge graph sources: {len(changed)} new or changed, {len(removed)} removed, "
+              f"{len(sources) - len(changed)} unchanged ({imported} loose files imported)")
+
+        self._extract_documents(store, changed, documents, bulk)
+        self._check_stopped()
+        self._write_outputs(store, documents, bool(changed or removed), semantic)
+
+    # ---- Sharded builds ----
+    # build_shard is the map phase: it extracts one shard of the store's
+    # documents into shards/<name>.kgs (see kg_shards). merge_shards is the
+    # merge phase: it combines the shard files for the store's current
+    # documents and writes the outputs exactly as build_graph does. Shards
+    # only read the store, so they run as separate processes or on separate
+    # machines sharing extracted_content and the output directory; loose
+    # files must be imported first (prepare_shards).
+
+    def prepare_shards(self, count):
+        # Imports loose files and returns the number of documents per hash shard
+        sizes = [0] * count
+        with DocumentStore(self.extracted_content_dir) as store:
+            store.import_files()
+            for document in store.documents():
+                sizes[shard_of(document.digest, count)] += 1
+        return sizes
+
+    def build_shard(self, shard=None, names=None, name=None, bulk=True):
+        # shard: (index, count) hash range; or names: the document names to
+        # extract (as build output shows them) under the shard file `name`.
+        # Returns the shard file path.
+        if shard is not None:
+            name = hash_shard_name(*shard)
+            description = {"index": shard[0], "count": shard[1]}
+        elif names is not None and name:
+            names = set(names)
+            description = {"name": name}
+        else:
+            raise ValueError("build_shard needs a hash shard, or document names and a shard name")
+        path = shard_path(self.output_dir, name)
+        with DocumentStore(self.extracted_content_dir, read_only=True) as store:
+            self._enter_stage("scanning")
+            if shard is not None:
+                selected = [document for document in store.documents() if shard_of(document.digest, shard[1]) == shard[0]]
+            else:
+                selected = [document for document in store.documents() if document.name in names]
+            # Contributions already extracted, by an earlier run of this shard
+            # or by a single-process build, are reused
+            known = self._load_manifest()
+            known.update(read_shard(path)[1])
+            documents = {document.digest: dict(known[document.digest], kind=document.kind, name=document.name)
+                         for document in selected if document.digest in known}
+            changed = [document for document in selected if document.digest not in documents]
+            print(f"Shard {name}: {len(selected)} documents, {len(changed)} to extract")
+            self._extract_documents(store, changed, documents, bulk)
+        self._check_stopped()
+        self._enter_stage("writing")
+        write_shard(path, description, documents)
+        self._enter_stage("done")
+        return path
+
+    def merge_shards(self, semantic=True, names=None):
+        # Merges the shard files in `names` (default: every shard file).
+        # Raises ShardsIncomplete, leaving the previous graph in place, when a
+        # document is in none of them (a shard failed or has not run yet).
+        with DocumentStore(self.extracted_content_dir, read_only=True) as store:
+            self._enter_stage("scanning")
+            previous = self._load_manifest()
+            sources = {document.digest: document for document in store.documents()}
+            contributions = {}
+            counts = set()
+            paths = shard_paths(self.output_dir, names)
+            for path in paths:
+                shard, entries = read_shard(path)
+                if "count" in shard:
+                    counts.add(shard["count"])
+                contributions.update(entries)
+            missing = [document for digest, document in sources.items() if digest not in contributions]
+            if missing:
+                raise ShardsIncomplete(missing, counts.pop() if len(counts) == 1 else None)
+            documents = {digest: dict(contributions[digest], kind=document.kind, name=document.name)
+                         for digest, document in sources.items()}
+            print(f"Merging {len(paths)} shards: {len(documents)} documents")
+            self._check_stopped()
+            self._write_outputs(store, documents, set(documents) != set(previous), semantic)
+
+    def _extract_documents(self, store, changed, documents, bulk):
+        # Runs table parsing and NER over `changed`, recording each document's
+        # contribution in `documents` (digest -> manifest entry)
+        self._enter_stage("extracting")
+        self.files_total = len(changed)
+        self.files_processed = 0
+        ner_documents, ner_seconds = NER_DOCUMENTS.value(), NER_SECONDS.value()
+        text_documents = []
+        for document in changed:
+            self._check_stopped()
+            if document.kind == KIND_TABLES:
+                print(f"Processing table document: {document.name}")
+                contribution = self._table_document_contribution(store.read(document.digest))
+                TABLE_DOCUMENTS.inc()
+                documents[document.digest] = self._manifest_entry(document, *contribution)
+                self.files_processed += 1
+            elif bulk:
+                text_documents.append(document)
+            else:
+                print(f"Processing text document: {document.name}")
+                contribution = self._text_document_contribution(store.read(document.digest))
+                documents[document.digest] = self._manifest_entry(document, *contribution)
+                self.files_processed += 1
+        if text_documents:
+            # Keyed by name (unique per blob) so progress output shows the source
+            by_name = {document.name: document for document in text_documents}
+            texts = ((document.name, store.read(document.digest)) for document in text_documents)
+            for name, entities, relationships in self._iter_text_contributions(texts):
+                document = by_name[name]
+                documents[document.digest] = self._manifest_entry(document, entities, relationships)
+                self.files_processed += 1
+                self._check_stopped()
+        ner_documents = NER_DOCUMENTS.value() - ner_documents
+        ner_seconds = NER_SECONDS.value() - ner_seconds
+        if ner_documents and ner_seconds > 0:
+            NER_RATE.set(ner_documents / ner_seconds)
+            print(f"NER: {ner_documents} documents, {ner_documents / ner_seconds:.1f} docs/sec")
+
+    def _write_outputs(self, store, documents, sources_changed, semantic):
+        self._enter_stage("writing")
+        self._merge_manifest(documents)
+        self._save_manifest(documents)
         
         # Save extracted entities and relationships
         with open(os.path.join(self.output_dir, "entities.txt"), "w", encoding="utf-8") as f:
@@ -134,11 +511,116 @@ class KnowledgeGraphBuilder:
                 for rel in rels:
                     f.write(f"{rel}\n")
 
-        print("Knowledge graph building complete. Entities and relationships saved.")
+        # Indexed binary copy the chatbot memory-maps instead of parsing the text files
+        build_id = write_graph(os.path.join(self.output_dir, GRAPH_FILE), self.entities, self.relationships)
 
-if __name__ == "__main__":
-    # This part will be executed when the script is run directly
-    # Ensure 'extracted_content' directory exists and contains scraped data
-    kg_builder = KnowledgeGraphBuilder()
-    kg_builder.build_graph()
+        # Passage index for the chatbot's keyword retrieval
+        index_path = os.path.join(self.output_dir, INDEX_FILE)
+        if sources_changed or not os.path.exists(index_path):
+            self._enter_stage("indexing")
+            print(f"Building search index: {index_path}")
+            build_index(store.iter_documents(), index_path)
+
+        # Passage vectors for semantic retrieval; only documents whose text
+        # changed are embedded again
+        if semantic:
+            from vector_index import build_vector_index, VECTOR_FILE
+            if sources_changed or not os.path.exists(os.path.join(self.output_dir, VECTOR_FILE)):
+                self._enter_stage("embedding")
+                _, embedded, reused = build_vector_index(store.iter_documents, self.output_dir)
+                print(f"Vector index: {embedded} documents embedded, {reused} reused")
+
+        self._enter_stage("done")
+        print(f"Knowledge graph building complete (build {build_id}). Entities and relationships saved.")
+
+def build_sharded(extracted_content_dir, output_dir, shards, processes=None, semantic=True):
+    # Map phase as child processes (at most `processes` at once), then the
+    # merge. Each child's output goes to shards/<shard>.log. Returns the
+    # indices of the shards that failed; nothing is merged if any did, and
+    # only those need running again. Shard files of other shardings are
+    # deleted first, so the merge reads only this run's.
+    builder = KnowledgeGraphBuilder(extracted_content_dir, output_dir)
+    sizes = builder.prepare_shards(shards)
+    print(f"Sharded build: {sum(sizes)} documents in {shards} shards")
+    names = hash_shard_names(shards)
+    removed = remove_stale_shards(output_dir, set(names))
+    if removed:
+        print(f"Removed {len(removed)} shard files of earlier runs")
+    processes = processes or os.cpu_count() or 1
+    pending = list(range(shards))
+    running = {}
+    failed = []
+    os.makedirs(os.path.join(output_dir, SHARD_DIR), exist_ok=True)
+    while pending or running:
+        while pending and len(running) < processes:
+            index = pending.pop(0)
+            log_path = os.path.join(output_dir, SHARD_DIR, hash_shard_name(index, shards) + ".log")
+            with open(log_path, "w", encoding="utf-8") as log:
+                running[index] = subprocess.Popen(
+                    [sys.executable, os.path.abspath(__file__), "--content-dir", extracted_content_dir,
+                     "--output-dir", output_dir, "map", "--shard", f"{index}/{shards}"],
+                    stdout=log, stderr=subprocess.STDOUT)
+        time.sleep(0.1)
+        for index, process in list(running.items()):
+            if process.poll() is not None:
+                del running[index]
+                if process.returncode != 0:
+                    failed.append(index)
+                print(f"Shard {index}/{shards}: {'failed' if process.returncode else 'done'} "
+                      f"({len(pending) + len(running)} remaining)")
+    if failed:
+        return sorted(failed)
+    builder.merge_shards(semantic=semantic, names=names)
+    return []
 
+def main():
+    parser = argparse.ArgumentParser(description="Build the knowledge graph from extracted_content")
+    parser.add_argument("--content-dir", default="extracted_content")
+    parser.add_argument("--output-dir", default="knowledge_graph")
+    parser.add_argument("--no-semantic", action="store_true", help="Skip the vector index")
+    commands = parser.add_subparsers(dest="command")
+    build = commands.add_parser("build", help="Build in this process (the default), or map/merge with --shards")
+    build.add_argument("--shards", type=int, help="Split the map phase into this many hash shards")
+    build.add_argument("--processes", type=int, help="Shards run at once (default: CPU count)")
+    map_shard = commands.add_parser("map", help="Extract one shard into shards/<shard>.kgs")
+    selection = map_shard.add_mutually_exclusive_group(required=True)
+    selection.add_argument("--shard", type=parse_shard, help="INDEX/COUNT hash range, e.g. 3/16")
+    selection.add_argument("--files", help="File with one document name per line")
+    map_shard.add_argument("--name", help="Shard file name for --files (default: the list's file name)")
+    merge = commands.add_parser("merge", help="Combine the shard files into the graph")
+    merge.add_argument("--shards", type=int, help="Only merge the hash shards of this count (default: every shard file)")
+    plan = commands.add_parser("plan", help="Import loose files and show the documents per shard")
+    plan.add_argument("--shards", type=int, required=True)
+    args = parser.parse_args()
+    semantic = not args.no_semantic
+
+    if args.command == "map":
+        builder = KnowledgeGraphBuilder(args.content_dir, args.output_dir)
+        if args.shard is not None:
+            path = builder.build_shard(shard=args.shard)
+        else:
+            with open(args.files, "r", encoding="utf-8") as f:
+                names = [line.strip() for line in f if line.strip()]
+            name = args.name or os.path.splitext(os.path.basename(args.files))[0]
+            path = builder.build_shard(names=names, name=name)
+        print(f"Shard written: {path}")
+    elif args.command == "merge":
+        try:
+            names = hash_shard_names(args.shards) if args.shards else None
+            KnowledgeGraphBuilder(args.content_dir, args.output_dir).merge_shards(semantic=semantic, names=names)
+        except ShardsIncomplete as e:
+            sys.exit(str(e))
+    elif args.command == "plan":
+        sizes = KnowledgeGraphBuilder(args.content_dir, args.output_dir).prepare_shards(args.shards)
+        for index, size in enumerate(sizes):
+            print(f"{index}/{args.shards}\t{size}")
+    elif args.command == "build" and args.shards:
+        failed = build_sharded(args.content_dir, args.output_dir, args.shards, args.processes, semantic)
+        if failed:
+            sys.exit(f"Shards failed: {', '.join(f'{i}/{args.shards}' for i in failed)}; run them again with "
+                     f"`map --shard`, then `merge --shards {args.shards}` (logs in {os.path.join(args.output_dir, SHARD_DIR)})")
+    else:
+        KnowledgeGraphBuilder(args.content_dir, args.output_dir).build_graph(semantic=semantic)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+# Shared container for the binary files the chatbot memory-maps (graph.kg,
+# search.idx): a header, a few integer metadata fields and a table of named,
+# 8-byte aligned sections. Sections are exposed as zero-copy memoryviews cast
+# to their array typecode ("B" sections are raw bytes).
+
+HEADER = struct.Struct("<8sII16sII")     # magic, version, byteorder, build id, metadata count, section count
+SECTION_ENTRY = struct.Struct("<16s4sQQ")  # name, typecode, offset, length in bytes
+BYTEORDER = 1 if sys.byteorder == "little" else 2
+
+
+def string_table(strings):
+    # Returns (offsets, blob): string i is blob[offsets[i]:offsets[i + 1]]
+    offsets = array("Q", [0])
+    blob = bytearray()
+    for s in strings:
+        blob += s.encode("utf-8")
+        offsets.append(len(blob))
+    return offsets, bytes(blob)
+
+
+def csr_offsets(keys, count):
+    # Counts per key -> prefix sums; returns offsets[count + 1]
+    offsets = array("I", [0]) * (count + 1)
+    for key in keys:
+        offsets[key + 1] += 1
+    for i in range(count):
+        offsets[i + 1] += offsets[i]
+    return offsets
+
+
+def write_sections(path, magic, version, metadata, sections):
+    # metadata: list of ints; sections: list of (name, typecode, array or bytes).
+    # The file is written to a temporary path and renamed into place so readers
+    # that have the old file mapped keep a consistent view. Returns the build
+    # id, a hash of all section contents.
+    payloads = [bytes(data) if typecode == "B" else data.tobytes() for _, typecode, data in sections]
+    build_id = hashlib.blake2b(digest_size=16)
+    for payload in payloads:
+        build_id.update(payload)
+
+    position = HEADER.size + 8 * len(metadata) + SECTION_ENTRY.size * len(sections)
+    table = []
+    for payload in payloads:
+        position += -position % 8
+        table.append((position, len(payload)))
+        position += len(payload)
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(magic, version, BYTEORDER, build_id.digest(), len(metadata), len(sections)))
+        f.write(struct.pack(f"<{len(metadata)}Q", *metadata))
+        for (name, typecode, _), (offset, length) in zip(sections, table):
+            f.write(SECTION_ENTRY.pack(name.encode("ascii"), typecode.encode("ascii"), offset, length))
+        for (offset, _), payload in zip(table, payloads):
+            f.write(b"\0" * (offset - f.tell()))
+            f.write(payload)
+    os.replace(tmp_path, path)
+    return build_id.hexdigest()
+
+
+class SectionFile:
+    def __init__(self, path, magic, version):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        file_magic, file_version, byteorder, build_id, n_metadata, n_sections = HEADER.unpack_from(self._mmap, 0)
+        if file_magic != magic or file_version != version:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a version {version} {magic.decode('ascii')} file")
+        if byteorder != BYTEORDER:
+            self._mmap.close()
+            raise ValueError(f"{path} was written on a machine with a different byte order")
+        self.build_id = build_id.hex()
+        self.metadata = struct.unpack_from(f"<{n_metadata}Q", self._mmap, HEADER.size)
+
+        self._view = memoryview(self._mmap)
+        self.sections = {}
+        table_start = HEADER.size + 8 * n_metadata
+        for i in range(n_sections):
+            name, typecode, offset, length = SECTION_ENTRY.unpack_from(self._mmap, table_start + i * SECTION_ENTRY.size)
+            section = self._view[offset:offset + length]
+            typecode = typecode.rstrip(b"\0").decode("ascii")
+            if typecode != "B":
+                section = section.cast(typecode)
+            self.sections[name.rstrip(b"\0").decode("ascii")] = section
+
+    def __getitem__(self, name):
+        return self.sections[name]
+
+    def close(self):
+        for section in self.sections.values():
+            section.release()
+        self._view.release()
+        self._mmap.close()
+
+
+def read_string(offsets, blob, i):
+    return str(blob[offsets[i]:offsets[i + 1]], "utf-8")
@@ -0,0 +1,142 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+# Opt-in sampling profiler for slow requests. One background thread samples
+# the stacks of the threads currently being profiled every `interval`
+# seconds (sys._current_frames, so the profiled code runs unmodified and
+# pays nothing when profiling is off). A request that ends up slower than
+# `threshold_ms` has its samples written as folded stacks,
+#   module:function;module:function;... <samples>
+# one file per request under `output_dir`, which flamegraph.pl, speedscope
+# and inferno read directly.
+
+DEFAULT_INTERVAL = 0.005
+MAX_DUMPS = 200  # oldest .folded files beyond this are deleted
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f"{module}:{code.co_name}"
+
+
+def _folded_stack(frame):
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class SamplingProfiler:
+    def __init__(self, interval=DEFAULT_INTERVAL):
+        self.interval = interval
+        self._samples = {}  # thread id -> Counter of folded stacks
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._thread = None
+
+    def start(self, thread_id=None):
+        thread_id = thread_id if thread_id is not None else threading.get_ident()
+        with self._lock:
+            self._samples[thread_id] = Counter()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._sample_loop, name="profiler", daemon=True)
+                self._thread.start()
+            self._wakeup.notify()
+        return thread_id
+
+    def stop(self, thread_id=None):
+        # Returns the Counter of folded stacks sampled since start
+        thread_id = thread_id if thread_id is not None else threading.get_ident()
+        with self._lock:
+            return self._samples.pop(thread_id, Counter())
+
+    def _sample_loop(self):
+        while True:
+            with self._lock:
+                while not self._samples:
+                    self._wakeup.wait()
+                targets = list(self._samples)
+            frames = sys._current_frames()
+            with self._lock:
+                for thread_id in targets:
+                    frame = frames.get(thread_id)
+                    samples = self._samples.get(thread_id)
+                    if frame is not None and samples is not None:
+                        samples[_folded_stack(frame)] += 1
+            del frames
+            time.sleep(self.interval)
+
+
+class SlowRequestProfiler:
+    # Wraps SamplingProfiler with the request-level toggle used by app.py:
+    # begin() when a request starts, end() when it finishes
+    def __init__(self, output_dir="profiles", threshold_ms=None, interval=DEFAULT_INTERVAL):
+        self.output_dir = output_dir
+        self.threshold_ms = threshold_ms  # None: profiling off
+        self.sampler = SamplingProfiler(interval)
+        self.dumps = 0
+
+    @property
+    def enabled(self):
+        return self.threshold_ms is not None
+
+    def configure(self, threshold_ms=None, interval=None):
+        self.threshold_ms = threshold_ms
+        if interval is not None:
+            self.sampler.interval = interval
+
+    def begin(self):
+        # Returns a token for end(), or None when profiling is off
+        if not self.enabled:
+            return None
+        return self.sampler.start(), time.perf_counter()
+
+    def end(self, token, name):
+        # Writes the request's samples if it was slow; returns the file path or None
+        if token is None:
+            return None
+        thread_id, start = token
+        samples = self.sampler.stop(thread_id)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        threshold_ms = self.threshold_ms
+        if threshold_ms is None or elapsed_ms < threshold_ms or not samples:
+            return None
+        os.makedirs(self.output_dir, exist_ok=True)
+        safe_name = "".join(c if c.isalnum() else "_" for c in name).strip("_") or "request"
+        path = os.path.join(self.output_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-{int(elapsed_ms)}ms-{safe_name}.folded")
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in samples.most_common():
+                f.write(f"{stack} {count}\n")
+        self.dumps += 1
+        self._prune()
+        return path
+
+    def recent(self, limit=20):
+        try:
+            names = sorted(name for name in os.listdir(self.output_dir) if name.endswith(".folded"))
+        except FileNotFoundError:
+            return []
+        return names if limit is None else names[-limit:]
+
+    def _prune(self):
+        names = self.recent(limit=None)
+        for name in names[:max(0, len(names) - MAX_DUMPS)]:
+            try:
+                os.remove(os.path.join(self.output_dir, name))
+            except FileNotFoundError:
+                pass
+
+    def status(self):
+        return {
+            "enabled": self.enabled,
+            "threshold_ms": self.threshold_ms,
+            "interval_ms": round(self.sampler.interval * 1000, 3),
+            "output_dir": self.output_dir,
+            "dumps": self.dumps,
+            "recent": self.recent(),
+        }
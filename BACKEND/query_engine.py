@@ -0,0 +1,266 @@
+import os
+import re
+import time
+from kg_store import KnowledgeGraphStore, GRAPH_FILE
+from search_index import SearchIndex, STOPWORDS, INDEX_FILE
+
+# vector_index (and NumPy) is only imported when a vectors.idx exists
+VECTOR_FILE = "vectors.idx"
+VECTOR_MODEL_FILE = "lsa.model"
+
+MAX_MENTION_WORDS = 6      # longest entity name tried when matching query n-grams
+MAX_RELATIONSHIPS = 10     # 1-hop relationships returned per matched entity
+ANSWER_CHARS = 500
+FRAGMENT_WORDS = 12        # words per streamed answer fragment
+BATCH_SIZE = 256           # queries scored together by answer_batch
+RRF_K = 60                 # reciprocal rank fusion constant for keyword + semantic hits
+NO_ANSWER = "Sorry, I couldn't find information about that in the MOSDAC knowledge base."
+MENTION_WORD_RE = re.compile(r"[^\s?!,;:()\"']+")
+
+
+class QueryEngine:
+    # Answers chat queries from the offline artefacts build_graph writes to
+    # kg_dir: BM25 over text passages (search.idx) plus entity lookup with
+    # 1-hop relationships in the knowledge graph (graph.kg). Both are
+    # memory-mapped, so no document is scanned at query time.
+    def __init__(self, kg_dir="knowledge_graph", top_k=3, refresh_interval=1.0):
+        self.kg_dir = kg_dir
+        self.top_k = top_k
+        self.refresh_interval = refresh_interval
+        self.graph = None
+        self.index = None
+        self.vectors = None
+        self.embedder = None
+        self._signature = None
+        self._checked_at = time.monotonic()
+        self.load()
+
+    def _paths(self):
+        return (os.path.join(self.kg_dir, GRAPH_FILE), os.path.join(self.kg_dir, INDEX_FILE),
+                os.path.join(self.kg_dir, VECTOR_FILE), os.path.join(self.kg_dir, VECTOR_MODEL_FILE))
+
+    def _file_signature(self):
+        signature = []
+        for path in self._paths():
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_ino, stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+
+    def load(self):
+        # The old stores are not closed here: queries still running on other
+        # threads keep them alive, and the mmaps are released once unused.
+        self._signature = self._file_signature()
+        graph_path, index_path, vector_path, _ = self._paths()
+        self.graph = KnowledgeGraphStore.open(graph_path) if os.path.exists(graph_path) else None
+        self.index = SearchIndex.open(index_path) if os.path.exists(index_path) else None
+        self.vectors, self.embedder = self._load_vectors(vector_path)
+
+    def _load_vectors(self, vector_path):
+        # Semantic retrieval is optional: without a vectors.idx built by the
+        # same embedder, passages come from BM25 alone
+        if not os.path.exists(vector_path):
+            return None, None
+        try:
+            from vector_index import VectorIndex, load_embedder
+            vectors = VectorIndex.open(vector_path)
+            embedder = load_embedder(self.kg_dir)
+        except Exception as e:
+            print(f"Semantic retrieval disabled: {e}")
+            return None, None
+        if embedder.model_id != vectors.model_id:
+            print(f"Semantic retrieval disabled: {vector_path} was built with {vectors.model_id}, "
+                  f"not {embedder.model_id}")
+            return None, None
+        return vectors, embedder
+
+    def refresh_if_changed(self):
+        # build_graph replaces the files atomically; other worker processes
+        # notice the new inode/mtime here and remap, at most one stat pair
+        # per refresh_interval.
+        now = time.monotonic()
+        if now - self._checked_at < self.refresh_interval:
+            return False
+        self._checked_at = now
+        if self._file_signature() == self._signature:
+            return False
+        self.load()
+        return True
+
+    @property
+    def version(self):
+        # Changes whenever the graph or passage index content changes
+        graph_id = self.graph.build_id if self.graph is not None else "-"
+        index_id = self.index.build_id if self.index is not None else "-"
+        vector_id = self.vectors.build_id if self.vectors is not None else "-"
+        return f"{graph_id}.{index_id}.{vector_id}"
+
+    def close(self):
+        if self.graph is not None:
+            self.graph.close()
+            self.graph = None
+        if self.index is not None:
+            self.index.close()
+            self.index = None
+        if self.vectors is not None:
+            self.vectors.close()
+            self.embedder.close()
+            self.vectors = self.embedder = None
+
+    def find_entities(self, query, memo=None):
+        # Greedy longest-match of query word n-grams against graph node names.
+        # memo ({mention: node ids}) shares lookups between queries of a batch.
+        if self.graph is None:
+            return []
+        words = [word.strip(".") for word in MENTION_WORD_RE.findall(query)]
+        words = [word for word in words if word]
+        matches = []
+        i = 0
+        while i < len(words):
+            for n in range(min(MAX_MENTION_WORDS, len(words) - i), 0, -1):
+                mention = " ".join(words[i:i + n])
+                if n == 1 and mention.lower() in STOPWORDS:
+                    continue
+                if memo is None:
+                    node_ids = self.graph.find(mention)
+                elif mention in memo:
+                    node_ids = memo[mention]
+                else:
+                    node_ids = memo[mention] = self.graph.find(mention)
+                if node_ids:
+                    matches.extend(node_ids)
+                    i += n
+                    break
+            else:
+                i += 1
+        return list(dict.fromkeys(matches))
+
+    def _node_facts(self, node_id):
+        name = self.graph.node_name(node_id)
+        entities = [[ent_type, name] for ent_type in self.graph.node_types(node_id) or ["ENTITY"]]
+        relationships = [[rel[1], list(rel)] for rel in self.graph.neighbors(node_id)[:MAX_RELATIONSHIPS]]
+        return entities, relationships
+
+    def entity_facts(self, node_ids, memo=None):
+        # ([[type, name], ...], [[predicate, [subj, pred, obj]], ...]);
+        # memo ({node id: facts}) is shared between queries of a batch
+        entities, relationships = [], []
+        for node_id in node_ids:
+            if memo is None:
+                facts = self._node_facts(node_id)
+            elif node_id in memo:
+                facts = memo[node_id]
+            else:
+                facts = memo[node_id] = self._node_facts(node_id)
+            entities.extend(facts[0])
+            relationships.extend(facts[1])
+        return entities, relationships
+
+    def _semantic_hits(self, query):
+        if self.vectors is None:
+            return []
+        return self.vectors.search(self.embedder.embed([query])[0], self.top_k)
+
+    def _semantic_hits_batch(self, queries):
+        # One embed() call for the whole batch, then one index search per query
+        if self.vectors is None:
+            return [[] for _ in queries]
+        return [self.vectors.search(vector, self.top_k) for vector in self.embedder.embed(queries)]
+
+    def _passages(self, keyword_hits, semantic_hits=()):
+        # BM25 and vector hits merged by reciprocal rank fusion; "score" is
+        # the fused score and "retrieval" says which stage(s) found it
+        fused = {}
+        for store, hits, stage in ((self.index, keyword_hits, "keyword"), (self.vectors, semantic_hits, "semantic")):
+            for rank, (chunk_id, _) in enumerate(hits):
+                key = (store.chunk_source(chunk_id), store.chunk_text(chunk_id))
+                entry = fused.setdefault(key, {"source": key[0], "text": key[1], "score": 0.0, "retrieval": []})
+                entry["score"] += 1 / (RRF_K + rank + 1)
+                entry["retrieval"].append(stage)
+        passages = sorted(fused.values(), key=lambda entry: entry["score"], reverse=True)[:self.top_k]
+        for entry in passages:
+            entry["score"] = round(entry["score"], 4)
+            entry["retrieval"] = "+".join(entry["retrieval"])
+        return passages
+
+    def passages(self, query):
+        keyword_hits = self.index.search(query, self.top_k) if self.index is not None else []
+        return self._passages(keyword_hits, self._semantic_hits(query))
+
+    def compose_answer(self, passages, relationships):
+        if passages:
+            text = passages[0]["text"]
+            if len(text) > ANSWER_CHARS:
+                text = text[:ANSWER_CHARS].rsplit(" ", 1)[0] + "..."
+            return text
+        if relationships:
+            return "; ".join(f"{subj} {pred.replace('_', ' ').lower()} {obj}"
+                             for _, (subj, pred, obj) in relationships[:3]) + "."
+        return NO_ANSWER
+
+    def stream(self, query):
+        # Events in the order their data becomes available:
+        #   {"type": "entities", "entities": [...], "relationships": [...]}
+        #   {"type": "passages", "passages": [...]}
+        #   {"type": "answer", "text": fragment}  (one or more)
+        #   {"type": "done", "response": <the answer() dict>}
+        start = time.perf_counter()
+        entities, relationships = self.entity_facts(self.find_entities(query))
+        yield {"type": "entities", "entities": entities, "relationships": relationships}
+        passages = self.passages(query)
+        yield {"type": "passages", "passages": passages}
+        answer = self.compose_answer(passages, relationships)
+        for fragment in answer_fragments(answer):
+            yield {"type": "answer", "text": fragment}
+        yield {"type": "done", "response": {
+            "query": query,
+            "answer": answer,
+            "entities": entities,
+            "relationships": relationships,
+            "passages": passages,
+            "latency_ms": round((time.perf_counter() - start) * 1000, 3),
+        }}
+
+    def answer(self, query):
+        for event in self.stream(query):
+            pass
+        return event["response"]
+
+    def answer_batch(self, queries, batch_size=BATCH_SIZE):
+        # Yields answer() dicts in query order. Each slice of batch_size
+        # queries shares graph lookups and is scored with one search_batch
+        # and one embed call; latency_ms is the query's own work plus its
+        # share of those.
+        mention_memo, facts_memo = {}, {}
+        for offset in range(0, len(queries), batch_size):
+            batch = queries[offset:offset + batch_size]
+            start = time.perf_counter()
+            if self.index is not None:
+                batch_hits = self.index.search_batch(batch, self.top_k)
+            else:
+                batch_hits = [[] for _ in batch]
+            batch_semantic = self._semantic_hits_batch(batch)
+            shared_ms = (time.perf_counter() - start) * 1000 / len(batch)
+            for query, hits, semantic_hits in zip(batch, batch_hits, batch_semantic):
+                start = time.perf_counter()
+                node_ids = self.find_entities(query, mention_memo)
+                entities, relationships = self.entity_facts(node_ids, facts_memo)
+                passages = self._passages(hits, semantic_hits)
+                yield {
+                    "query": query,
+                    "answer": self.compose_answer(passages, relationships),
+                    "entities": entities,
+                    "relationships": relationships,
+                    "passages": passages,
+                    "latency_ms": round((time.perf_counter() - start) * 1000 + shared_ms, 3),
+                }
+
+
+def answer_fragments(answer, words_per_fragment=FRAGMENT_WORDS):
+    # Fragments concatenate back to the answer exactly (each keeps its
+    # trailing whitespace)
+    words = re.findall(r"\S+\s*", answer)
+    for i in range(0, len(words), words_per_fragment):
+        yield "".join(words[i:i + words_per_fragment])
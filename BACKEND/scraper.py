@@ -1,182 +1,448 @@
 import asyncio
-from playwright.async_api import async_playwright
-from bs4 import BeautifulSoup
+from contextlib import asynccontextmanager
+import hashlib
 import os
+import time
 from urllib.parse import urljoin, urlparse
-import PyPDF2
-import docx
-from openpyxl import load_workbook
-from collections import deque
+from collections import Counter
+from fetcher import StaticFetcher, RenderPolicy, is_html_response, TIER_STATIC, TIER_BROWSER, TIER_FILE
+from crawl_state import CrawlManifest, content_hash
+from extraction import ExtractionPipeline, EXTRACTORS
+from html_extract import extract_html, decode_html
+from doc_store import DocumentStore, KIND_TEXT, KIND_TABLES, KIND_HTML
+from frontier import Frontier, URLRules, canonicalize_url
+from metrics import Counter as MetricCounter, Histogram
+
+# Where crawl time goes: network (fetch), Chromium (render) or parsing
+FETCH_SECONDS = Histogram("crawl_fetch_seconds", "HTTP fetch latency per request", ["tier"])
+RENDER_SECONDS = Histogram("crawl_render_seconds", "Chromium navigation and DOM capture time per page")
+HTML_EXTRACT_SECONDS = Histogram("crawl_html_extract_seconds", "Single-pass HTML extraction time per page")
+BYTES_DOWNLOADED = MetricCounter("crawl_downloaded_bytes_total", "Response bytes received", ["tier"])
+PAGES_CRAWLED = MetricCounter("crawl_pages_total", "URLs crawled, by how they were fetched", ["tier"])
+UNCHANGED_PAGES = MetricCounter("crawl_unchanged_pages_total", "URLs found unchanged since the last crawl")
+
+def download_name(url):
+    # File name for a downloaded document: the URL's own name plus a hash of
+    # the URL, so /a/report.pdf and /b/report.pdf waiting in the extraction
+    # queue never overwrite each other, and a URL keeps its file across crawls
+    stem, ext = os.path.splitext(os.path.basename(urlparse(url).path))
+    return f"{stem}-{hashlib.sha256(url.encode('utf-8')).hexdigest()[:16]}{ext}"
 
 class MOSDACScraper:
-    def __init__(self, base_url, output_dir="extracted_content", max_depth=3):
+    def __init__(self, base_url, output_dir="extracted_content", max_depth=3,
+                 workers=1, per_host_limit=4, politeness_delay=0.0,
+                 static_fetch=True, render_patterns=None, static_patterns=None, min_text_chars=200,
+                 incremental=True, state_path=None,
+                 extract_processes=None, extract_timeout=300, extract_max_pages=1000,
+                 keep_query=False, frontier_memory_limit=None):
         self.base_url = base_url
         self.output_dir = output_dir
         os.makedirs(self.output_dir, exist_ok=True)
-        self.visited_urls = set()
-        self.to_visit_queue = deque()
-        self.allowed_domains = [urlparse(base_url).netloc]
+        self.allowed_domains = [urlparse(canonicalize_url(base_url)).netloc]
         self.max_depth = max_depth
+        # Discovered URLs, canonicalized and deduplicated as they are queued
+        # and popped by depth, then estimated value. keep_query=True follows
+        # query-string variants as separate pages; frontier_memory_limit
+        # spills a queue larger than that many URLs to disk.
+        spill_path = os.path.join(self.output_dir, "frontier.sqlite") if frontier_memory_limit else None
+        self.frontier = Frontier(URLRules(self.allowed_domains), max_depth, keep_query=keep_query,
+                                 memory_limit=frontier_memory_limit, spill_path=spill_path)
         self.file_extensions = [".pdf", ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx", ".zip", ".rar", ".tar", ".jar"]
+        # Concurrent crawl settings: number of worker pages, max in-flight
+        # requests per host and minimum seconds between requests to a host.
+        self.workers = max(1, workers)
+        self.per_host_limit = max(1, per_host_limit)
+        self.politeness_delay = politeness_delay
+        self._host_semaphores = {}
+        self._host_locks = {}
+        self._host_next_slot = {}
+        # Tiered fetching: plain HTTP first, Chromium only for JS-rendered pages
+        self.static_fetch = static_fetch
+        self.render_policy = RenderPolicy(render_patterns, static_patterns, min_text_chars)
+        # Pages crawled per tier; each URL's own tier is kept in the manifest
+        self.tier_counts = Counter()
+        self._fetcher = None
+        self._playwright = None
+        self._browser = None
+        self._browser_lock = None
+        # Incremental re-crawls: conditional requests against a persistent manifest
+        self.incremental = incremental
+        self.state_path = state_path or os.path.join(self.output_dir, "crawl_state.sqlite")
+        self.manifest = None
+        self.unchanged_count = 0
+        # Page text, tables and HTML go to a content-addressed store in output_dir
+        self.store = None
+        # Document text extraction runs in a process pool fed by a queue
+        self.extract_processes = extract_processes
+        self.extract_timeout = extract_timeout
+        self.extract_max_pages = extract_max_pages
+        self._extraction = None
+        # Progress, read by the job API while a crawl runs in another thread
+        self.pages_crawled = 0
+        self.files_extracted = 0
+        self.stopped = False
+
+    async def _http_get(self, slot, url, headers=None):
+        if self._fetcher is not None:
+            return await self._fetcher.get(url, headers=headers)
+        page = await self._get_page(slot)
+        response = await page.request.get(url, headers=headers)
+        return response.status, response.headers, await response.body(), response.url
 
-    def _is_valid_url(self, url, current_depth):
-        parsed_url = urlparse(url)
-        if parsed_url.netloc not in self.allowed_domains:
-            return False
-        if any(path_segment in parsed_url.path for path_segment in ["login", "signup", "auth", "reset-credentials", "image", "img", "css", "js"]):
-            return False
-        if url.split("#")[0] in self.visited_urls:
-            return False
-        if current_depth > self.max_depth:
-            return False
-        return True
-
-    async def _download_file(self, page, url, save_path):
+    async def _timed_get(self, tier, get, url, headers=None):
+        # get(url, headers) -> (status, headers, body, final url), recorded under `tier`
+        start = time.perf_counter()
+        status, response_headers, body, final_url = await get(url, headers)
+        FETCH_SECONDS.observe(time.perf_counter() - start, tier=tier)
+        BYTES_DOWNLOADED.inc(len(body), tier=tier)
+        return status, response_headers, body, final_url
+
+    async def _count_render_bytes(self, response):
+        # Main document only; subresources Chromium loads are not counted
+        if response is None:
+            return
         try:
-            response = await page.request.get(url)
-            if response.ok:
-                with open(save_path, 'wb') as f:
-                    f.write(await response.body())
-                print(f"Downloaded: {url} to {save_path}")
-                return True
+            BYTES_DOWNLOADED.inc(len(await response.body()), tier=TIER_BROWSER)
+        except Exception:
+            pass  # no body for redirects and some navigations
+
+    def _extract_html(self, html):
+        with HTML_EXTRACT_SECONDS.time():
+            return extract_html(html)
+
+    async def _download_file(self, slot, url, save_path, record=None):
+        # Returns (status, headers, content hash) or None on failure. Unchanged
+        # files (304 or same hash as the manifest) are not rewritten.
+        try:
+            status, headers, body, _ = await self._timed_get(
+                TIER_FILE, lambda u, h: self._http_get(slot, u, h), url, self._conditional_headers(record))
+            if status == 304:
+                print(f"Not modified: {url}")
+                return status, headers, None
+            if 200 <= status < 300:
+                digest = content_hash(body)
+                if record is not None and digest == record["content_hash"]:
+                    print(f"Unchanged: {url}")
+                else:
+                    with open(save_path, 'wb') as f:
+                        f.write(body)
+                    print(f"Downloaded: {url} to {save_path}")
+                return status, headers, digest
             else:
-                print(f"Failed to download {url}: Status {response.status}")
-                return False
+                print(f"Failed to download {url}: Status {status}")
+                return None
         except Exception as e:
             print(f"Error downloading {url}: {e}")
-            return False
+            return None
 
-    def _extract_text_from_pdf(self, pdf_path):
-        text = ""
-        try:
-            with open(pdf_path, 'rb') as f:
-                reader = PyPDF2.PdfReader(f)
-                for page_num in range(len(reader.pages)):
-                    text += reader.pages[page_num].extract_text()
-            return text
-        except Exception as e:
-            print(f"Error extracting text from PDF {pdf_path}: {e}")
+    async def _process_page(self, page, url, current_depth, record=None, headers=None):
+        # page.goto already waited for networkidle. Rendered pages are keyed on
+        # the rendered DOM: their static HTML is a shell that rarely changes
+        # while the content arrives through XHR.
+        html = await page.content()
+        digest = content_hash(html)
+        if self._is_unchanged(record, 200, digest):
+            self._reuse_record(url, current_depth, record, headers)
+            return
+        outputs, links = self._write_page(self._extract_html(html), html, await page.title(), url, page.url)
+        self._remember(url, current_depth, digest, outputs, links, headers, TIER_BROWSER)
+        self._enqueue_links(links, current_depth)
+
+    def _write_page(self, content, html, title, url, base_url):
+        # Stores the page outputs from one extract_html pass; returns
+        # (blob paths, canonical outgoing links). Identical or
+        # near-duplicate texts land on a blob that is already stored.
+        # Relative links resolve against base_url, the URL the page was
+        # actually served from (after redirects).
+        outputs = []
+        blob = self.store.put(url, KIND_HTML, html)
+        outputs.append(self.store.blob_path(blob))
+        print(f"Saved HTML: {url} (blob {blob[:12]})")
+
+        blob = self.store.put(url, KIND_TEXT, f"Title: {title}\n\n{content.text}")
+        outputs.append(self.store.blob_path(blob))
+        print(f"Extracted text: {url} (blob {blob[:12]})")
+
+        if content.tables:
+            lines = []
+            for i, table in enumerate(content.tables):
+                lines.append(f"\n--- Table {i+1} ---\n")
+                for row_data in table:
+                    lines.append('\t'.join(row_data) + '\n')
+            blob = self.store.put(url, KIND_TABLES, "".join(lines))
+            outputs.append(self.store.blob_path(blob))
+            print(f"Extracted tables from {url} (blob {blob[:12]})")
+        else:
+            self.store.remove(url, KIND_TABLES)
+
+        links = []
+        for href in content.links:
+            links.append(self.frontier.canonicalize(urljoin(base_url, href)))
+        return outputs, list(dict.fromkeys(links))
+
+    def _enqueue_links(self, links, current_depth):
+        # Out-of-scope, too deep and already queued links are dropped here
+        for link in links:
+            self.frontier.add(link, current_depth + 1)
+
+    def _conditional_headers(self, record):
+        if self.manifest is None:
             return None
+        return self.manifest.conditional_headers(record) or None
+
+    def _is_unchanged(self, record, status, digest):
+        return record is not None and (status == 304 or digest == record["content_hash"])
+
+    def _remember(self, url, current_depth, digest, outputs, links=(), headers=None, tier=None):
+        if self.manifest is not None:
+            self.manifest.record(url, current_depth, digest, outputs, links, headers, tier)
+
+    def _reuse_record(self, url, current_depth, record, headers=None):
+        # Unchanged since the last crawl: keep its outputs, still follow its links
+        self.unchanged_count += 1
+        UNCHANGED_PAGES.inc()
+        self.manifest.mark_unchanged(url, current_depth, headers)
+        self._enqueue_links(record["links"], current_depth)
+
+    @asynccontextmanager
+    async def _host_slot(self, url):
+        host = urlparse(url).netloc
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self.per_host_limit)
+            self._host_locks[host] = asyncio.Lock()
+        async with self._host_semaphores[host]:
+            if self.politeness_delay > 0:
+                async with self._host_locks[host]:
+                    loop = asyncio.get_running_loop()
+                    wait = self._host_next_slot.get(host, 0) - loop.time()
+                    if wait > 0:
+                        await asyncio.sleep(wait)
+                    self._host_next_slot[host] = loop.time() + self.politeness_delay
+            yield
+
+    async def _get_browser(self):
+        # Chromium is only launched once some URL actually needs rendering
+        async with self._browser_lock:
+            if self._browser is None:
+                print("Launching Chromium for JS-rendered pages")
+                # Imported here: crawls served entirely by the static tier never load Playwright
+                from playwright.async_api import async_playwright
+                self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch()
+        return self._browser
+
+    async def _get_page(self, slot):
+        # `slot` holds one worker's page; one browser context per worker keeps
+        # cookies and caches isolated.
+        if slot.get("page") is None:
+            browser = await self._get_browser()
+            context = await browser.new_context()
+            slot["page"] = await context.new_page()
+        return slot["page"]
 
-    def _extract_text_from_docx(self, docx_path):
-        text = []
+    async def _fetch_static(self, url, current_depth, record):
+        # Returns (handled, headers); headers of the static response are
+        # handed on when the page still needs the browser. A 304 or identical
+        # body only reuses the manifest entry of a page the static tier served:
+        # pages last rendered by the browser are rendered again, and
+        # _process_page compares their rendered DOM instead.
+        if self._fetcher is None or self.render_policy.force_render(url):
+            return False, None
+        if record is not None and record["tier"] != TIER_STATIC:
+            record = None  # no conditional request either: a 304 would say nothing about the render
         try:
-            document = docx.Document(docx_path)
-            for paragraph in document.paragraphs:
-                text.append(paragraph.text)
-            return '\n'.join(text)
+            status, headers, body, final_url = await self._timed_get(
+                TIER_STATIC, self._fetcher.get, url, self._conditional_headers(record))
         except Exception as e:
-            print(f"Error extracting text from DOCX {docx_path}: {e}")
-            return None
+            print(f"Static fetch failed for {url}, falling back to browser: {e}")
+            return False, None
+        digest = content_hash(body) if status == 200 else None
+        if self._is_unchanged(record, status, digest):
+            print(f"Unchanged: {url}")
+            self._reuse_record(url, current_depth, record, headers)
+            return True, headers
+        if status != 200 or not is_html_response(headers):
+            return False, None
+        html = decode_html(body, headers)
+        content = self._extract_html(html)
+        if self.render_policy.needs_rendering(url, content):
+            return False, headers
+        outputs, links = self._write_page(content, html, content.title, url, final_url)
+        self._remember(url, current_depth, digest, outputs, links, headers, TIER_STATIC)
+        self._enqueue_links(links, current_depth)
+        return True, headers
+
+    async def _crawl_file(self, slot, url, ext, current_depth, record):
+        file_name = download_name(url)
+        file_path = os.path.join(self.output_dir, file_name)
+        async with self._host_slot(url):
+            response = await self._download_file(slot, url, file_path, record)
+        self.tier_counts[TIER_FILE] += 1
+        PAGES_CRAWLED.inc(tier=TIER_FILE)
+        if response is None:
+            return
+        status, headers, digest = response
+        if self._is_unchanged(record, status, digest):
+            # Same bytes as last crawl: don't re-parse or re-write the text
+            self._reuse_record(url, current_depth, record, headers)
+            return
+
+        if ext not in EXTRACTORS:
+            self._remember(url, current_depth, digest, [file_path], (), headers, TIER_FILE)
+            return
+
+        def on_extracted(text_output_path, fingerprint):
+            # The manifest entry is only written once the text is stored, so an
+            # interrupted crawl re-downloads documents that were never extracted.
+            outputs = [file_path]
+            if text_output_path:
+                with open(text_output_path, 'r', encoding='utf-8', errors='replace') as f:
+                    blob = self.store.put(url, KIND_TEXT, f.read(), fingerprint=fingerprint)
+                os.remove(text_output_path)
+                outputs.append(self.store.blob_path(blob))
+                self.files_extracted += 1
+                print(f"Extracted text from {file_name} (blob {blob[:12]})")
+            self._remember(url, current_depth, digest, outputs, (), headers, TIER_FILE)
+
+        # Written by the extraction worker, then moved into the store
+        text_output_path = os.path.join(self.output_dir, f"{file_name}.extracted")
+        await self._extraction.submit(file_path, ext, text_output_path, on_extracted)
+
+    async def _crawl_url(self, slot, url, current_depth):
+        record = self.manifest.get(url) if self.manifest is not None else None
+        if self.manifest is not None and self.manifest.seen_this_run(record):
+            # Resumed run: this URL was finished before the interruption
+            self._enqueue_links(record["links"], current_depth)
+            return
+
+        print(f"Scraping: {url} (Depth: {current_depth})")
 
-    def _extract_text_from_xlsx(self, xlsx_path):
-        text = []
         try:
-            workbook = load_workbook(xlsx_path)
-            for sheet_name in workbook.sheetnames:
-                sheet = workbook[sheet_name]
-                for row in sheet.iter_rows():
-                    row_data = [str(cell.value) if cell.value is not None else "" for cell in row]
-                    text.append('\t'.join(row_data))
-            return '\n'.join(text)
+            # Check if it's a file to download directly
+            for ext in self.file_extensions:
+                if url.endswith(ext):
+                    await self._crawl_file(slot, url, ext, current_depth, record)
+                    return
+
+            async with self._host_slot(url):
+                handled, headers = await self._fetch_static(url, current_depth, record)
+                if handled:
+                    self.tier_counts[TIER_STATIC] += 1
+                    PAGES_CRAWLED.inc(tier=TIER_STATIC)
+                else:
+                    page = await self._get_page(slot)
+                    start = time.perf_counter()
+                    response = await page.goto(url, wait_until='networkidle')
+                    RENDER_SECONDS.observe(time.perf_counter() - start)
+                    await self._process_page(page, url, current_depth, record, headers)
+                    self.tier_counts[TIER_BROWSER] += 1
+                    PAGES_CRAWLED.inc(tier=TIER_BROWSER)
+                    await self._count_render_bytes(response)
+
         except Exception as e:
-            print(f"Error extracting text from XLSX {xlsx_path}: {e}")
-            return None
+            print(f"Error processing {url}: {e}")
+        finally:
+            self.pages_crawled += 1
+
+    async def _scrape_sequential(self):
+        slot = {}
+
+        while not self.stopped:
+            entry = self.frontier.pop()
+            if entry is None:
+                break
+            await self._crawl_url(slot, *entry)
+
+    async def _crawl_worker(self, slot, level):
+        # pop() never awaits, so two workers can never take the same URL
+        while not self.stopped:
+            entry = self.frontier.pop(max_depth=level)
+            if entry is None:
+                break
+            await self._crawl_url(slot, *entry)
+
+    async def _scrape_concurrent(self):
+        slots = [{} for _ in range(self.workers)]
+
+        while len(self.frontier) and not self.stopped:
+            # Crawl one BFS level at a time: every URL is then crawled at the
+            # same depth as in the sequential loop, so the set of pages written
+            # to output_dir is identical. Links found while a level is being
+            # crawled are one level deeper and wait for the next round.
+            level = self.frontier.min_depth()
+            await asyncio.gather(*(self._crawl_worker(slot, level) for slot in slots))
+
+    async def _run(self):
+        if self.workers > 1:
+            await self._scrape_concurrent()
+        else:
+            await self._scrape_sequential()
+
+    def stop(self):
+        # Safe to call from another thread: workers finish the page they are
+        # on and the crawl winds down. The run is not marked finished, so it
+        # can be picked up again with resume=True.
+        self.stopped = True
+
+    def progress(self):
+        pending = len(self.frontier)
+        return {
+            "pages_crawled": self.pages_crawled,
+            "files_extracted": self.files_extracted,
+            "unchanged": self.unchanged_count,
+            "pages_queued": pending,
+            # The frontier grows while crawling, so the total is a lower bound
+            "done": self.pages_crawled,
+            "total": self.pages_crawled + pending,
+        }
+
+    async def scrape(self, start_url, resume=False):
+        self.frontier.add(start_url, 0, check_scope=False)
+        self._browser_lock = asyncio.Lock()
+        if self.incremental:
+            self.manifest = CrawlManifest(self.state_path)
+            self.manifest.start_run(start_url, resume=resume)
+
+        try:
+            self.store = DocumentStore(self.output_dir, wal=True)
+            extraction = ExtractionPipeline(self.extract_processes, timeout=self.extract_timeout,
+                                            max_pages=self.extract_max_pages)
+            # Leaving the pipeline context waits for queued documents to finish
+            async with extraction:
+                self._extraction = extraction
+                if self.static_fetch:
+                    async with StaticFetcher(per_host=self.per_host_limit) as fetcher:
+                        self._fetcher = fetcher
+                        await self._run()
+                else:
+                    await self._run()
+            if self.manifest is not None and not self.stopped:
+                self.manifest.finish_run()
+            if not self.stopped:
+                pruned = self.store.prune()
+                if pruned:
+                    print(f"Removed {pruned} blobs no page uses any more")
+        finally:
+            if self.store is not None:
+                self.store.close()
+                self.store = None
+            self._fetcher = None
+            self._extraction = None
+            self.frontier.close()
+            if self.manifest is not None:
+                self.manifest.close()
+                self.manifest = None
+            if self._browser is not None:
+                await self._browser.close()
+                await self._playwright.stop()
+                self._browser = None
+                self._playwright = None
 
-    async def _process_page(self, page, url, current_depth):
-        await page.wait_for_load_state("networkidle")
-        soup = BeautifulSoup(await page.content(), 'html.parser')
-
-        page_text = ' '.join(p.get_text() for p in soup.find_all('p'))
-        title = await page.title()
-        
-        filename_base = urlparse(url).path.replace('/', '_').strip('_')
-        if not filename_base:
-            filename_base = 'index'
-        filename_base = filename_base.split('?')[0].split('#')[0]
-
-        html_filename = os.path.join(self.output_dir, f"{filename_base}.html")
-        with open(html_filename, 'w', encoding='utf-8') as f:
-            f.write(soup.prettify())
-        print(f"Saved HTML: {url} to {html_filename}")
-
-        text_filename = os.path.join(self.output_dir, f"{filename_base}.txt")
-        with open(text_filename, 'w', encoding='utf-8') as f:
-            f.write(f"Title: {title}\n\n")
-            f.write(page_text)
-        print(f"Extracted text: {url} to {text_filename}")
-
-        tables = soup.find_all('table')
-        if tables:
-            table_filename = os.path.join(self.output_dir, f"{filename_base}_tables.txt")
-            with open(table_filename, 'w', encoding='utf-8') as f:
-                for i, table in enumerate(tables):
-                    f.write(f"\n--- Table {i+1} ---\n")
-                    for row in table.find_all('tr'):
-                        row_data = [cell.get_text(strip=True) for cell in row.find_all(['td', 'th'])]
-                        f.write('\t'.join(row_data) + '\n')
-            print(f"Extracted tables from {url} to {table_filename}")
-
-        for link in soup.find_all('a', href=True):
-            href = link['href']
-            full_url = urljoin(url, href)
-            normalized_url = full_url.split('?')[0].split('#')[0]
-
-            if self._is_valid_url(normalized_url, current_depth + 1):
-                self.to_visit_queue.append((normalized_url, current_depth + 1))
-
-    async def scrape(self, start_url):
-        self.to_visit_queue.append((start_url, 0))
-
-        async with async_playwright() as p:
-            browser = await p.chromium.launch()
-            page = await browser.new_page()
-
-            while self.to_visit_queue:
-                url, current_depth = self.to_visit_queue.popleft()
-                
-                if url.split("#")[0] in self.visited_urls:
-                    continue
-                self.visited_urls.add(url.split("#")[0])
-
-                print(f"Scraping: {url} (Depth: {current_depth})")
-
-                try:
-                    # Check if it's a file to download directly
-                    is_file = False
-                    for ext in self.file_extensions:
-                        if url.endswith(ext):
-                            file_name = os.path.basename(urlparse(url).path)
-                            file_path = os.path.join(self.output_dir, file_name)
-                            if await self._download_file(page, url, file_path):
-                                if ext == ".pdf":
-                                    extracted_text = self._extract_text_from_pdf(file_path)
-                                elif ext == ".docx":
-                                    extracted_text = self._extract_text_from_docx(file_path)
-                                elif ext == ".xlsx":
-                                    extracted_text = self._extract_text_from_xlsx(file_path)
-                                else:
-                                    extracted_text = None
-
-                                if extracted_text:
-                                    text_output_path = os.path.join(self.output_dir, f"{file_name}.txt")
-                                    with open(text_output_path, 'w', encoding='utf-8') as f:
-                                        f.write(extracted_text)
-                                    print(f"Extracted text from {file_name} to {text_output_path}")
-                            is_file = True
-                            break
-                    
-                    if not is_file:
-                        await page.goto(url, wait_until='networkidle')
-                        await self._process_page(page, url, current_depth)
-
-                except Exception as e:
-                    print(f"Error processing {url}: {e}")
-            
-            await browser.close()
+        print("Fetch tiers: " + ", ".join(f"{tier}={self.tier_counts[tier]}" for tier in (TIER_STATIC, TIER_BROWSER, TIER_FILE))
+              + f"; unchanged since last crawl: {self.unchanged_count}")
 
 async def main():
-    scraper = MOSDACScraper("https://www.mosdac.gov.in", max_depth=2) # Limiting depth for initial run
+    scraper = MOSDACScraper("https://www.mosdac.gov.in", max_depth=2, workers=4, politeness_delay=0.5) # Limiting depth for initial run
     await scraper.scrape("https://www.mosdac.gov.in")
 
 if __name__ == "__main__":
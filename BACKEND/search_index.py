@@ -0,0 +1,244 @@
+import heapq
+import math
+import os
+import re
+import sys
+from array import array
+from collections import Counter, defaultdict
+from mmap_sections import SectionFile, read_string, string_table, write_sections
+from doc_store import DocumentStore
+
+# BM25 inverted index over passages of the extracted_content documents.
+# Built offline (build_index) into a memory-mapped "search.idx":
+#   terms       sorted lexicon, term id = position, looked up by binary search
+#   postings    post_offsets[t] .. post_offsets[t+1] in post_ids / post_tfs
+#   chunks      token length, source file id and passage text per chunk
+#   sources     source names (page URL, or path of an imported .txt file)
+
+MAGIC = b"MOSDACIX"
+FORMAT_VERSION = 1
+INDEX_FILE = "search.idx"
+
+TOKEN_RE = re.compile(r"[^\W_]+(?:[-.][^\W_]+)*")
+STOPWORDS = frozenset("""
+    a about an and are as at be by can do does for from has have how i in is it
+    its me my of on or our please should tell than that the their there these
+    this to was we were what when where which who why will with you your
+""".split())
+CHUNK_WORDS = 120
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def tokenize(text):
+    return [token for token in TOKEN_RE.findall(text.lower()) if token not in STOPWORDS]
+
+
+def chunk_text(text, max_words=CHUNK_WORDS):
+    # Passages of at most max_words words; lines are kept together where they fit
+    chunks, current = [], []
+    for line in text.splitlines():
+        words = line.split()
+        while words:
+            room = max_words - len(current)
+            current.extend(words[:room])
+            words = words[room:]
+            if len(current) >= max_words:
+                chunks.append(" ".join(current))
+                current = []
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def iter_text_documents(extracted_content_dir):
+    # (source name, text) for every distinct document in the extracted_content
+    # store, in a stable order; loose .txt files are imported first
+    with DocumentStore(extracted_content_dir) as store:
+        store.import_files()
+        yield from store.iter_documents()
+
+
+def build_index(documents, index_path):
+    # documents: iterable of (source name, text). Returns the index build id.
+    post_ids = defaultdict(lambda: array("I"))
+    post_tfs = defaultdict(lambda: array("I"))
+    sources = []
+    chunk_len = array("I")
+    chunk_source = array("I")
+    chunk_texts = []
+    for source, text in documents:
+        source_id = len(sources)
+        sources.append(source)
+        for passage in chunk_text(text):
+            chunk_id = len(chunk_len)
+            tokens = tokenize(passage)
+            chunk_len.append(len(tokens))
+            chunk_source.append(source_id)
+            chunk_texts.append(passage)
+            for term, tf in Counter(tokens).items():
+                post_ids[term].append(chunk_id)
+                post_tfs[term].append(tf)
+
+    # str order is code point order, which is also utf-8 byte order
+    terms = sorted(post_ids)
+    post_offsets = array("Q", [0])
+    all_ids = array("I")
+    all_tfs = array("I")
+    for term in terms:
+        all_ids.extend(post_ids.pop(term))
+        all_tfs.extend(post_tfs.pop(term))
+        post_offsets.append(len(all_ids))
+
+    term_offsets, term_blob = string_table(terms)
+    text_offsets, text_blob = string_table(chunk_texts)
+    source_offsets, source_blob = string_table(sources)
+    sections = [
+        ("term_offsets", "Q", term_offsets),
+        ("term_blob", "B", term_blob),
+        ("post_offsets", "Q", post_offsets),
+        ("post_ids", "I", all_ids),
+        ("post_tfs", "I", all_tfs),
+        ("chunk_len", "I", chunk_len),
+        ("chunk_source", "I", chunk_source),
+        ("text_offsets", "Q", text_offsets),
+        ("text_blob", "B", text_blob),
+        ("source_offsets", "Q", source_offsets),
+        ("source_blob", "B", source_blob),
+    ]
+    metadata = [len(terms), len(chunk_len), len(sources), sum(chunk_len)]
+    return write_sections(index_path, MAGIC, FORMAT_VERSION, metadata, sections)
+
+
+class SearchIndex:
+    def __init__(self, path):
+        self.path = path
+        self._file = SectionFile(path, MAGIC, FORMAT_VERSION)
+        self.build_id = self._file.build_id
+        self.term_count, self.chunk_count, self.source_count, total_tokens = self._file.metadata
+        self.avg_chunk_len = total_tokens / self.chunk_count if self.chunk_count else 0.0
+        self._np_sections = None
+        for name, section in self._file.sections.items():
+            setattr(self, "_" + name, section)
+
+    @classmethod
+    def open(cls, path):
+        return cls(path)
+
+    def close(self):
+        # NumPy views export the mapped buffers; drop them before unmapping
+        self._np_sections = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def term_id(self, term):
+        lo, hi = 0, self.term_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if read_string(self._term_offsets, self._term_blob, mid) < term:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.term_count and read_string(self._term_offsets, self._term_blob, lo) == term:
+            return lo
+        return None
+
+    def postings(self, term_id):
+        start, end = self._post_offsets[term_id], self._post_offsets[term_id + 1]
+        return self._post_ids[start:end], self._post_tfs[start:end]
+
+    def idf(self, term_id):
+        df = self._post_offsets[term_id + 1] - self._post_offsets[term_id]
+        return math.log(1 + (self.chunk_count - df + 0.5) / (df + 0.5))
+
+    def score(self, terms, scores=None):
+        # Term-at-a-time BM25 accumulation; only postings of the query terms are read
+        if scores is None:
+            scores = defaultdict(float)
+        chunk_len = self._chunk_len
+        norm = BM25_K1 / self.avg_chunk_len if self.avg_chunk_len else 0.0
+        for term in set(terms):
+            term_id = self.term_id(term)
+            if term_id is None:
+                continue
+            idf = self.idf(term_id)
+            ids, tfs = self.postings(term_id)
+            for chunk_id, tf in zip(ids, tfs):
+                denominator = tf + BM25_K1 * (1 - BM25_B) + norm * BM25_B * chunk_len[chunk_id]
+                scores[chunk_id] += idf * tf * (BM25_K1 + 1) / denominator
+        return scores
+
+    def search(self, query, k=5):
+        # [(chunk_id, score), ...] best first
+        scores = self.score(tokenize(query))
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+    def _term_scores(self, term_id):
+        # (chunk ids, BM25 contribution per chunk) of one term, as arrays
+        # over the mapped postings
+        import numpy as np
+        if self._np_sections is None:
+            self._np_sections = (np.frombuffer(self._post_ids, dtype=np.uint32),
+                                 np.frombuffer(self._post_tfs, dtype=np.uint32),
+                                 np.frombuffer(self._chunk_len, dtype=np.uint32))
+        post_ids, post_tfs, chunk_len = self._np_sections
+        start, end = self._post_offsets[term_id], self._post_offsets[term_id + 1]
+        ids = post_ids[start:end]
+        tfs = post_tfs[start:end].astype(np.float64)
+        norm = BM25_K1 / self.avg_chunk_len if self.avg_chunk_len else 0.0
+        denominator = tfs + BM25_K1 * (1 - BM25_B) + norm * BM25_B * chunk_len[ids]
+        return ids, self.idf(term_id) * tfs * (BM25_K1 + 1) / denominator
+
+    def search_batch(self, queries, k=5):
+        # search() for many queries at once: each distinct term's postings are
+        # scored once for the whole batch, and per-query sums and top-k run
+        # vectorized in NumPy. NumPy is imported here rather than at module
+        # level so single-query chat workers never load it.
+        try:
+            import numpy as np
+        except ImportError:
+            return [self.search(query, k) for query in queries]
+        term_scores = {}
+        results = []
+        for query in queries:
+            parts = []
+            for term in set(tokenize(query)):
+                if term not in term_scores:
+                    term_id = self.term_id(term)
+                    term_scores[term] = self._term_scores(term_id) if term_id is not None else None
+                if term_scores[term] is not None:
+                    parts.append(term_scores[term])
+            if not parts:
+                results.append([])
+                continue
+            ids = np.concatenate([part[0] for part in parts])
+            scores = np.concatenate([part[1] for part in parts])
+            chunk_ids, inverse = np.unique(ids, return_inverse=True)
+            totals = np.bincount(inverse, weights=scores)
+            if len(totals) > k:
+                top = np.argpartition(-totals, k - 1)[:k]
+            else:
+                top = np.arange(len(totals))
+            top = top[np.argsort(-totals[top], kind="stable")]
+            results.append([(int(chunk_ids[i]), float(totals[i])) for i in top])
+        return results
+
+    def chunk_text(self, chunk_id):
+        return read_string(self._text_offsets, self._text_blob, chunk_id)
+
+    def chunk_source(self, chunk_id):
+        return read_string(self._source_offsets, self._source_blob, self._chunk_source[chunk_id])
+
+
+if __name__ == "__main__":
+    # python search_index.py [extracted_content] [knowledge_graph/search.idx]
+    content_dir = sys.argv[1] if len(sys.argv) > 1 else "extracted_content"
+    index_path = sys.argv[2] if len(sys.argv) > 2 else os.path.join("knowledge_graph", INDEX_FILE)
+    os.makedirs(os.path.dirname(index_path) or ".", exist_ok=True)
+    build_id = build_index(iter_text_documents(content_dir), index_path)
+    print(f"Search index built: {index_path} (build {build_id})")
@@ -0,0 +1,30 @@
+import importlib.util
+import os
+import sys
+
+# scraper.py is shadowed by the scraper/ package and kp-builder.py is not an
+# importable module name, so both are loaded from their file paths.
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_source_module(name, filename):
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, os.path.join(BACKEND_DIR, filename))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[name]
+        raise
+    return module
+
+
+def load_scraper_module():
+    return load_source_module("mosdac_crawler", "scraper.py")
+
+
+def load_kg_builder_module():
+    return load_source_module("kp_builder", "kp-builder.py")
@@ -0,0 +1,49 @@
+import os
+import sys
+# Allow running as `python -m pytest tests` from BACKEND
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tempfile
+import time
+import unittest
+
+from answer_cache import AnswerCache
+from chatbot import MOSDACChatbot
+
+COLD_SECONDS = 0.2
+
+
+class CacheHitLatencyTest(unittest.TestCase):
+    def setUp(self):
+        self.kg_dir = tempfile.TemporaryDirectory()
+        self.chatbot = MOSDACChatbot(self.kg_dir.name, cache=AnswerCache())
+        find_entities = self.chatbot.engine.find_entities
+
+        def slow_find_entities(*args):
+            time.sleep(COLD_SECONDS)
+            return find_entities(*args)
+
+        self.chatbot.engine.find_entities = slow_find_entities
+
+    def tearDown(self):
+        self.kg_dir.cleanup()
+
+    def test_hits_report_their_own_latency(self):
+        cold = self.chatbot.answer_query("What is INSAT-3D?")
+        self.assertGreaterEqual(cold["latency_ms"], COLD_SECONDS * 1000)
+        hits = [
+            self.chatbot.answer_query("insat-3d"),
+            next(self.chatbot.answer_batch(["INSAT-3D"])),
+            list(self.chatbot.stream_query("INSAT-3D?"))[-1]["response"],
+        ]
+        for hit in hits:
+            self.assertTrue(hit["cached"])
+            self.assertLess(hit["latency_ms"], COLD_SECONDS * 1000 / 2)
+
+    def test_cached_payload_has_no_latency(self):
+        self.chatbot.answer_query("What is INSAT-3D?")
+        self.assertNotIn("latency_ms", self.chatbot.cache.get("insat-3d", self.chatbot.engine.version))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import os
+import sys
+# Allow running as `python -m pytest tests` from BACKEND
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.join(BACKEND_DIR, "benchmarks"))
+
+import asyncio
+import tempfile
+import unittest
+
+from extraction import ExtractionPipeline, EXTRACT_FAILURES
+from fixture_site import minimal_pdf
+
+
+class CallbackErrorTest(unittest.TestCase):
+    def test_failing_callback_keeps_consumer_running(self):
+        stored = []
+
+        def fail(path, fingerprint):
+            raise OSError("disk full")
+
+        async def run(directory):
+            async with ExtractionPipeline(processes=1) as pipeline:
+                for i in range(3):
+                    src_path = os.path.join(directory, f"{i}.pdf")
+                    with open(src_path, "wb") as f:
+                        f.write(minimal_pdf([f"Document {i}"]))
+                    on_done = fail if i == 0 else lambda path, fingerprint: stored.append(path)
+                    await pipeline.submit(src_path, ".pdf", src_path + ".txt", on_done)
+                await asyncio.wait_for(pipeline._queue.join(), timeout=60)
+
+        failures = EXTRACT_FAILURES.value(type="pdf")
+        with tempfile.TemporaryDirectory() as directory:
+            asyncio.run(run(directory))
+            self.assertEqual([os.path.basename(path) for path in stored], ["1.pdf.txt", "2.pdf.txt"])
+        self.assertEqual(EXTRACT_FAILURES.value(type="pdf"), failures + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import os
+import sys
+# Allow running as `python -m pytest tests` from BACKEND
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from doc_store import DocumentStore
+from frontier import Frontier, URLRules, canonicalize_url, url_key
+from source_modules import load_scraper_module
+
+PARAGRAPH = "<p>INSAT-3D imager products cover the Indian Ocean every thirty minutes.</p>"
+# path -> (status, location or page links)
+SITE = {
+    "/": (200, ["internal/"]),
+    "/internal/": (200, ["gallery.html", "../about.html"]),
+    "/internal/gallery.html": (200, []),
+    "/about.html": (200, ["docs"]),
+    # Redirects to the directory page, whose links are relative to it
+    "/docs": (301, "/docs/"),
+    "/docs/": (200, ["guide.html"]),
+    "/docs/guide.html": (200, []),
+}
+
+
+class SiteHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        entry = SITE.get(self.path)
+        if entry is None:
+            self.send_error(404)
+            return
+        status, target = entry
+        if status == 301:
+            self.send_response(301)
+            self.send_header("Location", target)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        links = "".join(f'<a href="{href}">{href}</a>' for href in target)
+        body = f"<html><head><title>{self.path}</title></head><body>{PARAGRAPH}{links}</body></html>".encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class CanonicalizeTest(unittest.TestCase):
+    def test_keeps_trailing_slash(self):
+        self.assertEqual(canonicalize_url("HTTP://Example.com:80/internal/#top"), "http://example.com/internal/")
+        self.assertEqual(canonicalize_url("https://example.com"), "https://example.com/")
+
+    def test_key_ignores_trailing_slash(self):
+        self.assertEqual(url_key("https://example.com/internal/"), "https://example.com/internal")
+        self.assertEqual(url_key("https://example.com/"), "https://example.com/")
+
+    def test_directory_and_file_spellings_queue_once(self):
+        frontier = Frontier(URLRules(["example.com"]))
+        self.assertTrue(frontier.add("https://example.com/internal/", 1))
+        self.assertFalse(frontier.add("https://example.com/internal", 1))
+        self.assertEqual(frontier.pop(), ("https://example.com/internal/", 1))
+        self.assertIsNone(frontier.pop())
+
+
+class RelativeLinkTest(unittest.TestCase):
+    def test_links_resolve_against_fetched_url(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), SiteHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        try:
+            with tempfile.TemporaryDirectory() as output_dir:
+                scraper = load_scraper_module().MOSDACScraper(
+                    base_url, output_dir=output_dir, max_depth=5, min_text_chars=0, incremental=False)
+                asyncio.run(scraper.scrape(base_url + "/"))
+                with DocumentStore(output_dir) as store:
+                    crawled = {row["url"][len(base_url):] for row in store.conn.execute("SELECT url FROM documents")}
+        finally:
+            server.shutdown()
+            server.server_close()
+        self.assertIn("/internal/gallery.html", crawled)
+        self.assertIn("/about.html", crawled)
+        self.assertIn("/docs/guide.html", crawled)
+        self.assertNotIn("/gallery.html", crawled)
+        self.assertNotIn("/guide.html", crawled)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import os
+import sys
+# Allow running as `python -m pytest tests` from BACKEND
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import threading
+import unittest
+
+from jobs import JobManager, JobConflict
+
+
+class Component:
+    def progress(self):
+        return {}
+
+
+class ResourceTest(unittest.TestCase):
+    def setUp(self):
+        self.jobs = JobManager(max_workers=2)
+        self.release = threading.Event()
+
+    def tearDown(self):
+        self.release.set()
+
+    def submit(self, kind, resource, params=None):
+        return self.jobs.submit(kind, params or {}, Component, lambda component: self.release.wait(10),
+                                resource=resource)
+
+    def test_build_conflicts_with_scrape_on_shared_content(self):
+        scrape, _ = self.submit("scrape", "content")
+        with self.assertRaises(JobConflict) as raised:
+            self.submit("build-kg", ("content", "graph"))
+        self.assertIs(raised.exception.job, scrape)
+        self.assertIn("content", str(raised.exception))
+
+    def test_disjoint_resources_run_together(self):
+        self.submit("scrape", "content")
+        job, coalesced = self.submit("export", ("graph", "exports"))
+        self.assertFalse(coalesced)
+        self.assertTrue(job.active)
+
+    def test_same_params_coalesce(self):
+        first, _ = self.submit("build-kg", ("content", "graph"))
+        second, coalesced = self.submit("build-kg", ("content", "graph"))
+        self.assertTrue(coalesced)
+        self.assertIs(first, second)
+
+
+if __name__ == "__main__":
+    unittest.main()
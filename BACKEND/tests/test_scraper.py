@@ -0,0 +1,127 @@
+import os
+import sys
+# Allow running as `python -m pytest tests` from BACKEND
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.join(BACKEND_DIR, "benchmarks"))
+
+import asyncio
+import sqlite3
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from crawl_bench import run_crawl, same_output
+from doc_store import DocumentStore, KIND_TEXT
+from fixture_site import FixtureSite, minimal_pdf
+from source_modules import load_scraper_module
+
+PARAGRAPH = "<p>INSAT-3D imager products cover the Indian Ocean every thirty minutes.</p>"
+REPORTS = {f"/{section}/report.pdf": f"Report of section {section}" for section in "abcdef"}
+
+
+class ReportsHandler(BaseHTTPRequestHandler):
+    # One page linking documents that all share the name report.pdf
+    def do_GET(self):
+        if self.path == "/":
+            links = "".join(f'<a href="{path}">{path}</a>' for path in REPORTS)
+            body = f"<html><head><title>Reports</title></head><body>{PARAGRAPH}{links}</body></html>".encode()
+            content_type = "text/html; charset=utf-8"
+        elif self.path in REPORTS:
+            body = minimal_pdf([REPORTS[self.path]])
+            content_type = "application/pdf"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(handler):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+class DownloadTest(unittest.TestCase):
+    def crawl_reports(self, workers):
+        server, base_url = serve(ReportsHandler)
+        try:
+            with tempfile.TemporaryDirectory() as output_dir:
+                scraper = load_scraper_module().MOSDACScraper(
+                    base_url, output_dir=output_dir, max_depth=1, workers=workers, min_text_chars=0,
+                    incremental=False, extract_processes=2)
+                asyncio.run(scraper.scrape(base_url + "/"))
+                with DocumentStore(output_dir) as store:
+                    rows = store.conn.execute("SELECT url, blob FROM documents WHERE kind = ?", (KIND_TEXT,))
+                    return {row["url"][len(base_url):]: store.read(row["blob"]) for row in rows}
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_same_file_name_from_different_urls(self):
+        for workers in (1, 4):
+            texts = self.crawl_reports(workers)
+            for path, text in REPORTS.items():
+                self.assertIn(path, texts)
+                self.assertIn(text, texts[path])
+
+
+class ManifestReuseTest(unittest.TestCase):
+    def test_only_static_pages_are_reused(self):
+        # Same bytes every crawl: a page the static tier served is reused from
+        # the manifest, one the browser rendered last time is fetched again
+        server, base_url = serve(ReportsHandler)
+        try:
+            with tempfile.TemporaryDirectory() as output_dir:
+                def crawl():
+                    scraper = load_scraper_module().MOSDACScraper(
+                        base_url, output_dir=output_dir, max_depth=0, min_text_chars=0)
+                    asyncio.run(scraper.scrape(base_url + "/"))
+                    return scraper.unchanged_count
+
+                self.assertEqual(crawl(), 0)
+                self.assertEqual(crawl(), 1)
+                with sqlite3.connect(os.path.join(output_dir, "crawl_state.sqlite")) as conn:
+                    conn.execute("UPDATE pages SET tier = 'browser'")
+                self.assertEqual(crawl(), 0)
+                self.assertEqual(crawl(), 1)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+class CrawlScalingTest(unittest.TestCase):
+    # Worker counts compared under a simulated per-request delay; the
+    # fixture site's pages carry enough text for the static tier
+    LATENCY = 0.05
+    WORKERS = 4
+
+    def test_workers_speed_up_crawl_with_identical_output(self):
+        site = FixtureSite(pages=40, fanout=4, attachments_every=0)
+        server = site.serve(latency=self.LATENCY)
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                serial_dir, parallel_dir = os.path.join(tmp, "serial"), os.path.join(tmp, "parallel")
+                serial_pages, serial_seconds = run_crawl(base_url, serial_dir, 1, max_depth=4)
+                parallel_pages, parallel_seconds = run_crawl(base_url, parallel_dir, self.WORKERS, max_depth=4)
+                self.assertTrue(same_output(serial_dir, parallel_dir))
+        finally:
+            server.shutdown()
+            server.server_close()
+        self.assertEqual(serial_pages, site.expected(4)[0])
+        self.assertEqual(parallel_pages, serial_pages)
+        self.assertGreater(serial_seconds / parallel_seconds, 2.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
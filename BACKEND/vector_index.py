@@ -0,0 +1,436 @@
+import hashlib
+import math
+import os
+import sys
+from collections import Counter
+import numpy as np
+from mmap_sections import SectionFile, read_string, string_table, write_sections
+from search_index import tokenize, chunk_text, iter_text_documents
+
+# Semantic passage retrieval over extracted_content, fully offline.
+#
+# Passages (search_index.chunk_text) are embedded into unit vectors, stored as
+# int8 codes with a per-row scale, and grouped into an IVF index: rows are
+# sorted by their nearest centroid, so a query only scans the nprobe lists
+# whose centroids are closest. Everything lives in one memory-mapped
+# "vectors.idx":
+#   centroids     nlist x dims float32
+#   list_offsets  list i is rows list_offsets[i] .. list_offsets[i + 1]
+#   codes/scales  int8 row vectors and their float32 scale
+#   chunks        passage text and source document per row
+#   sources       source paths and a hash of each source's text, used to
+#                 reuse unchanged documents' rows on the next build
+#
+# The default embedder is an LSA model ("lsa.model"): TF-IDF over the corpus
+# vocabulary projected onto its top singular vectors, trained here with a
+# randomized SVD. It needs nothing beyond NumPy and no download. Setting
+# VECTOR_MODEL to a local sentence-transformers model directory uses that
+# model instead (if the package is installed).
+
+MAGIC = b"MOSDACVX"
+FORMAT_VERSION = 1
+VECTOR_FILE = "vectors.idx"
+MODEL_MAGIC = b"MOSDACLS"
+MODEL_VERSION = 1
+MODEL_FILE = "lsa.model"
+
+DIMENSIONS = 128
+MAX_VOCABULARY = 50_000
+TRAIN_CHUNKS = 20_000      # passages sampled to fit the LSA model
+RETRAIN_GROWTH = 2.0       # refit once the corpus has grown this much
+NPROBE = 8                 # IVF lists scanned per query
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE_PER_LIST = 64
+SEED = 0
+
+
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _csr_dot(indptr, cols, vals, dense, block=1 << 16):
+    # (sparse CSR matrix) @ dense, a block of ~`block` non-zeros at a time.
+    # Every row must have at least one non-zero.
+    rows = len(indptr) - 1
+    out = np.empty((rows, dense.shape[1]), dtype=np.float32)
+    row = 0
+    while row < rows:
+        end_row = int(np.searchsorted(indptr, indptr[row] + block, side="right")) - 1
+        end_row = min(rows, max(end_row, row + 1))
+        start, end = indptr[row], indptr[end_row]
+        products = vals[start:end, None] * dense[cols[start:end]]
+        out[row:end_row] = np.add.reduceat(products, indptr[row:end_row] - start)
+        row = end_row
+    return out
+
+
+class LsaModel:
+    def __init__(self, path):
+        self.path = path
+        self._file = SectionFile(path, MODEL_MAGIC, MODEL_VERSION)
+        self.model_id = "lsa:" + self._file.build_id
+        self.term_count, self.dims, self.trained_chunks = self._file.metadata
+        sections = self._file.sections
+        self._term_offsets, self._term_blob = sections["term_offsets"], sections["term_blob"]
+        self._idf = np.frombuffer(sections["idf"], dtype=np.float32)
+        self._projection = np.frombuffer(sections["projection"], dtype=np.float32).reshape(self.term_count, self.dims)
+        self._terms = None
+
+    @classmethod
+    def open(cls, path):
+        return cls(path)
+
+    def close(self):
+        self._idf = self._projection = None
+        self._file.close()
+
+    def term_id(self, term):
+        if self._terms is not None:
+            return self._terms.get(term)
+        lo, hi = 0, self.term_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if read_string(self._term_offsets, self._term_blob, mid) < term:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.term_count and read_string(self._term_offsets, self._term_blob, lo) == term:
+            return lo
+        return None
+
+    def _load_terms(self):
+        # A dict is faster when embedding a whole corpus; queries use the
+        # binary search and never build it
+        if self._terms is None:
+            self._terms = {read_string(self._term_offsets, self._term_blob, i): i for i in range(self.term_count)}
+
+    def embed(self, texts):
+        # (len(texts), dims) float32 unit vectors; texts without any known
+        # term get a zero vector
+        if len(texts) > 1:
+            self._load_terms()
+        # All texts go through one sparse (texts x terms) @ projection product
+        vectors = np.zeros((len(texts), self.dims), dtype=np.float32)
+        rows, indptr, ids, tfs = [], [0], [], []
+        for i, text in enumerate(texts):
+            for term, tf in Counter(tokenize(text)).items():
+                term_id = self.term_id(term)
+                if term_id is not None:
+                    ids.append(term_id)
+                    tfs.append(tf)
+            if len(ids) > indptr[-1]:
+                rows.append(i)
+                indptr.append(len(ids))
+        if rows:
+            ids = np.array(ids)
+            weights = (1 + np.log(np.array(tfs, dtype=np.float32))) * self._idf[ids]
+            vectors[rows] = _csr_dot(np.array(indptr), ids, weights, self._projection)
+        return _normalize(vectors)
+
+    @staticmethod
+    def train(chunks, path, dims=DIMENSIONS, max_vocabulary=MAX_VOCABULARY, seed=SEED):
+        # chunks: list of passage strings (already sampled). Returns the model.
+        tokenized = [Counter(tokenize(chunk)) for chunk in chunks]
+        df = Counter()
+        for counts in tokenized:
+            df.update(counts.keys())
+        vocabulary = [term for term, count in df.most_common(max_vocabulary) if count >= 2] or list(df)
+        vocabulary.sort()
+        term_ids = {term: i for i, term in enumerate(vocabulary)}
+        n = len(tokenized)
+        idf = np.array([math.log((1 + n) / (1 + df[term])) + 1 for term in vocabulary], dtype=np.float32)
+
+        indptr, cols, vals = [0], [], []
+        for counts in tokenized:
+            row = [(term_ids[term], tf) for term, tf in counts.items() if term in term_ids]
+            if not row:
+                continue
+            for term_id, tf in row:
+                cols.append(term_id)
+                vals.append((1 + math.log(tf)) * idf[term_id])
+            indptr.append(len(cols))
+        indptr = np.array(indptr, dtype=np.int64)
+        cols = np.array(cols, dtype=np.int64)
+        vals = np.array(vals, dtype=np.float32)
+        rows = len(indptr) - 1
+
+        # Transposed copy for A^T @ dense (every vocabulary term occurs in
+        # the sample, so no column is empty)
+        order = np.argsort(cols, kind="stable")
+        t_indptr = np.concatenate([[0], np.cumsum(np.bincount(cols, minlength=len(vocabulary)))])
+        t_cols = np.repeat(np.arange(rows), np.diff(indptr))[order]
+        t_vals = vals[order]
+
+        # Randomized SVD (Halko et al.) with two power iterations
+        rank = min(dims, rows, len(vocabulary))
+        projection = np.zeros((len(vocabulary), dims), dtype=np.float32)
+        if rank > 0:
+            oversample = min(rank + 10, rows, len(vocabulary))
+            rng = np.random.default_rng(seed)
+            omega = rng.standard_normal((len(vocabulary), oversample)).astype(np.float32)
+            q, _ = np.linalg.qr(_csr_dot(indptr, cols, vals, omega))
+            for _ in range(2):
+                z, _ = np.linalg.qr(_csr_dot(t_indptr, t_cols, t_vals, q))
+                q, _ = np.linalg.qr(_csr_dot(indptr, cols, vals, z))
+            b = _csr_dot(t_indptr, t_cols, t_vals, q).T          # oversample x V
+            _, _, vt = np.linalg.svd(b, full_matrices=False)
+            projection[:, :rank] = vt[:rank].T
+
+        term_offsets, term_blob = string_table(vocabulary)
+        sections = [
+            ("term_offsets", "Q", term_offsets),
+            ("term_blob", "B", term_blob),
+            ("idf", "f", idf),
+            ("projection", "f", projection),
+        ]
+        write_sections(path, MODEL_MAGIC, MODEL_VERSION, [len(vocabulary), dims, n], sections)
+        return LsaModel(path)
+
+
+class SentenceTransformerEmbedder:
+    # A local sentence-transformers model directory; nothing is downloaded
+    def __init__(self, model_dir):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError:
+            raise RuntimeError("VECTOR_MODEL is set but the sentence-transformers package is not installed")
+        self.model = SentenceTransformer(model_dir, device="cpu", local_files_only=True)
+        self.model_id = "st:" + os.path.basename(os.path.normpath(model_dir))
+        self.dims = self.model.get_sentence_embedding_dimension()
+
+    def embed(self, texts):
+        return self.model.encode(list(texts), batch_size=64, normalize_embeddings=True,
+                                 convert_to_numpy=True).astype(np.float32)
+
+    def close(self):
+        pass
+
+
+def load_embedder(kg_dir):
+    # The embedder queries must use: the same one that built vectors.idx
+    model_dir = os.getenv("VECTOR_MODEL")
+    if model_dir:
+        return SentenceTransformerEmbedder(model_dir)
+    return LsaModel.open(os.path.join(kg_dir, MODEL_FILE))
+
+
+def _sample_chunks(documents, limit):
+    # Every k-th passage of the corpus, so the sample spans all documents
+    chunks = [chunk for _, text in documents() for chunk in chunk_text(text)]
+    if len(chunks) > limit:
+        step = len(chunks) / limit
+        chunks = [chunks[int(i * step)] for i in range(limit)]
+    return chunks
+
+
+def _corpus_chunks(documents):
+    return sum(len(chunk_text(text)) for _, text in documents())
+
+
+def _quantize(vectors):
+    scales = np.abs(vectors).max(axis=1) / 127
+    scales[scales == 0] = 1.0
+    codes = np.rint(vectors / scales[:, None]).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def _train_centroids(vectors, nlist, rng, iterations=KMEANS_ITERATIONS):
+    # Spherical k-means on a sample of the (dequantized) vectors
+    sample_size = min(len(vectors), nlist * KMEANS_SAMPLE_PER_LIST)
+    sample = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+    centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assign = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, sample)
+        empty = np.linalg.norm(sums, axis=1) == 0
+        sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+        centroids = _normalize(sums)
+    return centroids.astype(np.float32)
+
+
+def _assign(vectors, centroids, block=8192):
+    return np.concatenate([np.argmax(vectors[i:i + block] @ centroids.T, axis=1)
+                           for i in range(0, len(vectors), block)] or [np.zeros(0, dtype=np.int64)])
+
+
+def build_vector_index(documents, kg_dir, retrain=False):
+    # documents: zero-argument callable returning an iterable of (source,
+    # text), e.g. lambda: iter_text_documents(dir); it is read once to
+    # embed, plus once more when the LSA model is (re)trained. Only sources
+    # whose text changed since the last build are embedded again.
+    # Returns (build id, embedded documents, reused documents).
+    index_path = os.path.join(kg_dir, VECTOR_FILE)
+    model_path = os.path.join(kg_dir, MODEL_FILE)
+    if os.getenv("VECTOR_MODEL"):
+        embedder = load_embedder(kg_dir)
+    else:
+        if not retrain and os.path.exists(model_path):
+            embedder = LsaModel.open(model_path)
+            if _corpus_chunks(documents) > embedder.trained_chunks * RETRAIN_GROWTH:
+                embedder.close()
+                retrain = True
+        if retrain or not os.path.exists(model_path):
+            print("Training LSA embedding model")
+            embedder = LsaModel.train(_sample_chunks(documents, TRAIN_CHUNKS), model_path)
+
+    old = VectorIndex.open(index_path) if os.path.exists(index_path) else None
+    if old is not None and old.model_id != embedder.model_id:
+        old.close()
+        old = None
+    old_sources = old.source_rows() if old is not None else {}
+
+    sources, source_hashes = [], []
+    codes, scales, chunk_source, texts = [], [], [], []
+    embedded = reused = 0
+    for source, text in documents():
+        digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+        source_id = len(sources)
+        sources.append(source)
+        source_hashes.append(digest)
+        previous = old_sources.get(source)
+        if previous is not None and previous[0] == digest:
+            rows = previous[1]
+            codes.append(old.codes[rows])
+            scales.append(old.scales[rows])
+            texts.extend(old.chunk_text(int(row)) for row in rows)
+            reused += 1
+        else:
+            passages = chunk_text(text)
+            if not passages:
+                continue
+            row_codes, row_scales = _quantize(embedder.embed(passages))
+            codes.append(row_codes)
+            scales.append(row_scales)
+            texts.extend(passages)
+            embedded += 1
+        chunk_source.extend([source_id] * len(codes[-1]))
+
+    dims = embedder.dims
+    codes = np.concatenate(codes) if codes else np.zeros((0, dims), dtype=np.int8)
+    scales = np.concatenate(scales) if scales else np.zeros(0, dtype=np.float32)
+    vectors = _normalize(codes.astype(np.float32) * scales[:, None])
+
+    # Centroids are kept while the corpus stays within RETRAIN_GROWTH of the
+    # size they were trained on
+    rng = np.random.default_rng(SEED)
+    nlist = max(1, min(4096, int(math.sqrt(len(codes))))) if len(codes) else 1
+    if (old is not None and old.nlist > 0 and old.trained_rows
+            and 1 / RETRAIN_GROWTH <= len(codes) / old.trained_rows <= RETRAIN_GROWTH):
+        centroids, trained_rows = np.array(old.centroids), old.trained_rows
+    elif len(codes):
+        centroids, trained_rows = _train_centroids(vectors, nlist, rng), len(codes)
+    else:
+        centroids, trained_rows = np.zeros((1, dims), dtype=np.float32), 0
+    if old is not None:
+        old.close()
+
+    assign = _assign(vectors, centroids)
+    order = np.argsort(assign, kind="stable")
+    list_offsets = np.concatenate([[0], np.cumsum(np.bincount(assign, minlength=len(centroids)))]).astype(np.uint64)
+    chunk_source = np.array(chunk_source, dtype=np.uint32)[order]
+    text_offsets, text_blob = string_table(texts[i] for i in order)
+    source_offsets, source_blob = string_table(sources)
+    hash_offsets, hash_blob = string_table(source_hashes)
+    model_offsets, model_blob = string_table([embedder.model_id])
+    sections = [
+        ("centroids", "f", centroids.astype(np.float32).ravel()),
+        ("list_offsets", "Q", list_offsets),
+        ("codes", "b", codes[order].ravel()),
+        ("scales", "f", scales[order]),
+        ("chunk_source", "I", chunk_source),
+        ("text_offsets", "Q", text_offsets),
+        ("text_blob", "B", text_blob),
+        ("source_offsets", "Q", source_offsets),
+        ("source_blob", "B", source_blob),
+        ("hash_offsets", "Q", hash_offsets),
+        ("hash_blob", "B", hash_blob),
+        ("model_offsets", "Q", model_offsets),
+        ("model_blob", "B", model_blob),
+    ]
+    metadata = [len(codes), dims, len(centroids), len(sources), trained_rows]
+    build_id = write_sections(index_path, MAGIC, FORMAT_VERSION, metadata, sections)
+    embedder.close()
+    return build_id, embedded, reused
+
+
+class VectorIndex:
+    def __init__(self, path):
+        self.path = path
+        self._file = SectionFile(path, MAGIC, FORMAT_VERSION)
+        self.build_id = self._file.build_id
+        self.row_count, self.dims, self.nlist, self.source_count, self.trained_rows = self._file.metadata
+        sections = self._file.sections
+        for name in ("text_offsets", "text_blob", "source_offsets", "source_blob",
+                     "hash_offsets", "hash_blob", "model_offsets", "model_blob"):
+            setattr(self, "_" + name, sections[name])
+        self.model_id = read_string(self._model_offsets, self._model_blob, 0)
+        self.centroids = np.frombuffer(sections["centroids"], dtype=np.float32).reshape(self.nlist, self.dims)
+        self.list_offsets = np.frombuffer(sections["list_offsets"], dtype=np.uint64)
+        self.codes = np.frombuffer(sections["codes"], dtype=np.int8).reshape(self.row_count, self.dims)
+        self.scales = np.frombuffer(sections["scales"], dtype=np.float32)
+        self.chunk_source_ids = np.frombuffer(sections["chunk_source"], dtype=np.uint32)
+
+    @classmethod
+    def open(cls, path):
+        return cls(path)
+
+    def close(self):
+        # NumPy views export the mapped buffers; drop them before unmapping
+        self.centroids = self.list_offsets = self.codes = self.scales = self.chunk_source_ids = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def search(self, query_vector, k=5, nprobe=NPROBE):
+        # [(row, cosine score), ...] best first, scanning the nprobe closest lists
+        if self.row_count == 0 or not query_vector.any():
+            return []
+        nprobe = min(nprobe, self.nlist)
+        centroid_scores = self.centroids @ query_vector
+        probes = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+        rows, scores = [], []
+        for probe in probes:
+            start, end = int(self.list_offsets[probe]), int(self.list_offsets[probe + 1])
+            if end > start:
+                rows.append(np.arange(start, end))
+                scores.append((self.codes[start:end] @ query_vector) * self.scales[start:end])
+        if not rows:
+            return []
+        rows, scores = np.concatenate(rows), np.concatenate(scores)
+        top = np.argpartition(-scores, k - 1)[:k] if len(scores) > k else np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(rows[i]), float(scores[i])) for i in top]
+
+    def chunk_text(self, row):
+        return read_string(self._text_offsets, self._text_blob, row)
+
+    def chunk_source(self, row):
+        return read_string(self._source_offsets, self._source_blob, int(self.chunk_source_ids[row]))
+
+    def source_rows(self):
+        # {source: (text hash, rows)} for incremental rebuilds
+        order = np.argsort(self.chunk_source_ids, kind="stable")
+        bounds = np.searchsorted(self.chunk_source_ids[order], np.arange(self.source_count + 1))
+        return {
+            read_string(self._source_offsets, self._source_blob, i):
+                (read_string(self._hash_offsets, self._hash_blob, i), order[bounds[i]:bounds[i + 1]])
+            for i in range(self.source_count)
+        }
+
+
+if __name__ == "__main__":
+    # python vector_index.py [extracted_content] [knowledge_graph] [--retrain]
+    args = [arg for arg in sys.argv[1:] if arg != "--retrain"]
+    content_dir = args[0] if args else "extracted_content"
+    kg_dir = args[1] if len(args) > 1 else "knowledge_graph"
+    os.makedirs(kg_dir, exist_ok=True)
+    build_id, embedded, reused = build_vector_index(lambda: iter_text_documents(content_dir), kg_dir,
+                                                    retrain="--retrain" in sys.argv)
+    print(f"Vector index built: {os.path.join(kg_dir, VECTOR_FILE)} (build {build_id}; "
+          f"{embedded} documents embedded, {reused} reused)")
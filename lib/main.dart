@@ -48,6 +48,9 @@ class _ChatScreenState extends State<ChatScreen> {
   // Toggle this for testing without backend
   final bool _simulate = false;
 
+  static const String _chatUrl = 'https://your-backend.com/api/chat';
+  final http.Client _client = http.Client();
+
   Future<void> _sendMessage(String text) async {
     if (text.trim().isEmpty) return;
     setState(() {
@@ -57,22 +60,27 @@ class _ChatScreenState extends State<ChatScreen> {
     _controller.clear();
     _scrollToBottom();
 
-    String botReply;
+    String? botReply;
     if (_simulate) {
       await Future.delayed(const Duration(seconds: 2));
       botReply = 'This is a dummy reply.';
     } else {
       try {
-        final response = await http.post(
-          Uri.parse('https://your-backend.com/query'),
-          headers: {'Content-Type': 'application/json'},
-          body: jsonEncode({'query': text}),
-        );
-        if (response.statusCode == 200) {
-          final data = jsonDecode(response.body);
-          botReply = data['response']?.toString() ?? 'No response.';
-        } else {
+        final request = http.Request('POST', Uri.parse(_chatUrl))
+          ..headers['Content-Type'] = 'application/json'
+          ..headers['Accept'] = 'application/x-ndjson, application/json;q=0.5'
+          ..body = jsonEncode({'query': text});
+        final response = await _client.send(request);
+        final contentType = response.headers['content-type'] ?? '';
+        if (response.statusCode != 200) {
           botReply = 'Sorry, something went wrong.';
+        } else if (contentType.startsWith('application/x-ndjson')) {
+          botReply = await _readAnswerStream(response);
+        } else {
+          // Non-streaming fallback: the whole answer as one JSON object
+          final data = jsonDecode(await response.stream.bytesToString());
+          botReply = (data['answer'] ?? data['response'])?.toString() ??
+              'No response.';
         }
       } catch (_) {
         botReply = 'Sorry, something went wrong.';
@@ -80,11 +88,51 @@ class _ChatScreenState extends State<ChatScreen> {
     }
     setState(() {
       _isBotTyping = false;
-      _messages.add(Message(text: botReply, isUser: false));
+      if (botReply != null) {
+        _messages.add(Message(text: botReply, isUser: false));
+      }
     });
     _scrollToBottom();
   }
 
+  // Shows answer fragments as they arrive. Returns null once the answer is
+  // on screen, or a reply for the caller to add if nothing was streamed.
+  Future<String?> _readAnswerStream(http.StreamedResponse response) async {
+    int? messageIndex;
+    var answer = '';
+
+    void show(String text) {
+      setState(() {
+        if (messageIndex == null) {
+          _isBotTyping = false;
+          _messages.add(Message(text: text, isUser: false));
+          messageIndex = _messages.length - 1;
+        } else {
+          _messages[messageIndex!] = Message(text: text, isUser: false);
+        }
+      });
+      _scrollToBottom();
+    }
+
+    final lines = response.stream
+        .transform(utf8.decoder)
+        .transform(const LineSplitter());
+    await for (final line in lines) {
+      if (line.trim().isEmpty) continue;
+      final event = jsonDecode(line);
+      switch (event['type']) {
+        case 'answer':
+          answer += event['text'].toString();
+          show(answer);
+        case 'done':
+          show(event['response']['answer'].toString());
+        case 'error':
+          show('Sorry, something went wrong.');
+      }
+    }
+    return messageIndex == null ? 'No response.' : null;
+  }
+
   void _scrollToBottom() {
     WidgetsBinding.instance.addPostFrameCallback((_) {
       if (_scrollController.hasClients) {